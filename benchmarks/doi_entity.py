@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=============
+doi_entity.py
+=============
+
+Benchmarks the memory used by Doi objects, and the time taken to convert them
+to the dictionaries of the label templates and of the transaction database,
+comparing a Doi storing its attributes in a __dict__, converted from a copy
+of its __dict__ (as done previously), to the slotted Doi, converted by its
+to_render_context() and to_row() methods.
+
+The Doi objects hold the fields parsed from an OSTI record:
+
+    python benchmarks/doi_entity.py --num-records 100000
+"""
+
+import argparse
+import copy
+import gc
+import logging
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass
+
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
+
+# A Doi with the same fields, storing its attributes in a __dict__
+DictDoi = make_dataclass('DictDoi', [(field.name, field.type, field) for field in fields(Doi)])
+
+ROW_FIELDS = {'doi', 'status', 'title', 'product_type', 'product_type_specific'}
+
+
+def create_dois(doi_class, num_records):
+    dois = []
+
+    for index in range(num_records):
+        doi = doi_class(title=f'InSight Cameras Collection {index}',
+                        publication_date='2019-01-01',
+                        product_type='Collection',
+                        product_type_specific='PDS4 Collection',
+                        related_identifier=f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+                        authors=[{'first_name': 'R.', 'last_name': 'Deen'}],
+                        keywords=['insight', 'camera'],
+                        id=str(index),
+                        doi=f'10.17189/{index}',
+                        site_url='https://pds.nasa.gov/ds-view/pds/viewCollection.jsp',
+                        publisher='NASA Planetary Data System',
+                        status=DoiStatus.Registered)
+
+        # The extra attributes set by the OSTI parser
+        doi.sponsoring_organization = 'National Aeronautics and Space Administration (NASA)'
+        doi.availability = 'NASA Planetary Data System'
+        doi.country = 'US'
+        doi.site_code = 'NASA-PDS'
+        doi.contributors = [{'full_name': 'Cartography and Imaging Sciences Discipline'}]
+
+        dois.append(doi)
+
+    return dois
+
+
+def measure_memory(doi_class, num_records):
+    """Returns the bytes allocated by the creation of num_records Doi objects."""
+    tracemalloc.start()
+
+    try:
+        dois = create_dois(doi_class, num_records)
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del dois
+
+    return memory
+
+
+def previous_conversion(dois):
+    render_contexts = [dict(filter(lambda elem: elem[1] is not None, copy.copy(doi.__dict__).items()))
+                       for doi in dois]
+    rows = [dict((k, doi.__dict__[k]) for k in doi.__dict__.keys() & ROW_FIELDS) for doi in dois]
+
+    return render_contexts, rows
+
+
+def current_conversion(dois):
+    render_contexts = [doi.to_render_context(omit_none=True) for doi in dois]
+    rows = [doi.to_row() for doi in dois]
+
+    return render_contexts, rows
+
+
+def run_benchmark(num_records, repeat):
+    logging.disable(logging.DEBUG)
+
+    print(f'{num_records} records')
+
+    methods = (('__dict__', DictDoi, previous_conversion),
+               ('__slots__', Doi, current_conversion))
+    results = {}
+
+    for name, doi_class, convert in methods:
+        memory = measure_memory(doi_class, num_records)
+        dois = create_dois(doi_class, num_records)
+        timings = []
+
+        for _ in range(repeat):
+            # Timed without garbage collection, as timeit does, since the
+            # passes over the Doi objects would dominate the timings
+            gc.collect()
+            gc.disable()
+
+            try:
+                start = time.perf_counter()
+                results[name] = convert(dois)
+                timings.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+
+        best = min(timings)
+        print(f'{name:>15}: {memory / num_records:.0f} bytes per Doi, '
+              f'{best:.3f} s to convert, {best / num_records * 1000000:.2f} us per Doi')
+
+    previous_contexts, previous_rows = results['__dict__']
+    current_contexts, current_rows = results['__slots__']
+
+    # The previous render contexts also held the extra attributes, unused by the templates
+    if ([{key: value for key, value in context.items() if key in current_context}
+         for context, current_context in zip(previous_contexts, current_contexts)] != current_contexts
+            or previous_rows != current_rows):
+        raise AssertionError('The __dict__ and __slots__ Doi objects were converted differently')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-records', type=int, default=100000,
+                        help='Number of Doi objects.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    run_benchmark(args.num_records, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
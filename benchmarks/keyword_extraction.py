@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=====================
+keyword_extraction.py
+=====================
+
+Benchmarks the extraction of keywords from the descriptions of PDS4 labels,
+comparing a tokenizer compiling its regular expressions and creating a
+WordNet lemmatizer on every call (as done previously) to KeywordTokenizer,
+with its module-level compiled expressions and memoized lemmas, using the
+nltk then the builtin keyword engine. All must extract the same keywords.
+
+The NLTK methods are skipped, with a warning, if the nltk package or its
+stopwords and wordnet data are not installed, see the nltk_data_path
+configuration value. By default the corpus is made of the descriptions of the
+labels in the input directory, repeated to the requested number of texts. A
+directory of real labels may be provided instead:
+
+    python benchmarks/keyword_extraction.py --num-texts 20000
+    python benchmarks/keyword_extraction.py --corpus /path/to/labels
+"""
+
+import argparse
+import glob
+import logging
+import os
+import re
+import time
+from os.path import abspath, dirname, join
+
+from lxml import etree
+
+from pds_doi_service.core.input.pds4_util import PDS4_NAMESPACE
+from pds_doi_service.core.util.keyword_engines import get_keyword_engine
+from pds_doi_service.core.util.keyword_tokenizer import KeywordTokenizer
+
+INPUT_DIR = join(dirname(abspath(__file__)), os.pardir, 'input')
+
+DESCRIPTION_XPATHS = ('/*/pds4:Identification_Area/pds4:title',
+                      '/*/pds4:Context_Area/pds4:Target_Identification/pds4:name',
+                      '//pds4:Citation_Information/pds4:description',
+                      '//pds4:Citation_Information/pds4:keyword')
+
+
+def read_corpus(labels):
+    """Returns the descriptive texts of the labels."""
+    texts = []
+
+    for label in labels:
+        try:
+            xml_tree = etree.parse(label)
+        except etree.XMLSyntaxError:
+            continue
+
+        for xpath in DESCRIPTION_XPATHS:
+            texts.extend(elmt.text for elmt in xml_tree.xpath(xpath, namespaces=PDS4_NAMESPACE)
+                         if elmt.text and elmt.text.strip())
+
+    return texts
+
+
+def extract_keywords_per_call(texts):
+    """Extracts the keywords as done before the tokenizer was optimized."""
+    from nltk.stem.wordnet import WordNetLemmatizer
+
+    stop_words = get_keyword_engine('nltk').stop_words
+    keywords = set()
+
+    for text in texts:
+        text = re.sub('^[^a-zA-Z0-9]+', ' ', text)
+        text = re.sub('[^a-zA-Z0-9]+$', ' ', text)
+        text = re.sub('[^a-zA-Z0-9]+ ', ' ', text)
+        text = re.sub(' [^a-zA-Z0-9]+', ' ', text)
+        text = text.lower()
+        text = re.sub("&lt;/?.*?&gt;", " &lt;&gt; ", text)
+        text = re.sub(r"(\|\W)+", " ", text)
+
+        lemmatizer = WordNetLemmatizer()
+        keywords.update(word if word == 'pds' else lemmatizer.lemmatize(word)
+                        for word in text.split() if word not in stop_words)
+
+    return keywords
+
+
+def extract_keywords_tokenizer(texts, engine_name):
+    keyword_tokenizer = KeywordTokenizer(engine=get_keyword_engine(engine_name))
+
+    for text in texts:
+        keyword_tokenizer.process_text(text)
+
+    return keyword_tokenizer.get_keywords()
+
+
+def run_benchmark(texts, repeat):
+    num_words = sum(len(text.split()) for text in texts)
+    print(f'{len(texts)} texts, {num_words} words')
+
+    methods = [('builtin', lambda: extract_keywords_tokenizer(texts, 'builtin'))]
+
+    # Each method is timed with the resources of its engine already loaded,
+    # and without the debug logging of each text
+    try:
+        get_keyword_engine('nltk')
+        methods[:0] = [('per call', lambda: extract_keywords_per_call(texts)),
+                       ('nltk', lambda: extract_keywords_tokenizer(texts, 'nltk'))]
+    except (ImportError, LookupError) as err:
+        print(f'Skipping the NLTK methods: {str(err).splitlines()[0]}')
+
+    get_keyword_engine('builtin')
+    logging.disable(logging.DEBUG)
+
+    results = {}
+
+    for name, extract in methods:
+        timings = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[name] = extract()
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        print(f'{name:>10}: {best:.3f} s, {num_words / best:,.0f} words/s, '
+              f'{len(results[name])} distinct keywords')
+
+    for name, keywords in results.items():
+        if keywords != results['builtin']:
+            raise AssertionError(f'The {name} and builtin methods extracted different keywords: '
+                                 f'{sorted(keywords ^ results["builtin"])}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of PDS4 labels to benchmark with.')
+    parser.add_argument('--num-texts', type=int, default=10000,
+                        help='Number of texts to repeat the input labels to when no corpus is provided.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    if args.corpus:
+        texts = read_corpus(sorted(glob.glob(join(args.corpus, '*.xml'))))
+    else:
+        texts = read_corpus(sorted(glob.glob(join(INPUT_DIR, '**', '*.xml'), recursive=True)))
+        texts = (texts * (args.num_texts // len(texts) + 1))[:args.num_texts]
+
+    run_benchmark(texts, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
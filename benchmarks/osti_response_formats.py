@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+========================
+osti_response_formats.py
+========================
+
+Benchmarks the parsing of an OSTI query response into Doi objects, comparing
+the XML response, parsed by response_get_parse_osti_xml(), to the JSON
+response of the same records, decoded with the json module or with orjson
+(if installed) and mapped by response_get_parse_osti_json().
+
+The records are generated, with the fields returned by OSTI:
+
+    python benchmarks/osti_response_formats.py --num-records 10000
+"""
+
+import argparse
+import gc
+import json
+import logging
+import time
+from dataclasses import fields
+
+from lxml import etree
+
+from pds_doi_service.core.outputs.osti_web_parser import OPTIONAL_FIELDS, DOIOstiWebParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def create_records(num_records):
+    """Returns num_records registered records, as decoded from JSON."""
+    return [{'status': 'Registered',
+             'id': str(index),
+             'site_code': 'NASA-PDS',
+             'title': f'InSight Cameras Collection {index}',
+             'sponsoring_organization': 'National Aeronautics and Space Administration (NASA)',
+             'accession_number': f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+             'doi': f'10.17189/{index}',
+             'authors': [{'first_name': 'R.', 'last_name': 'Deen'},
+                         {'first_name': 'H.', 'middle_name': 'A.', 'last_name': 'Abarca'}],
+             'contributors': [{'full_name': 'Cartography and Imaging Sciences Discipline'}],
+             'publisher': 'NASA Planetary Data System',
+             'availability': 'NASA Planetary Data System',
+             'publication_date': '2019-01-01',
+             'country': 'US',
+             'description': 'InSight Cameras Experiment Data Record (EDR) '
+                            'and Reduced Data Record (RDR)',
+             'site_url': 'https://pds.nasa.gov/ds-view/pds/viewCollection.jsp?identifier='
+                         f'urn%3Anasa%3Apds%3Ainsight_cameras%3Adata_{index}&version=1.0',
+             'product_type': 'Collection',
+             'product_type_specific': 'PDS4 Collection',
+             'related_identifiers': [{'identifier_type': 'URL',
+                                      'identifier_value': f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+                                      'relation_type': 'IsIdenticalTo'}],
+             'date_record_added': '2020-01-01',
+             'date_record_updated': '2020-01-02',
+             'keywords': 'insight; camera; mar; edr; rdr'}
+            for index in range(num_records)]
+
+
+def create_xml_response(records):
+    """Returns the XML response of the records."""
+    records_element = etree.Element('records', total=str(len(records)))
+
+    for record in records:
+        record_element = etree.SubElement(records_element, 'record', status=record['status'])
+
+        for field, value in record.items():
+            if field == 'status':
+                continue
+
+            field_element = etree.SubElement(record_element, field)
+
+            if isinstance(value, list):
+                for item in value:
+                    item_element = etree.SubElement(field_element, field[:-1])
+
+                    for name, text in item.items():
+                        etree.SubElement(item_element, name).text = text
+            else:
+                field_element.text = value
+
+    return etree.tostring(records_element, xml_declaration=True, encoding='UTF-8')
+
+
+def parse_xml(xml_response):
+    dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(xml_response)
+
+    return dois
+
+
+def parse_json(json_response):
+    dois, _ = DOIOstiWebParser.response_get_parse_osti_json(json.loads(json_response))
+
+    return dois
+
+
+def parse_orjson(json_response):
+    dois, _ = DOIOstiWebParser.response_get_parse_osti_json(orjson.loads(json_response))
+
+    return dois
+
+
+def get_fields(doi):
+    return {field: getattr(doi, field, None)
+            for field in [field.name for field in fields(doi)] + list(OPTIONAL_FIELDS)}
+
+
+def run_benchmark(num_records, repeat):
+    records = create_records(num_records)
+    xml_response = create_xml_response(records)
+    json_response = json.dumps({'records': records}).encode()
+
+    logging.disable(logging.DEBUG)
+
+    print(f'{num_records} records, XML {len(xml_response) / 1024 / 1024:.1f} MiB, '
+          f'JSON {len(json_response) / 1024 / 1024:.1f} MiB')
+
+    methods = [('xml', lambda: parse_xml(xml_response)),
+               ('json', lambda: parse_json(json_response))]
+
+    if orjson is not None:
+        methods.append(('orjson', lambda: parse_orjson(json_response)))
+    else:
+        print('orjson is not installed, only the json module is benchmarked')
+
+    results = {}
+
+    for name, parse in methods:
+        timings = []
+
+        for _ in range(repeat):
+            # Timed without garbage collection, as timeit does, since the
+            # results of the previous runs would slow down its passes
+            gc.collect()
+            gc.disable()
+
+            try:
+                start = time.perf_counter()
+                results[name] = parse()
+                timings.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+
+        best = min(timings)
+        print(f'{name:>15}: {best:.3f} s, {num_records / best:.0f} records per second')
+
+    expected_dois = [get_fields(doi) for doi in results['xml']]
+
+    for name, dois in results.items():
+        if [get_fields(doi) for doi in dois] != expected_dois:
+            raise AssertionError(f'The xml and {name} responses were parsed differently')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-records', type=int, default=10000,
+                        help='Number of records of the response.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    run_benchmark(args.num_records, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
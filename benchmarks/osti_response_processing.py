@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+===========================
+osti_response_processing.py
+===========================
+
+Benchmarks the post-processing of OSTI responses and rendered records as the
+number of records grows, comparing the previous implementations, querying
+all records with XPath for the fields of each one, to the current ones,
+reading each record once:
+
+    TransactionBuilder.set_doi_fields_osti()
+    DOIReleaseOstiUtil.remove_empty_fields_from_render_doc()
+    DOIOstiWebClient._verify_osti_reserved_status()
+
+The previous implementations are quadratic, so they are only run up to
+--previous-max-records records:
+
+    python benchmarks/osti_response_processing.py --num-records 10 1000 10000
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from lxml import etree
+
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
+from pds_doi_service.core.outputs.osti_release import DOIReleaseOstiUtil
+from pds_doi_service.core.outputs.osti_web_client import DOIOstiWebClient
+from pds_doi_service.core.outputs.transaction_builder import TransactionBuilder
+
+
+def create_dois(num_records):
+    return [Doi(title=f'InSight Cameras Collection {index}', publication_date='2019-01-01',
+                product_type='Collection', product_type_specific='PDS4 Collection',
+                related_identifier=f'urn:nasa:pds:insight_cameras:data_{index}::1.0')
+            for index in range(num_records)]
+
+
+def create_osti_response(num_records):
+    """Returns an OSTI response reserving num_records records."""
+    return '<records>{}</records>'.format(''.join(
+        f"""<record status="Reserved">
+  <id>{index}</id>
+  <doi>10.17189/{index}</doi>
+  <title>InSight Cameras Collection {index}</title>
+  <site_url>https://pds.nasa.gov/ds-view/pds/viewCollection.jsp?identifier=urn%3Anasa%3Apds%3Ainsight_cameras%3Adata_{index}&amp;version=1.0</site_url>
+  <accession_number>urn:nasa:pds:insight_cameras:data_{index}::1.0</accession_number>
+  <publication_date>2019-01-01</publication_date>
+  <product_type>Collection</product_type>
+  <product_type_specific>PDS4 Collection</product_type_specific>
+  <authors>
+    <author><first_name>R.</first_name><last_name>Deen</last_name></author>
+    <author><first_name>H.</first_name><last_name>Abarca</last_name></author>
+  </authors>
+  <related_identifiers>
+    <related_identifier>
+      <identifier_type>URL</identifier_type>
+      <identifier_value>urn:nasa:pds:insight_cameras:data_{index}::1.0</identifier_value>
+      <relation_type>IsIdenticalTo</relation_type>
+    </related_identifier>
+  </related_identifiers>
+</record>"""
+        for index in range(num_records)
+    ))
+
+
+def previous_set_doi_fields_osti(i_doc, dois):
+    my_root = etree.fromstring(i_doc)
+
+    for element_index, element in enumerate(my_root.findall('record')):
+        my_record = my_root.xpath(element.tag)[element_index]
+        dois[element_index].status = DoiStatus(my_record.attrib['status'].lower())
+        dois[element_index].title = my_root.xpath('record/title')[element_index].text
+        dois[element_index].id = my_root.xpath('record/id')[element_index].text
+        dois[element_index].doi = my_root.xpath('record/doi')[element_index].text
+
+    return dois
+
+
+def previous_remove_empty_fields_from_render_doc(render_doc):
+    o_response_dicts = []
+    my_root = etree.fromstring(render_doc.encode()).getroottree()
+
+    for element_record, _ in enumerate(my_root.findall('record')):
+        response_dict = {}
+
+        for field in ('title', 'id', 'site_url', 'doi', 'publication_date',
+                      'product_type', 'product_type_specific'):
+            if (my_root.xpath(f'record/{field}')[element_record] is not None
+                    and my_root.xpath(f'record/{field}')[element_record].text):
+                response_dict[field] = my_root.xpath(f'record/{field}')[element_record].text
+
+        author_element = my_root.xpath('record/authors')[0]
+        response_dict['authors'] = [
+            {'first_name': author_element.xpath('author/first_name')[ii].text,
+             'last_name': author_element.xpath('author/last_name')[ii].text}
+            for ii in range(len(author_element))
+        ]
+
+        identifier_element = my_root.xpath('record/related_identifiers')[0]
+        response_dict['related_identifiers'] = [
+            {'identifier_value': identifier_element.xpath('related_identifier/identifier_value')[ii].text,
+             'identifier_type': identifier_element.xpath('related_identifier/identifier_type')[ii].text,
+             'relation_type': identifier_element.xpath('related_identifier/relation_type')[ii].text}
+            for ii in range(len(identifier_element))
+        ]
+
+        o_response_dicts.append(response_dict)
+
+    return o_response_dicts
+
+
+def previous_verify_osti_reserved_status(i_doi_label):
+    my_root = etree.fromstring(i_doi_label.encode()).getroottree()
+
+    for element in my_root.findall('record'):
+        my_record = my_root.xpath(element.tag)[0]
+
+        if my_record.attrib['status'] != DoiStatus.Reserved:
+            my_record.attrib['status'] = DoiStatus.Reserved
+
+    return True, etree.tostring(my_root, pretty_print=True)
+
+
+def time_call(function, repeat):
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), result
+
+
+def get_doi_fields(dois):
+    return [(doi.status, doi.title, doi.id, doi.doi) for doi in dois]
+
+
+def get_response_fields(response_dicts):
+    # The previous implementation returned the related identifiers of the
+    # first record for every record, so they are not compared
+    return [{field: value for field, value in response_dict.items()
+             if field != 'related_identifiers'}
+            for response_dict in response_dicts]
+
+
+def get_reserved_flag(result):
+    # The previous implementation only reset the status of the first record,
+    # so the labels returned are not compared
+    reserved_flag, _ = result
+
+    return reserved_flag
+
+
+def run_benchmark(num_records_list, previous_max_records, repeat):
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        transaction_builder = TransactionBuilder(db_name=os.path.join(db_dir, 'doi.db'))
+        release_util = DOIReleaseOstiUtil()
+        web_client = DOIOstiWebClient()
+
+        # The name, previous and current methods, and the function comparing their results
+        methods = (
+            ('set_doi_fields_osti',
+             lambda response, dois: previous_set_doi_fields_osti(response, dois),
+             lambda response, dois: transaction_builder.set_doi_fields_osti(response, dois),
+             get_doi_fields),
+            ('remove_empty_fields',
+             lambda response, dois: previous_remove_empty_fields_from_render_doc(response),
+             lambda response, dois: release_util.remove_empty_fields_from_render_doc(response),
+             get_response_fields),
+            ('verify_reserved_status',
+             lambda response, dois: previous_verify_osti_reserved_status(response),
+             lambda response, dois: web_client._verify_osti_reserved_status(response),
+             get_reserved_flag)
+        )
+
+        print(f'{"":>24}{"records":>9}{"previous":>12}{"current":>12}')
+
+        for name, previous_method, current_method, get_result in methods:
+            for num_records in num_records_list:
+                osti_response = create_osti_response(num_records)
+
+                current, current_result = time_call(
+                    lambda: current_method(osti_response, create_dois(num_records)), repeat
+                )
+
+                if num_records <= previous_max_records:
+                    previous, previous_result = time_call(
+                        lambda: previous_method(osti_response, create_dois(num_records)), repeat
+                    )
+
+                    if get_result(previous_result) != get_result(current_result):
+                        raise AssertionError(f'The previous and current {name} methods returned '
+                                             f'different results for {num_records} records')
+
+                    previous = f'{previous:.4f} s'
+                else:
+                    previous = 'skipped'
+
+                print(f'{name:>24}{num_records:>9}{previous:>12}{current:>10.4f} s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-records', type=int, nargs='+', default=[10, 1000, 10000],
+                        help='Numbers of records to process.')
+    parser.add_argument('--previous-max-records', type=int, default=1000,
+                        help='Largest number of records processed by the previous implementations.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    run_benchmark(args.num_records, args.previous_max_records, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+===================
+osti_xml_parsing.py
+===================
+
+Benchmarks the parsing of an OSTI export into Doi objects, comparing one
+XPath query per field of each record (as done previously) to
+DOIOstiWebParser.response_get_parse_osti_xml(), reading the children of
+each record in a single pass.
+
+The export is generated, with records of the layout returned by OSTI:
+
+    python benchmarks/osti_xml_parsing.py --num-records 10000
+"""
+
+import argparse
+import logging
+import time
+
+from lxml import etree
+
+from pds_doi_service.core.entities.doi import DOI_FIELD_NAMES, EXTRA_ATTRIBUTES, Doi, DoiStatus
+from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
+
+OPTIONAL_FIELDS = ['id', 'doi', 'sponsoring_organization', 'publisher',
+                   'availability', 'country', 'description', 'site_url',
+                   'site_code', 'date_record_added', 'date_record_updated',
+                   'keywords', 'authors', 'contributors']
+
+
+def create_osti_export(num_records):
+    """Returns an OSTI export of num_records registered records."""
+    records = ['<?xml version="1.0" encoding="UTF-8"?>',
+               f'<records start="0" rows="{num_records}" total="{num_records}">']
+
+    for index in range(num_records):
+        records.append(f"""  <record status="Registered">
+    <id>{index}</id>
+    <site_code>NASA-PDS</site_code>
+    <title>InSight Cameras Collection {index}</title>
+    <sponsoring_organization>National Aeronautics and Space Administration (NASA)</sponsoring_organization>
+    <accession_number>urn:nasa:pds:insight_cameras:data_{index}::1.0</accession_number>
+    <doi>10.17189/{index}</doi>
+    <authors>
+      <author><first_name>R.</first_name><last_name>Deen</last_name><affiliations/></author>
+      <author><first_name>H.</first_name><middle_name>A.</middle_name><last_name>Abarca</last_name></author>
+    </authors>
+    <contributors>
+      <contributor><full_name>Cartography and Imaging Sciences Discipline</full_name></contributor>
+    </contributors>
+    <publisher>NASA Planetary Data System</publisher>
+    <availability>NASA Planetary Data System</availability>
+    <publication_date>2019-01-01</publication_date>
+    <country>US</country>
+    <description>InSight Cameras Experiment Data Record (EDR) and Reduced Data Record (RDR)</description>
+    <site_url>https://pds.nasa.gov/ds-view/pds/viewCollection.jsp?identifier=urn%3Anasa%3Apds%3Ainsight_cameras%3Adata_{index}&amp;version=1.0</site_url>
+    <product_type>Collection</product_type>
+    <product_type_specific>PDS4 Collection</product_type_specific>
+    <related_identifiers>
+      <related_identifier>
+        <identifier_type>URL</identifier_type>
+        <identifier_value>urn:nasa:pds:insight_cameras:data_{index}::1.0</identifier_value>
+        <relation_type>IsIdenticalTo</relation_type>
+      </related_identifier>
+    </related_identifiers>
+    <date_record_added>2020-01-01</date_record_added>
+    <date_record_updated>2020-01-02</date_record_updated>
+    <keywords>insight; camera; mar; edr; rdr</keywords>
+  </record>""")
+
+    records.append('</records>')
+
+    return '\n'.join(records).encode()
+
+
+def parse_per_field(osti_xml):
+    """Parses each record with one XPath query per field, as done previously."""
+    dois = []
+
+    for record in etree.fromstring(osti_xml).findall('record'):
+        if record.xpath("accession_number"):
+            lidvid = record.xpath("accession_number")[0].text
+        elif record.xpath("related_identifiers/related_identifier[./identifier_type='URL']"):
+            lidvid = record.xpath(
+                "related_identifiers/related_identifier[./identifier_type='URL']/identifier_value")[0].text
+        else:
+            lidvid = None
+
+        doi = Doi(title=record.xpath('title')[0].text,
+                  publication_date=record.xpath('publication_date')[0].text,
+                  product_type=record.xpath('product_type')[0].text,
+                  product_type_specific=record.xpath('product_type_specific')[0].text,
+                  related_identifier=lidvid,
+                  status=DoiStatus(record.get('status').lower()))
+
+        for optional_field in OPTIONAL_FIELDS:
+            optional_field_element = record.xpath(optional_field)
+
+            if optional_field_element:
+                if optional_field == 'keywords':
+                    doi.keywords = optional_field_element[0].text.split('; ')
+                elif optional_field == 'authors':
+                    doi.authors = []
+
+                    for author in optional_field_element[0]:
+                        author_dict = {'first_name': author.xpath('first_name')[0].text,
+                                       'last_name': author.xpath('last_name')[0].text}
+
+                        if author.xpath('full_name'):
+                            author_dict = {'full_name': author.xpath('full_name')[0].text}
+
+                        if author.xpath('middle_name'):
+                            author_dict['middle_name'] = author.xpath('middle_name')[0].text
+
+                        doi.authors.append(author_dict)
+                elif optional_field == 'contributors':
+                    doi.contributors = [
+                        {'full_name': contributor.xpath('full_name')[0].text}
+                        for contributor in optional_field_element[0]
+                    ]
+                else:
+                    setattr(doi, optional_field, optional_field_element[0].text)
+
+        dois.append(doi)
+
+    return dois
+
+
+def parse_single_pass(osti_xml):
+    dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(osti_xml)
+
+    return dois
+
+
+def get_values(doi):
+    return {name: getattr(doi, name) for name in DOI_FIELD_NAMES + EXTRA_ATTRIBUTES
+            if hasattr(doi, name)}
+
+
+def run_benchmark(num_records, repeat):
+    osti_xml = create_osti_export(num_records)
+
+    logging.disable(logging.DEBUG)
+
+    print(f'{num_records} records, {len(osti_xml) / 1024 / 1024:.1f} MiB')
+
+    methods = (('per field', parse_per_field),
+               ('single pass', parse_single_pass))
+    results = {}
+
+    for name, parse in methods:
+        timings = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[name] = parse(osti_xml)
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        print(f'{name:>15}: {best:.3f} s, {best / num_records * 1000000:.0f} us per record')
+
+    if ([get_values(doi) for doi in results['single pass']]
+            != [get_values(doi) for doi in results['per field']]):
+        raise AssertionError('The per field and single pass methods parsed different records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-records', type=int, default=10000,
+                        help='Number of records of the OSTI export.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    run_benchmark(args.num_records, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+========================
+pds4_label_extraction.py
+========================
+
+Benchmarks the extraction of DOI fields from PDS4 labels, comparing a full
+parse of each label with XPath expressions compiled on every call (as done
+previously) to DOIPDS4LabelUtil.parse_pds4_label() with the module-level
+compiled XPath expressions.
+
+By default the corpus is generated from the labels in the input directory,
+each padded with an inventory of the requested size, as found in the
+collection labels of large archives. A directory of real labels may be
+provided instead:
+
+    python benchmarks/pds4_label_extraction.py --inventory-size 50000
+    python benchmarks/pds4_label_extraction.py --corpus /path/to/labels
+"""
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+from os.path import abspath, dirname, join
+
+from lxml import etree
+
+from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil, PDS4_NAMESPACE, PDS4_XPATHS
+
+INPUT_DIR = join(dirname(abspath(__file__)), os.pardir, 'input')
+
+INVENTORY_ENTRY = (
+    '<Internal_Reference>'
+    '<lidvid_reference>urn:nasa:pds:insight_cameras:data:{0:08d}::1.0</lidvid_reference>'
+    '<reference_type>bundle_has_member_collection</reference_type>'
+    '</Internal_Reference>\n'
+)
+
+
+def create_corpus(corpus_dir, num_labels, inventory_size):
+    """Writes num_labels padded copies of the input labels to corpus_dir."""
+    templates = []
+
+    for label in sorted(glob.glob(join(INPUT_DIR, 'bundle_in*.xml'))):
+        with open(label, 'r') as infile:
+            templates.append(infile.read())
+
+    inventory = ('<Reference_List>\n'
+                 + ''.join(INVENTORY_ENTRY.format(index) for index in range(inventory_size))
+                 + '</Reference_List>\n')
+
+    for index in range(num_labels):
+        template = templates[index % len(templates)]
+
+        # The inventory goes right after the Context_Area, as a Reference_List would
+        end_of_context_area = template.index('</Context_Area>') + len('</Context_Area>')
+        label = template[:end_of_context_area] + '\n' + inventory + template[end_of_context_area:]
+
+        with open(join(corpus_dir, f'collection_{index:04d}.xml'), 'w') as outfile:
+            outfile.write(label)
+
+    return sorted(glob.glob(join(corpus_dir, '*.xml')))
+
+
+def read_pds4_full_parse(label_util, label):
+    """Extracts the DOI fields as done before parse_pds4_label() was introduced."""
+    xml_tree = etree.parse(label)
+    pds4_fields = {}
+
+    for key, xpath in PDS4_XPATHS.items():
+        elmts = xml_tree.xpath(xpath.path, namespaces=PDS4_NAMESPACE)
+        if elmts:
+            pds4_fields[key] = ' '.join([elmt.text.strip() for elmt in elmts if elmt.text]).strip()
+
+    return pds4_fields
+
+
+def read_pds4_targeted_parse(label_util, label):
+    return label_util.read_pds4(DOIPDS4LabelUtil.parse_pds4_label(label))
+
+
+def run_benchmark(labels, repeat):
+    label_util = DOIPDS4LabelUtil(
+        landing_page_template='https://pds.nasa.gov/ds-view/pds/view{}.jsp?identifier={}&version={}'
+    )
+
+    total_size = sum(os.path.getsize(label) for label in labels)
+    print(f'{len(labels)} labels, {total_size / len(labels) / 1024:.0f} KiB on average')
+
+    results = {}
+
+    for name, extract in (('full parse', read_pds4_full_parse),
+                          ('targeted parse', read_pds4_targeted_parse)):
+        timings = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results[name] = [extract(label_util, label) for label in labels]
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        print(f'{name:>15}: {best:.3f} s, {best / len(labels) * 1000:.2f} ms per label')
+
+    if results['full parse'] != results['targeted parse']:
+        raise AssertionError('The parse methods extracted different fields')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Directory of PDS4 labels to benchmark with.')
+    parser.add_argument('--num-labels', type=int, default=50,
+                        help='Number of labels to generate when no corpus is provided.')
+    parser.add_argument('--inventory-size', type=int, default=20000,
+                        help='Number of inventory entries of each generated label.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    if args.corpus:
+        run_benchmark(sorted(glob.glob(join(args.corpus, '*.xml'))), args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            run_benchmark(create_corpus(corpus_dir, args.num_labels, args.inventory_size),
+                          args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=====================
+template_rendering.py
+=====================
+
+Benchmarks the rendering of OSTI reserved and release records, comparing a
+new pystache.Renderer reading and parsing the template file on every
+rendering (as done previously) to DOITemplateCache, rendering from the
+template parsed once, with and without checking its modification time.
+
+Records are rendered one at a time, as reserve does for each row of its
+input when validating it:
+
+    python benchmarks/template_rendering.py --num-records 5000
+"""
+
+import argparse
+import logging
+import time
+
+import pystache
+
+from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.outputs.osti import DOIOutputOsti
+from pds_doi_service.core.util.template_cache import DOITemplateCache
+
+
+def create_contexts(num_records):
+    """Returns the rendering contexts of num_records reserved records."""
+    return [{'title': f'InSight Cameras Collection {index}',
+             'publication_date': '2019-01-01',
+             'product_type': 'Collection',
+             'product_type_specific': 'PDS4 Collection',
+             'related_identifier': f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+             'authors': [{'first_name': 'R.', 'last_name': 'Deen'},
+                         {'first_name': 'H.', 'last_name': 'Abarca'}],
+             'keywords': 'insight; camera; mar',
+             'contributor': 'Cartography and Imaging Sciences Discipline',
+             'publisher': 'NASA Planetary Data System',
+             'date_record_added': '2020-01-01',
+             'status': DoiStatus.Reserved}
+            for index in range(num_records)]
+
+
+def render_per_call(template_path, contexts):
+    """Renders each record as done before the template cache was introduced."""
+    return [pystache.Renderer().render_path(template_path, context) for context in contexts]
+
+
+def render_cached(template_cache, template_path, contexts):
+    return [template_cache.render(template_path, context) for context in contexts]
+
+
+def run_benchmark(num_records, repeat):
+    osti_output = DOIOutputOsti()
+    contexts = create_contexts(num_records)
+
+    logging.disable(logging.DEBUG)
+
+    for template_name, template_path, record_contexts in (
+            ('reserved', osti_output._reserve_template_path,
+             [{'dois': [context]} for context in contexts]),
+            ('release', osti_output._draft_template_path, contexts)):
+        print(f'{num_records} {template_name} records')
+
+        methods = (('per call', lambda: render_per_call(template_path, record_contexts)),
+                   ('cached', lambda: render_cached(DOITemplateCache(check_mtime=False),
+                                                    template_path, record_contexts)),
+                   ('cached+mtime', lambda: render_cached(DOITemplateCache(check_mtime=True),
+                                                          template_path, record_contexts)))
+        results = {}
+
+        for name, render in methods:
+            timings = []
+
+            for _ in range(repeat):
+                start = time.perf_counter()
+                results[name] = render()
+                timings.append(time.perf_counter() - start)
+
+            best = min(timings)
+            print(f'{name:>15}: {best:.3f} s, {best / num_records * 1000000:.0f} us per record')
+
+        for name, records in results.items():
+            if records != results['per call']:
+                raise AssertionError(f'The per call and {name} methods rendered different records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-records', type=int, default=2000,
+                        help='Number of records to render.')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Number of runs, the best one is reported.')
+    args = parser.parse_args()
+
+    run_benchmark(args.num_records, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
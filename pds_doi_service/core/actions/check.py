@@ -16,19 +16,28 @@ Contains the definition for the Check action of the Core PDS DOI Service.
 import datetime
 import json
 import os
+import random
+import re
+import signal
+import socket
+import threading
+import time
 from copy import deepcopy
 from datetime import date
 from os.path import dirname, join
 
 import pystache
+from filelock import FileLock, Timeout
 
 from pds_doi_service.core.actions.action import DOICoreAction
 from pds_doi_service.core.actions.list import DOICoreActionList
 from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.input.exceptions import CriticalDOIException
 from pds_doi_service.core.outputs.osti_web_client import DOIOstiWebClient
 from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
 from pds_doi_service.core.util.emailer import Emailer
 from pds_doi_service.core.util.general_util import get_logger
+from pds_doi_service.core.util.template_cache import get_template_cache
 
 logger = get_logger('pds_doi_core.actions.check')
 
@@ -39,7 +48,7 @@ class DOICoreActionCheck(DOICoreAction):
                     'database. Should be run regularly, for example in a '
                     'crontab.')
     _order = 30
-    _run_arguments = ('submitter', 'email', 'attachment')
+    _run_arguments = ('submitter', 'email', 'attachment', 'daemon', 'worker_id')
 
     def __init__(self, db_name=None):
         super().__init__(db_name=db_name)
@@ -49,6 +58,12 @@ class DOICoreActionCheck(DOICoreAction):
         self._submitter = self._config.get('OTHER', 'emailer_sender')
         self._email = True
         self._attachment = True
+        self._daemon = False
+        self._worker_id = (self._config.get('OTHER', 'check_worker_id')
+                           or socket.gethostname())
+
+        # Set by the signal handlers to stop a check daemon between cycles.
+        self._shutdown = threading.Event()
 
     @classmethod
     def add_to_subparser(cls, subparsers):
@@ -69,8 +84,155 @@ class DOICoreActionCheck(DOICoreAction):
             help='The email address of the user to register as author of the '
                  'check action'
         )
+        action_parser.add_argument(
+            '-d', '--daemon', required=False, action='store_true',
+            help='If provided, the check action keeps running and checks '
+                 'pending DOIs at the interval configured by '
+                 'check_daemon_interval, until it receives SIGTERM or SIGINT'
+        )
+        action_parser.add_argument(
+            '-w', '--worker-id', required=False, metavar='"worker-1"',
+            help='Identifies this check process when several share the '
+                 'database. Workers with distinct identifiers split the '
+                 'pending DOIs between them. Defaults to check_worker_id '
+                 'from the configuration, or the host name.'
+        )
+
+    def _query_osti(self, query_dict):
+        """Submits a record list query to the configured OSTI server."""
+        return DOIOstiWebClient().webclient_query_doi(
+            self._config.get('OSTI', 'url'), query_dict,
+            i_username=self._config.get('OSTI', 'user'),
+            i_password=self._config.get('OSTI', 'password')
+        )
+
+    @staticmethod
+    def _get_updated_after(pending_state_list, check_state=None, watermark=None):
+        """
+        Returns the date from which OSTI should report record updates for the
+        provided pending records.
+
+        Each pending record was updated at OSTI when it was released, and any
+        change since its last individual check has been updated at OSTI after
+        that, so the oldest of these times bounds all the changes we care
+        about. Once checks have covered every pending record, anything that
+        changed since has been updated after the oldest of their start times
+        (the watermark) as well, so the later of the two bounds is used.
+        A day is subtracted since OSTI only filters on calendar dates.
+        """
+        check_state = check_state or {}
+
+        updated_after = min(
+            DOICoreActionCheck._from_timestamp(check_state[pending_record['doi']][0])
+            if pending_record['doi'] in check_state
+            else DOICoreActionCheck._get_pending_since(pending_record)
+            for pending_record in pending_state_list
+        )
+
+        if watermark is not None:
+            updated_after = max(updated_after,
+                                DOICoreActionCheck._from_timestamp(watermark))
+
+        return updated_after - datetime.timedelta(days=1)
+
+    @staticmethod
+    def _get_pending_since(pending_record):
+        """Returns the local time a pending record was last updated."""
+        return datetime.datetime.fromisoformat(pending_record['update_date']).replace(tzinfo=None)
+
+    @staticmethod
+    def _to_timestamp(local_time):
+        """Converts a local time to Unix Time, the same way the doi table does."""
+        return local_time.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+    @staticmethod
+    def _from_timestamp(timestamp):
+        """Converts Unix Time written by _to_timestamp() back to local time."""
+        return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).replace(tzinfo=None)
+
+    def _get_poll_interval(self, pending_record, check_time):
+        """
+        Returns how long to wait between individual OSTI queries for a pending
+        record. The interval grows with the time the record has been pending,
+        within the configured bounds.
+        """
+        min_poll_interval = datetime.timedelta(
+            seconds=int(self._config.get('OTHER', 'check_min_poll_interval'))
+        )
+        max_poll_interval = datetime.timedelta(
+            seconds=int(self._config.get('OTHER', 'check_max_poll_interval'))
+        )
+        backoff_factor = float(self._config.get('OTHER', 'check_poll_backoff_factor'))
+
+        pending_for = check_time - self._get_pending_since(pending_record)
+
+        return min(max_poll_interval, max(min_poll_interval, pending_for * backoff_factor))
+
+    def _is_due_for_check(self, pending_record, check_state, check_time):
+        """
+        Determines whether a pending record missing from the batched OSTI
+        results should be queried on its own during this check.
+        """
+        if pending_record['doi'] not in check_state:
+            return True
+
+        last_checked, _ = check_state[pending_record['doi']]
+        last_checked = self._from_timestamp(last_checked)
+
+        return check_time - last_checked >= self._get_poll_interval(pending_record, check_time)
+
+    def _get_updated_records_from_osti(self, updated_after):
+        """
+        Queries OSTI, one page at a time, for every record updated after the
+        provided date.
+
+        Parameters
+        ----------
+        updated_after : datetime.datetime
+            Only records updated at OSTI after this date are returned.
+
+        Returns
+        -------
+        updated_records : dict
+            Single-record OSTI labels keyed by DOI value.
+
+        """
+        page_size = int(self._config.get('OSTI', 'query_page_size'))
+        updated_records = {}
+        previous_record_labels = None
+        start = 0
+
+        while True:
+            query_dict = {
+                'updated_after': updated_after.strftime('%m/%d/%Y'),
+                'start': start,
+                'rows': page_size
+            }
+
+            doi_xml = self._query_osti(query_dict)
+            record_labels = DOIOstiWebParser.get_record_labels(doi_xml)
+
+            updated_records.update(
+                (doi_value, record_label)
+                for doi_value, record_label in record_labels if doi_value
+            )
+
+            # Stop on the last (partial or empty) page, or if the server
+            # ignores the start of the page and hands back the same one again.
+            # A full page of records without a DOI is not the last one.
+            if (len(record_labels) < page_size
+                    or record_labels == previous_record_labels):
+                break
+
+            previous_record_labels = record_labels
+            start += page_size
+
+        logger.info(f"{len(updated_records)} record(s) updated at OSTI after "
+                    f"{updated_after.date()}")
+
+        return updated_records
 
-    def _update_transaction_db_when_needed(self, pending_record):
+    def _update_transaction_db_when_needed(self, pending_record, doi_xml=None):
         """
         Processes the result from the one 'check' query to OSTI server.
 
@@ -79,18 +241,22 @@ class DOICoreActionCheck(DOICoreAction):
         updated.
 
         :param pending_record:
-        :return: o_doi_updated:
+        :param doi_xml: the OSTI label for the pending record, as returned by
+                        the batched query. If not provided, OSTI is queried
+                        for this DOI alone.
+        :return: doi: the Doi object parsed from the OSTI response, or None
+                      if OSTI has no record for the pending DOI.
 
         """
-        doi_value = pending_record['doi']
-        query_dict = {'doi': doi_value}
-        doi_xml = DOIOstiWebClient().webclient_query_doi(
-            self._config.get('OSTI', 'url'), query_dict,
-            i_username=self._config.get('OSTI', 'user'),
-            i_password=self._config.get('OSTI', 'password')
-        )
+        if doi_xml is None:
+            doi_value = pending_record['doi']
+            query_dict = {'doi': doi_value}
+            doi_xml = self._query_osti(query_dict)
+
         dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(doi_xml)
 
+        doi = None
+
         if dois:
             doi = dois[0]
 
@@ -112,7 +278,7 @@ class DOICoreActionCheck(DOICoreAction):
                 + f"{pending_record['lid']}::{pending_record['vid']} no found at OSTI"
             )
 
-        return pending_record
+        return doi
 
     def _get_distinct_nodes_and_submitters(self, i_check_result):
         """
@@ -146,6 +312,7 @@ class DOICoreActionCheck(DOICoreAction):
         """
         Prepares an attachment by converting i_dicts_per_submitter to a JSON
         text and returns the o_attachment_part as MIMEMultipart object.
+        The attachment is built in memory, nothing is written to disk.
         """
         # Only do the import if sending an attachment file along with the email.
         from email.mime.multipart import MIMEMultipart
@@ -161,10 +328,6 @@ class DOICoreActionCheck(DOICoreAction):
         now_is = datetime.datetime.now().isoformat()
         o_attachment_filename = 'doi_status_attachment_on_' + now_is + '.txt'
 
-        # Write the text to disk so the file can be sent as an attachment.
-        with open(o_attachment_filename, 'w+') as file_ptr:
-            file_ptr.write(attachment_text)
-
         o_attachment_part = MIMEMultipart()
         part = MIMEBase('application', 'text')
         part.add_header('Content-Disposition',
@@ -172,12 +335,27 @@ class DOICoreActionCheck(DOICoreAction):
         part.set_payload(attachment_text)
         o_attachment_part.attach(part)
 
-        # Must return the attachment filename so it can be deleted after the
-        # email has been successfully sent.
-        return o_attachment_filename, o_attachment_part
+        return o_attachment_part
 
-    def _prepare_email_entire_message(self, i_dicts_per_submitter):
-        renderer = pystache.Renderer()
+    @staticmethod
+    def _parse_email_templates():
+        """
+        Returns the parsed templates of the status report email, so a check
+        run only looks them up once however many emails it sends.
+        """
+        return tuple(get_template_cache().get_template(join(dirname(__file__), template_name))
+                     for template_name in ('emailer_template_part_1-mustache.json',
+                                           'emailer_template_part_2-mustache.json'))
+
+    def _prepare_email_entire_message(self, i_dicts_per_submitter,
+                                      email_templates=None, renderer=None):
+        if email_templates is None:
+            email_templates = self._parse_email_templates()
+
+        if renderer is None:
+            renderer = pystache.Renderer()
+
+        email_part1_template, email_part2_template = email_templates
         today = date.today()
 
         # There is an 'Id' column in the email content so that field needs to be
@@ -196,14 +374,12 @@ class DOICoreActionCheck(DOICoreAction):
             'my_date': today.strftime("%m/%d/%Y"),
             'my_records_count': len(i_dicts_per_submitter)
         }
-        email_part1_template = join(dirname(__file__), 'emailer_template_part_1-mustache.json')
-        email_part_1 = renderer.render_path(email_part1_template, header_dict)
+        email_part_1 = renderer.render(email_part1_template, header_dict)
 
         # Build the email second part containing the table of DOIs with status
         # changed: "1  21940  Laboratory Shocked Feldspars Bundle  10.17189/21940  Pending  Reserved"
-        email_part2_template = join(dirname(__file__), 'emailer_template_part_2-mustache.json')
-        email_part_2 = renderer.render_path(email_part2_template,
-                                            {'dois': i_dicts_per_submitter})
+        email_part_2 = renderer.render(email_part2_template,
+                                       {'dois': i_dicts_per_submitter})
 
         o_email_entire_message = email_part_1 + "\n" + email_part_2
         logger.debug(f"o_email_entire_message {o_email_entire_message}")
@@ -229,8 +405,7 @@ class DOICoreActionCheck(DOICoreAction):
 
             msg.set_content(email_entire_message)
 
-            (attachment_filename,
-             attachment_part) = self._prepare_attachment(o_dicts_per_node)
+            attachment_part = self._prepare_attachment(o_dicts_per_node)
 
             # The attachment is now 'attached' in the msg object.
             msg.add_attachment(attachment_part)
@@ -238,10 +413,6 @@ class DOICoreActionCheck(DOICoreAction):
             # Send the email with attachment file.
             self._emailer.send_message(msg)
 
-            # Delete the temporary attached file.
-            if os.path.isfile(attachment_filename):
-                os.remove(attachment_filename)
-
     def _group_dois_updated_records_and_email(self, i_check_result,
                                               to_send_mail_flag=False,
                                               to_send_attachment_flag=False):
@@ -270,82 +441,365 @@ class DOICoreActionCheck(DOICoreAction):
         # and 'distinct_submitters', 'distinct_records' as values for each node.
         o_distinct_info = self._get_distinct_nodes_and_submitters(i_check_result)
 
-        # For each node, e.g 'img','naif', get all records for that node and
-        # send an email for all submitters of that node, along with the receivers.
-        for node_key in list(o_distinct_info.keys()):
-            # Build a list of unique recipients for the emailer.
-            # Make a copy since we need a new email list for that node.
-            final_receivers = deepcopy(email_receivers)
+        # Parse the email templates once for all the nodes.
+        email_templates = self._parse_email_templates()
+        renderer = pystache.Renderer()
 
-            # Add emails of all submitters for that node.
-            final_receivers.union(
-                o_distinct_info[node_key]['distinct_submitters']
-            )
+        # Send all the emails of this check over a single SMTP session.
+        if to_send_mail_flag:
+            self._emailer.open_session()
+
+        try:
+            # For each node, e.g 'img','naif', get all records for that node and
+            # send an email for all submitters of that node, along with the receivers.
+            for node_key in list(o_distinct_info.keys()):
+                # Build a list of unique recipients for the emailer.
+                # Make a copy since we need a new email list for that node.
+                final_receivers = deepcopy(email_receivers)
+
+                # Add emails of all submitters for that node.
+                final_receivers.union(
+                    o_distinct_info[node_key]['distinct_submitters']
+                )
+
+                now_is = datetime.datetime.now().isoformat()
+                subject_field = f"DOI Submission Status Report For Node {node_key} On {now_is}"
+
+                # Convert a list of dict to JSON text to make it human readable.
+                dois_per_node = [
+                    element['doi']
+                    for element in o_distinct_info[node_key]['distinct_records']
+                ]
+                logger.debug(
+                    "NUM_RECORDS_PER_NODE_AND_SUBMITTERS "
+                    f"{node_key, dois_per_node, len(dois_per_node), o_distinct_info[node_key]['distinct_submitters']}"
+                )
 
-            now_is = datetime.datetime.now().isoformat()
-            subject_field = f"DOI Submission Status Report For Node {node_key} On {now_is}"
-
-            # Convert a list of dict to JSON text to make it human readable.
-            dois_per_node = [
-                element['doi']
-                for element in o_distinct_info[node_key]['distinct_records']
-            ]
-            logger.debug(
-                "NUM_RECORDS_PER_NODE_AND_SUBMITTERS "
-                f"{node_key, dois_per_node, len(dois_per_node), o_distinct_info[node_key]['distinct_submitters']}"
+                # Prepare the email message using all the dictionaries (records
+                # associated with that node).
+                email_entire_message = self._prepare_email_entire_message(
+                    o_distinct_info[node_key]['distinct_records'],
+                    email_templates, renderer
+                )
+                logger.debug(f"email_entire_message {email_entire_message}")
+
+                # Finally, send the email with all status changed per node.
+                # The report is for a particular node, e.g 'img' send to all submitters
+                # for that node (along with other recipients in final_receivers)
+                if to_send_mail_flag:
+                    self._send_email(
+                        to_send_attachment_flag, email_sender, final_receivers,
+                        subject_field, email_entire_message,
+                        o_distinct_info[node_key]['distinct_records']
+                    )
+        finally:
+            self._emailer.close_session()
+
+    def _get_lock_file(self):
+        """
+        Returns the path of the file lock for this worker, derived from
+        check_lock_path and the worker identifier. A relative check_lock_path
+        is resolved against the directory of the database, so every check
+        sharing a database takes the same lock wherever it was started from.
+        """
+        lock_file = self._config.get('OTHER', 'check_lock_path')
+
+        if not os.path.isabs(lock_file):
+            database = self.m_transaction_builder.get_doi_database_writer()
+            lock_file = os.path.join(
+                os.path.dirname(os.path.abspath(database.get_database_name())), lock_file
             )
 
-            # Prepare the email message using all the dictionaries (records
-            # associated with that node).
-            email_entire_message = self._prepare_email_entire_message(
-                o_distinct_info[node_key]['distinct_records']
+        root, ext = os.path.splitext(lock_file)
+        worker_id = re.sub(r'[^\w.-]', '_', self._worker_id)
+
+        return f'{root}-{worker_id}{ext}'
+
+    def _acquire_lock(self):
+        """
+        Acquires the file lock ensuring only one check runs at a time for
+        this worker identifier.
+
+        Raises
+        ------
+        CriticalDOIException
+            If another check process already holds the lock.
+
+        """
+        lock_file = self._get_lock_file()
+        lock = FileLock(lock_file, timeout=0)
+
+        try:
+            lock.acquire()
+        except Timeout:
+            raise CriticalDOIException(
+                f'Another check process holds the lock {lock_file}, '
+                f'only one may run at a time as worker {self._worker_id}.'
             )
-            logger.debug(f"email_entire_message {email_entire_message}")
-
-            # Finally, send the email with all status changed per node.
-            # The report is for a particular node, e.g 'img' send to all submitters
-            # for that node (along with other recipients in final_receivers)
-            if to_send_mail_flag:
-                self._send_email(
-                    to_send_attachment_flag, email_sender, final_receivers,
-                    subject_field, email_entire_message,
-                    o_distinct_info[node_key]['distinct_records']
+
+        return lock
+
+    def _claim_pending_records(self, database, pending_state_list):
+        """
+        Claims leases on a batch of pending records so no other worker checks
+        them at the same time.
+
+        Returns
+        -------
+        claimed_records : list of dict
+            The pending records this worker holds a lease on, in list order.
+
+        """
+        lease_duration = int(self._config.get('OTHER', 'check_lease_duration'))
+        batch_size = int(self._config.get('OTHER', 'check_lease_batch_size'))
+        now = time.time()
+
+        for pending_record in pending_state_list:
+            if not pending_record['doi']:
+                logger.warning(
+                    f"Pending record {pending_record['lid']}::{pending_record['vid']} "
+                    "has no DOI, skipping"
                 )
 
-    def run(self, **kwargs):
+        # Offer the records covered by a check the longest time ago first, so
+        # batches smaller than the pending list still reach all of them
+        # over successive checks.
+        check_coverage = database.select_check_coverage()
+        pending_dois = sorted(
+            (pending_record['doi'] for pending_record in pending_state_list
+             if pending_record['doi']),
+            key=lambda doi: check_coverage.get(doi) or 0
+        )
+
+        claimed_dois = set(
+            database.claim_check_leases(
+                self._worker_id, pending_dois, now + lease_duration, batch_size, now
+            )
+        )
+
+        return [pending_record for pending_record in pending_state_list
+                if pending_record['doi'] in claimed_dois]
+
+    def _renew_leases_when_needed(self, database, claimed_records, lease_renewed):
         """
-        Queries the local database for latest Pending state records and checks
-        the OSTI server for all the records with criteria specified in
-        query_criterias, returning the results either in JSON or XML.
+        Renews the leases on the claimed records once half of the lease
+        duration has elapsed since lease_renewed. Returns the time of the
+        last renewal.
+        """
+        lease_duration = int(self._config.get('OTHER', 'check_lease_duration'))
+        now = time.time()
+
+        if now - lease_renewed >= lease_duration / 2:
+            database.renew_check_leases(
+                self._worker_id,
+                [pending_record['doi'] for pending_record in claimed_records],
+                now + lease_duration
+            )
+            lease_renewed = now
 
-        Once the query is returned, every record is checked against its initial
-        status and the status returned from OSTI. If the status has changed from
-        initial, this function writes a new record to the database.
+        return lease_renewed
 
-        All parameters are optional and may be useful for tests.
+    def _advance_watermark_when_covered(self, database, pending_dois, check_time):
+        """
+        Moves the watermark up to the oldest start of the checks that last
+        covered each pending DOI, whichever worker ran them. Everything
+        updated at OSTI before then has been seen for every pending record,
+        so the next check only needs to ask for what changed since. While a
+        pending DOI has never been covered, the watermark is left alone.
+        """
+        if not pending_dois:
+            database.write_check_watermark(self._to_timestamp(check_time))
+            return
+
+        check_coverage = database.select_check_coverage()
+        last_covered = [check_coverage.get(doi) for doi in pending_dois]
+
+        if None in last_covered:
+            logger.debug("Not every pending record has been covered by a check, "
+                         "keeping the watermark")
+            return
+
+        watermark = database.select_check_watermark()
+
+        if watermark is None or min(last_covered) > watermark:
+            database.write_check_watermark(min(last_covered))
 
+    def _handle_shutdown_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, shutting down after the "
+                    "current check cycle")
+        self._shutdown.set()
+
+    def _get_daemon_delay(self):
+        """Returns the number of seconds to wait before the next check cycle."""
+        interval = float(self._config.get('OTHER', 'check_daemon_interval'))
+        jitter = float(self._config.get('OTHER', 'check_daemon_jitter'))
+
+        # Spread cycles out so they do not always hit OSTI at the same time.
+        return max(0.0, interval + random.uniform(-jitter, jitter))
+
+    def _run_daemon(self):
         """
-        self.parse_arguments(kwargs)
+        Runs check cycles until a SIGTERM or SIGINT is received. An error in
+        one cycle is logged and does not stop the following ones.
+
+        Returns
+        -------
+        pending_state_list : list of dict
+            The result of the last completed check cycle.
 
+        """
         pending_state_list = []
 
+        previous_handlers = {
+            signum: signal.signal(signum, self._handle_shutdown_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        try:
+            while not self._shutdown.is_set():
+                try:
+                    pending_state_list = self._run_check()
+                except Exception as err:
+                    logger.error(f"Check cycle failed: {str(err)}")
+
+                delay = self._get_daemon_delay()
+                logger.info(f"Next check cycle in {delay:.0f} seconds")
+
+                # Returns early when a shutdown signal is received.
+                self._shutdown.wait(delay)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+        logger.info("Check daemon stopped")
+
+        return pending_state_list
+
+    def _run_check(self):
+        """
+        Performs a single check cycle. See run() for details.
+        """
+        pending_state_list = []
+
+        database = self.m_transaction_builder.get_doi_database_writer()
+        check_time = datetime.datetime.now()
+
         # Get the list of latest rows in database with status = 'Pending'.
         o_doi_list = self._list_obj.run(status=DoiStatus.Pending)
 
         if len(o_doi_list) > 0:
             pending_state_list = json.loads(o_doi_list)
 
-            for pending_record in pending_state_list:
-                logger.debug(f"pending_record {pending_record}")
-                self._update_transaction_db_when_needed(pending_record)
+        num_pending = len(pending_state_list)
+        pending_dois = [pending_record['doi'] for pending_record in pending_state_list
+                        if pending_record['doi']]
 
-            self._group_dois_updated_records_and_email(
-                pending_state_list, self._email, self._attachment
-            )
+        # Only check the records this worker holds a lease on, other workers
+        # sharing the database take care of the rest.
+        pending_state_list = self._claim_pending_records(database, pending_state_list)
+
+        logger.info(f"Worker {self._worker_id} claimed {len(pending_state_list)} "
+                    f"of {num_pending} pending record(s)")
+
+        if pending_state_list:
+            lease_renewed = time.time()
+
+            try:
+                check_state = database.select_check_state()
+
+                # Fetch everything that changed at OSTI since these records
+                # were last checked in a single paged query, rather than
+                # asking about each pending record in turn.
+                updated_records = self._get_updated_records_from_osti(
+                    self._get_updated_after(pending_state_list, check_state,
+                                            database.select_check_watermark())
+                )
+
+                checked_states = []
+
+                for pending_record in pending_state_list:
+                    logger.debug(f"pending_record {pending_record}")
+                    doi_xml = updated_records.get(pending_record['doi'])
+
+                    # Records missing from the batched results have not changed
+                    # since they were last checked, but are still queried on
+                    # their own every so often, backing off the longer they
+                    # stay pending.
+                    if doi_xml is None and not self._is_due_for_check(
+                            pending_record, check_state, check_time):
+                        logger.debug(f"Skipping check of {pending_record['doi']}, "
+                                     "not due yet")
+                        continue
+
+                    lease_renewed = self._renew_leases_when_needed(
+                        database, pending_state_list, lease_renewed
+                    )
+
+                    doi = self._update_transaction_db_when_needed(pending_record, doi_xml)
+
+                    checked_states.append(
+                        (pending_record['doi'], self._to_timestamp(check_time),
+                         doi.date_record_updated if doi else None)
+                    )
+
+                database.write_check_state(checked_states)
+
+                # Every claimed record, checked or not yet due, has had all
+                # its updates at OSTI before this check started reported by
+                # the batched query.
+                database.write_check_coverage(
+                    [pending_record['doi'] for pending_record in pending_state_list],
+                    self._to_timestamp(check_time)
+                )
+
+                self._group_dois_updated_records_and_email(
+                    pending_state_list, self._email, self._attachment
+                )
+            finally:
+                database.release_check_leases(
+                    self._worker_id,
+                    [pending_record['doi'] for pending_record in pending_state_list]
+                )
+
+        self._advance_watermark_when_covered(database, pending_dois, check_time)
 
         # Return a list of DOIs updated or still in pending status.
         # List can be empty meaning no records have changed from 'Pending'
         # to something else.
         return pending_state_list
 
+    def run(self, **kwargs):
+        """
+        Queries the local database for latest Pending state records and checks
+        the OSTI server for all the records with criteria specified in
+        query_criterias, returning the results either in JSON or XML.
+
+        Once the query is returned, every record is checked against its initial
+        status and the status returned from OSTI. If the status has changed from
+        initial, this function writes a new record to the database.
+
+        The time each record was checked, and the start time of the whole check,
+        are persisted so the next run only asks OSTI about what changed since.
+
+        When run as a daemon, checks are repeated until the process receives
+        SIGTERM or SIGINT. In either mode a file lock prevents several checks
+        from running at once under the same worker identifier. Workers with
+        distinct identifiers may share the database: each claims an expiring
+        lease on a batch of pending records and only checks those.
+
+        All parameters are optional and may be useful for tests.
+
+        """
+        self.parse_arguments(kwargs)
+
+        lock = self._acquire_lock()
+
+        try:
+            if self._daemon:
+                return self._run_daemon()
+
+            return self._run_check()
+        finally:
+            lock.release()
+
 # end class DOICoreActionCheck(DOICoreAction):
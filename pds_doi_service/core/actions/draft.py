@@ -13,15 +13,22 @@ draft.py
 Contains the definition for the Draft action of the Core PDS DOI Service.
 """
 
-import copy
-import os
-import requests
+import argparse
+import collections
+import hashlib
+import inspect
+import itertools
+import pickle
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO
 from lxml import etree
-from os.path import exists, join
+from os.path import dirname, exists, join
 
+import pds_doi_service
 from pds_doi_service.core.actions.action import DOICoreAction
 from pds_doi_service.core.actions.list import DOICoreActionList
-from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
+from pds_doi_service.core.input.bundle_crawler import DOIBundleCrawler
 from pds_doi_service.core.input.exceptions import (UnknownNodeException,
                                                    DuplicatedTitleDOIException,
                                                    UnexpectedDOIActionException,
@@ -30,6 +37,7 @@ from pds_doi_service.core.input.exceptions import (UnknownNodeException,
                                                    InputFormatException,
                                                    WarningDOIException,
                                                    CriticalDOIException)
+from pds_doi_service.core.input.input_resolver import DOIInputResolver
 from pds_doi_service.core.input.node_util import NodeUtil
 from pds_doi_service.core.input.osti_input_validator import OSTIInputValidator
 from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil
@@ -37,18 +45,39 @@ from pds_doi_service.core.outputs.osti import DOIOutputOsti
 from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
 from pds_doi_service.core.util.doi_validator import DOIValidator
 from pds_doi_service.core.util.general_util import get_logger
+from pds_doi_service.core.util import keyword_engines, keyword_tokenizer
 
 logger = get_logger('pds_doi_service.core.actions.draft')
 
+# Draft action used by each process of the pool started with --workers
+_worker_draft_action = None
+
+
+def _init_draft_worker(db_name, offline):
+    """Creates the draft action used by a worker process of the pool."""
+    global _worker_draft_action
+    _worker_draft_action = DOICoreActionDraft(db_name=db_name)
+    _worker_draft_action._http_cache.offline = offline
+
+
+def _prepare_draft_file(input_file, contributor_value, keywords, input_content):
+    """Runs the database-independent steps of a draft in a worker process."""
+    return _worker_draft_action._prepare_single_file(
+        input_file, contributor_value, keywords, input_content
+    )
+
 
 class DOICoreActionDraft(DOICoreAction):
     _name = 'draft'
     _description = 'Prepare an OSTI record from PDS4 labels'
     _order = 10
-    _run_arguments = ('input', 'node', 'submitter', 'lidvid', 'force', 'keyword')
+    _run_arguments = ('input', 'node', 'submitter', 'lidvid', 'force', 'keyword',
+                      'workers', 'include', 'exclude', 'max_depth', 'offline',
+                      'bundle_url', 'output')
 
     def __init__(self, db_name=None):
         super().__init__(db_name=db_name)
+        self._db_name = db_name
         self._doi_validator = DOIValidator(db_name=db_name)
         self._list_obj = DOICoreActionList(db_name=db_name)
 
@@ -59,6 +88,21 @@ class DOICoreActionDraft(DOICoreAction):
         self._force = False
         self._target = None
         self._keyword = None
+        self._workers = 1
+        self._include = None
+        self._exclude = None
+        self._max_depth = 0
+        self._offline = False
+        self._bundle_url = None
+        self._output = None
+
+        # Remote input labels are read through the same cache used to
+        # archive them with their transaction.
+        self._http_cache = self.m_transaction_builder.get_transaction_logger().get_http_cache()
+
+        # Digest of what drafted records depend on besides the input labels,
+        # computed on first use of the draft cache.
+        self._draft_cache_version = None
 
     @classmethod
     def add_to_subparser(cls, subparsers):
@@ -72,8 +116,10 @@ class DOICoreActionDraft(DOICoreAction):
             '-i', '--input', required=False,
             metavar='input/bundle_in_with_contributors.xml',
             help='An input PDS4 label. May be a local path or an HTTP address '
-                 'resolving to a label file. Multiple inputs may be provided '
-                 'via comma-delimited list. Must be provided if --lidvid is not '
+                 'resolving to a label file, or a local directory or .zip, .tar '
+                 'or .tar.gz archive of labels, read without being extracted. '
+                 'Multiple inputs may be provided via comma-delimited list. '
+                 'Must be provided if neither --lidvid nor --bundle-url is '
                  'specified.'
         )
         action_parser.add_argument(
@@ -91,6 +137,14 @@ class DOICoreActionDraft(DOICoreAction):
             help='A LIDVID for an existing DOI record to move back to draft '
                  'status. Must be provided if --input is not specified.'
         )
+        action_parser.add_argument(
+            '-b', '--bundle-url', required=False,
+            metavar='https://pds-imaging.jpl.nasa.gov/data/nsyt/insight_cameras/bundle.xml',
+            help='The HTTP address of a PDS4 bundle label to draft, along with '
+                 'the collections listed by its Bundle_Member_Entry elements. '
+                 'The collection labels are requested concurrently, and the '
+                 'draft fails if any of them cannot be requested.'
+        )
         action_parser.add_argument(
             '-f', '--force', required=False, action='store_true',
             help='If provided, forces the action to proceed even if warnings are '
@@ -109,6 +163,44 @@ class DOICoreActionDraft(DOICoreAction):
             help='The system target to mint the DOI. Currently, only the value '
                  '"osti" is supported.'
         )
+        action_parser.add_argument(
+            '-w', '--workers', required=False, type=int, default=1, metavar='4',
+            help='Number of processes used to parse, render and validate the '
+                 'input labels in parallel. Records are still written to the '
+                 'database one at a time, in input order. Defaults to 1.'
+        )
+        action_parser.add_argument(
+            '--include', required=False, metavar='"bundle_*.xml,collection_*.xml"',
+            help='Glob patterns of the file names to draft when crawling input '
+                 'directories. Multiple patterns must be separated by ",". '
+                 'All files are drafted if not provided.'
+        )
+        action_parser.add_argument(
+            '--exclude', required=False, metavar='"*_inventory.xml,browse"',
+            help='Glob patterns of the file and directory names to skip when '
+                 'crawling input directories. Multiple patterns must be '
+                 'separated by ",".'
+        )
+        action_parser.add_argument(
+            '--max-depth', required=False, type=int, default=0, metavar='2',
+            help='Number of levels of subdirectories to crawl below input '
+                 'directories. Defaults to 0, only drafting the files directly '
+                 'within them. All the labels within archives are drafted.'
+        )
+        action_parser.add_argument(
+            '--offline', required=False, action='store_true',
+            help='If provided, remote input labels are only read from the HTTP '
+                 'cache, as left by previous runs, rather than requested.'
+        )
+        action_parser.add_argument(
+            '-o', '--output', required=False, type=argparse.FileType('wb'),
+            metavar='drafts.xml',
+            help='A file to write the draft records to one at a time, as they '
+                 'are drafted, rather than printing them all once drafted. '
+                 'Keeps memory use flat for large batches. "-" writes them to '
+                 'the standard output. Ignored when used with the --lidvid '
+                 'option.'
+        )
 
     def _set_lidvid_to_draft(self, lidvid):
         """
@@ -181,7 +273,7 @@ class DOICoreActionDraft(DOICoreAction):
 
         return doi_label
 
-    def _draft_input_files(self, inputs):
+    def _draft_input_files(self, inputs, bundle_url=None):
         """
         Creates draft records for the list of input files/locations.
 
@@ -190,11 +282,15 @@ class DOICoreActionDraft(DOICoreAction):
         inputs : str
             Comma-delimited listing of the inputs to produce draft records for.
             These may be local paths to a file or directory, or remote URLs.
+        bundle_url : str, optional
+            URL of a remote bundle label to produce draft records for, along
+            with the collections of the bundle.
 
         Returns
         -------
         doi_label : str
-            A OSTI XML label containing the draft records for requested inputs.
+            A OSTI XML label containing the draft records for requested inputs,
+            or None if they were written to the output file.
 
         Raises
         ------
@@ -205,76 +301,251 @@ class DOICoreActionDraft(DOICoreAction):
         try:
             contributor_value = NodeUtil().get_node_long_name(self._node)
 
-            # The value of input can be a list of names, or a directory.
-            # Resolve that to a list of names.
-            list_of_names = self._resolve_input_into_list_of_names(inputs)
+            # The value of input can be a list of names, directories or
+            # archives. Resolve that to the input files, crawled as they are
+            # drafted. The labels within archives are read as they are found,
+            # other input files are read when prepared.
+            input_files_and_contents = DOIInputResolver(
+                include=DOIInputResolver.split_patterns(self._include),
+                exclude=DOIInputResolver.split_patterns(self._exclude),
+                max_depth=self._max_depth
+            ).resolve_contents(inputs or [], extensions=('.xml',))
+
+            # The labels of a bundle are read as it is crawled.
+
+            if bundle_url:
+                input_files_and_contents = itertools.chain(
+                    input_files_and_contents,
+                    DOIBundleCrawler(self._http_cache).crawl(bundle_url)
+                )
+
+            # For each name found, transform the PDS4 label to an OSTI label.
+            # It is possible that the value of doi_label is None if the file
+            # is not a valid label.
+            doi_labels = (doi_label for doi_label
+                          in self._run_files(input_files_and_contents, contributor_value)
+                          if doi_label)
+            osti_output = DOIOutputOsti()
+
+            # Write each record to the output as soon as it is drafted, so
+            # records do not pile up in memory. The records output are the
+            # ones validated and written to the transactions.
+            if self._output:
+                osti_output.write_osti_label_records(doi_labels, self._output)
+                return None
 
             # OSTI uses 'records' as the root tag.
             o_doi_labels = etree.Element("records")
 
-            # For each name found, transform the PDS4 label to an OSTI record,
-            # then concatenate that record to o_doi_label to return.
-            for input_file in list_of_names:
-                doi_label = self._run_single_file(
-                    input_file, self._node, self._submitter, contributor_value,
-                    self._force, self._keyword
-                )
+            for record in osti_output.iter_label_records(doi_labels):
+                o_doi_labels.append(record)
 
-                # It is possible that the value of doi_label is None if the file
-                # is not a valid label.
-                if not doi_label:
-                    continue
+            return etree.tostring(o_doi_labels, pretty_print=True).decode()
+        except (UnknownNodeException, InputFormatException) as err:
+            raise CriticalDOIException(str(err))
 
-                # Concatenate each label to o_doi_labels to return.
-                doc = etree.fromstring(doi_label.encode())
+    # The configuration options, by section, that a drafted record depends
+    # on. Others, such as the OSTI credentials, do not change drafted records
+    # and are left out of the draft cache version.
+    _draft_cache_config_options = {
+        'PDS4_DICTIONARY': ('url', 'pds_node_identifier'),
+        'LANDING_PAGES': ('url',),
+        'OTHER': ('doi_publisher', 'draft_validate_against_xsd_flag',
+                  'keyword_engine', 'nltk_data_path')
+    }
+
+    @staticmethod
+    def _get_draft_cache_dependencies():
+        """
+        Returns the paths to the files a drafted record depends on: the
+        modules extracting a Doi object from a label and its keywords, and
+        the WordNet nouns they lemmatize keywords with, the cached Doi class,
+        the record builder and its template, and the schematron and XSD used
+        to validate the record.
+        """
+        return (__file__,
+                inspect.getfile(DOIPDS4LabelUtil),
+                inspect.getfile(keyword_tokenizer),
+                inspect.getfile(keyword_engines),
+                join(keyword_engines.WORDNET_DIR, 'noun_lemmas.txt.gz'),
+                join(keyword_engines.WORDNET_DIR, 'noun.exc.gz'),
+                inspect.getfile(Doi),
+                inspect.getfile(DOIOutputOsti),
+                join(dirname(inspect.getfile(DOIOutputOsti)), 'DOI_template_20200407-mustache.xml'),
+                join(dirname(inspect.getfile(OSTIInputValidator)), 'IAD3_scheematron.sch'),
+                join(dirname(inspect.getfile(DOIValidator)), 'iad_schema.xsd'))
+
+    def _get_draft_cache_version(self):
+        """
+        Returns a digest of everything besides the input label that a drafted
+        record depends on: the service version, the configuration options in
+        _draft_cache_config_options, and the files returned by
+        _get_draft_cache_dependencies().
 
-                for element in doc.iter():
-                    # OSTI uses 'record' tag for each record.
-                    if element.tag == 'record':
-                        # Add the 'record' element
-                        o_doi_labels.append(copy.copy(element))
+        Once computed, the records cached by any other version are evicted
+        from the draft cache, since they can no longer be used.
+        """
+        if self._draft_cache_version is None:
+            version = hashlib.sha256(pds_doi_service.__version__.encode())
 
-            # Make the output nice by indenting it.
-            etree.indent(o_doi_labels)
+            for section, keys in self._draft_cache_config_options.items():
+                for key in keys:
+                    value = self._config.get(section, key, fallback='')
+                    version.update(f'[{section}] {key} = {value}\n'.encode())
 
-            return etree.tostring(o_doi_labels, pretty_print=True).decode()
-        except UnknownNodeException as err:
-            raise CriticalDOIException(str(err))
+            for dependency in self._get_draft_cache_dependencies():
+                with open(dependency, 'rb') as infile:
+                    version.update(infile.read())
+
+            self._draft_cache_version = version.hexdigest()
+
+            database = self.m_transaction_builder.get_doi_database_writer()
+            database.evict_draft_cache(self._draft_cache_version)
+
+        return self._draft_cache_version
+
+    def _get_draft_cache_key(self, input_file, contributor_value, keywords,
+                             input_content=None):
+        """
+        Returns the key under which the draft of an input file is cached,
+        or None if the input file cannot be cached.
+
+        The key is the SHA-256 of the label bytes, combined with the cache
+        version and the contributor and extra keywords added to the record.
+        Only local .xml labels, including those read from archives, are cached.
+        """
+        if (self._config.get('OTHER', 'draft_cache_flag').lower() != 'true'
+                or input_file.startswith('http')
+                or not input_file.lower().endswith('.xml')):
+            return None
+
+        if input_content is not None:
+            label_digest = hashlib.sha256(input_content).hexdigest()
+        else:
+            try:
+                with open(input_file, 'rb') as infile:
+                    label_digest = hashlib.sha256(infile.read()).hexdigest()
+            except OSError:
+                # Let the draft itself report the error.
+                return None
+
+        return hashlib.sha256(
+            '\n'.join((self._get_draft_cache_version(), contributor_value,
+                       keywords or '', label_digest)).encode()
+        ).hexdigest()
 
-    def _resolve_input_into_list_of_names(self, input_labels):
+    def _get_cached_draft(self, cache_key):
         """
-        Receives a string of input labels which can be a single location
-        or a comma-delimited list of locations. The function returns the list
-        of names parsed from the input string.
+        Returns the (doi_label, doi_obj) pair cached under cache_key, or None
+        if there is none.
         """
-        o_list_of_names = []
-
-        # Split the input using a comma, then inspect each token to check
-        # if it is a local path or a URL.
-        split_tokens = input_labels.split(',')
-
-        for token in split_tokens:
-            # Only save the file name if it is not an empty string as in the
-            # case of a comma being the last character:
-            #    -i https://pds-imaging.jpl.nasa.gov/data/nsyt/insight_cameras/data/collection_data.xml,
-            # or no name provided with just a comma:
-            #    -i ,
-            if len(token) > 0:
-                if os.path.isdir(token):
-                    # Get all file names in the directory.
-                    # Note that the top level directory needs to precede the
-                    # file name in the for loop.
-                    list_of_names_from_token = [os.path.join(token, f)
-                                                for f in os.listdir(token)
-                                                if os.path.isfile(os.path.join(token, f))]
-
-                    o_list_of_names.extend(list_of_names_from_token)
+        if cache_key is None:
+            return None
+
+        database = self.m_transaction_builder.get_doi_database_writer()
+        cached_draft = database.select_draft_cache(cache_key)
+
+        if cached_draft is None:
+            return None
+
+        doi_label, doi_obj = cached_draft
+
+        return doi_label, pickle.loads(doi_obj)
+
+    def _cache_draft(self, cache_key, doi_label, doi_obj):
+        """
+        Caches the OSTI label and Doi object prepared, and validated, for an
+        input file.
+        """
+        if cache_key is None or not doi_label:
+            return
+
+        database = self.m_transaction_builder.get_doi_database_writer()
+        database.write_draft_cache(cache_key, doi_label, pickle.dumps(doi_obj),
+                                   self._get_draft_cache_version())
+
+    def _commit_draft(self, input_file, cache_key, draft, cached):
+        """
+        Commits the draft of an input file once it has been prepared, caching
+        it first if it was not taken from the draft cache. Returns the OSTI
+        label of the draft, or None if it was not committed.
+        """
+        if isinstance(draft, Future):
+            draft = draft.result()
+
+        doi_label, doi_obj, input_content = draft
+
+        if not cached:
+            self._cache_draft(cache_key, doi_label, doi_obj)
+
+        doi_obj = self._commit_single_file(
+            input_file, self._node, self._submitter, self._force,
+            doi_label, doi_obj, input_content
+        )
+
+        return doi_label if doi_obj else None
+
+    def _run_files(self, input_files_and_contents, contributor_value):
+        """
+        Drafts each of the provided (input file, content) pairs, yielding the
+        resulting OSTI labels (or None) in input order. The content is None
+        for input files that have not been read yet. Input files are only
+        consumed as they are drafted, so they may still be crawled.
+
+        Input files already drafted with the same content and configuration
+        are taken from the draft cache rather than prepared again.
+
+        With more than one worker, the other input files are parsed, rendered
+        and validated ahead in a pool of processes, while database validation
+        and transaction writes remain serialized in this process.
+        """
+        executor = None
+
+        if self._workers > 1:
+            logger.info(f"Drafting with {self._workers} workers")
+
+            executor = ProcessPoolExecutor(max_workers=self._workers,
+                                           initializer=_init_draft_worker,
+                                           initargs=(self._db_name, self._http_cache.offline))
+
+        # Number of input files prepared ahead of the one being committed
+        max_pending_drafts = 2 * self._workers if executor else 0
+        pending_drafts = collections.deque()
+
+        try:
+            for input_file, input_content in input_files_and_contents:
+                cache_key = self._get_draft_cache_key(input_file, contributor_value,
+                                                      self._keyword, input_content)
+                draft = self._get_cached_draft(cache_key)
+                cached = draft is not None
+
+                if cached:
+                    logger.info(f"input_file {input_file} unchanged, reusing cached draft")
+                    draft = draft + (input_content,)
+                elif executor is not None:
+                    draft = executor.submit(_prepare_draft_file, input_file,
+                                            contributor_value, self._keyword, input_content)
                 else:
-                    # The token is either the name of a file or a URL.
-                    # Either way, add it to the list.
-                    o_list_of_names.append(token)
+                    draft = self._prepare_single_file(input_file, contributor_value,
+                                                      self._keyword, input_content)
 
-        return o_list_of_names
+                pending_drafts.append((input_file, cache_key, draft, cached))
+
+                # Commit in input order as soon as enough work is queued up.
+                while len(pending_drafts) > max_pending_drafts:
+                    yield self._commit_draft(*pending_drafts.popleft())
+
+            while pending_drafts:
+                yield self._commit_draft(*pending_drafts.popleft())
+        finally:
+            if executor is not None:
+                # Do not keep preparing files once a record has failed.
+                # shutdown(cancel_futures=True) requires Python 3.9.
+                for _, _, draft, _ in pending_drafts:
+                    if isinstance(draft, Future):
+                        draft.cancel()
+
+                executor.shutdown()
 
     def _add_extra_keywords(self, keywords, io_doi):
         """
@@ -288,22 +559,25 @@ class DOICoreActionDraft(DOICoreAction):
 
         return io_doi
 
-    def _transform_pds4_label_into_osti_record(self, input_file,
-                                               contributor_value, keywords):
+    def _transform_pds4_label_into_osti_record(self, input_file, contributor_value,
+                                               keywords, input_content=None):
         """
         Receives an XML PDS4 input file and transforms it into an OSTI record.
+        The content of a remote input file is returned as well, so it may be
+        archived with the transaction as it was transformed. It is only
+        requested if not provided, as it is for archive members.
         """
         # Set to None to signify an input file that does not end with '.xml'
         o_doi_label = None
         o_doi = None
 
         # parse input_file
-        if not input_file.startswith('http'):
+        if input_content is None and not input_file.startswith('http'):
             # Only process .xml files and print WARNING for any other files,
             # then continue.
-            if input_file.endswith('.xml'):
+            if input_file.lower().endswith('.xml'):
                 try:
-                    xml_tree = etree.parse(input_file)
+                    xml_tree = DOIPDS4LabelUtil.parse_pds4_label(input_file)
                 except OSError as err:
                     msg = f'Error reading file {input_file}, reason: {str(err)}'
                     logger.error(msg)
@@ -312,12 +586,20 @@ class DOICoreActionDraft(DOICoreAction):
                 msg = f"File {input_file} was not processed, only .xml files " \
                       "are supported"
                 logger.warning(msg)
-                return o_doi_label, o_doi
+                return o_doi_label, o_doi, input_content
 
         else:
-            # A URL gets read into memory.
-            response = requests.get(input_file)
-            xml_tree = etree.fromstring(response.content)
+            # A URL gets read into memory, through the HTTP cache, unless
+            # already read like the members of an archive.
+            try:
+                if input_content is None:
+                    input_content = self._http_cache.get(input_file)
+
+                xml_tree = DOIPDS4LabelUtil.parse_pds4_label(BytesIO(input_content))
+            except OSError as err:
+                msg = f'Error reading file {input_file}, reason: {str(err)}'
+                logger.error(msg)
+                raise InputFormatException(msg)
 
         label_util = DOIPDS4LabelUtil(
             landing_page_template=self._config.get('LANDING_PAGES', 'url')
@@ -340,19 +622,23 @@ class DOICoreActionDraft(DOICoreAction):
         # Generate the output OSTI record
         o_doi_label = DOIOutputOsti().create_osti_doi_draft_record(o_doi)
 
-        # Return the label (which is text) and a dictionary 'o_doi' representing
-        # all values parsed.
-        return o_doi_label, o_doi
+        # Return the label (which is text), a dictionary 'o_doi' representing
+        # all values parsed and the content of a remote input file.
+        return o_doi_label, o_doi, input_content
 
-    def _run_single_file(self, input_file, node, submitter, contributor_value,
-                         force_flag, keywords=None):
+    def _prepare_single_file(self, input_file, contributor_value, keywords=None,
+                             input_content=None):
+        """
+        Transforms an input file into an OSTI record and validates it against
+        the schematron and XSD. Nothing is read from or written to the
+        database, so input files may be prepared in parallel.
+        """
         logger.info(f"input_file {input_file}")
-        logger.debug(f"force_flag,input_file {force_flag, input_file}")
 
         try:
             # Transform the PDS4 label to an OSTI record.
-            doi_label, doi_obj = self._transform_pds4_label_into_osti_record(
-                input_file, contributor_value, keywords
+            doi_label, doi_obj, input_content = self._transform_pds4_label_into_osti_record(
+                input_file, contributor_value, keywords, input_content
             )
 
             if doi_label:
@@ -364,6 +650,21 @@ class DOICoreActionDraft(DOICoreAction):
                 if self._config.get('OTHER', 'draft_validate_against_xsd_flag').lower() == 'true':
                     self._doi_validator.validate_against_xsd(doi_label)
 
+            return doi_label, doi_obj, input_content
+        except InputFormatException as err:
+            raise CriticalDOIException(err)
+
+    def _commit_single_file(self, input_file, node, submitter, force_flag,
+                            doi_label, doi_obj, input_content=None):
+        """
+        Validates a prepared OSTI record against the database and writes its
+        transaction, returning the committed Doi object. The content of a
+        remote input file, when provided, is archived rather than requested
+        again.
+        """
+        logger.debug(f"force_flag,input_file {force_flag, input_file}")
+
+        try:
             if doi_obj:
                 self._doi_validator.validate(doi_obj)
             else:
@@ -373,13 +674,13 @@ class DOICoreActionDraft(DOICoreAction):
             # related to writing a transaction.
             transaction = self.m_transaction_builder.prepare_transaction(
                 node, submitter, [doi_obj], input_path=input_file,
-                output_content=doi_label
+                output_content=doi_label, input_content=input_content
             )
 
             # Commit the transaction to the database
             transaction.log()
 
-            return doi_label
+            return doi_obj
         # Treat warnings as exceptions if force flag is not provided
         except (DuplicatedTitleDOIException, UnexpectedDOIActionException,
                 TitleDoesNotMatchProductTypeException) as err:
@@ -413,13 +714,16 @@ class DOICoreActionDraft(DOICoreAction):
         """
         self.parse_arguments(kwargs)
 
+        if self._offline:
+            self._http_cache.offline = True
+
         # Make sure we've been given something to work with
-        if self._input is None and self._lidvid is None:
-            raise ValueError('A value must be provided for either --input or '
-                             '--lidvid when using the Draft action.')
+        if self._input is None and self._lidvid is None and self._bundle_url is None:
+            raise ValueError('A value must be provided for either --input, '
+                             '--bundle-url or --lidvid when using the Draft action.')
 
         if self._lidvid:
             return self._set_lidvid_to_draft(self._lidvid)
 
-        if self._input:
-            return self._draft_input_files(self._input)
+        if self._input or self._bundle_url:
+            return self._draft_input_files(self._input, self._bundle_url)
@@ -13,11 +13,11 @@ reserve.py
 Contains the definition for the Reserve action of the Core PDS DOI Service.
 """
 
+import argparse
+import functools
 from datetime import datetime
 import os
-import requests
-
-from lxml import etree
+from io import BytesIO
 
 from pds_doi_service.core.actions.action import DOICoreAction
 from pds_doi_service.core.entities.doi import DoiStatus
@@ -29,6 +29,7 @@ from pds_doi_service.core.input.exceptions import (CriticalDOIException,
                                                    UnknownNodeException,
                                                    collect_exception_classes_and_messages,
                                                    raise_warn_exceptions)
+from pds_doi_service.core.input.input_resolver import DOIInputResolver
 from pds_doi_service.core.input.input_util import DOIInputUtil
 from pds_doi_service.core.input.node_util import NodeUtil
 from pds_doi_service.core.input.osti_input_validator import OSTIInputValidator
@@ -45,7 +46,8 @@ class DOICoreActionReserve(DOICoreAction):
     _name = 'reserve'
     _description = 'Create or update a DOI before the data is published'
     _order = 0
-    _run_arguments = ('input', 'node', 'submitter', 'dry_run', 'force')
+    _run_arguments = ('input', 'node', 'submitter', 'dry_run', 'force',
+                      'include', 'exclude', 'max_depth', 'offline', 'output')
 
     def __init__(self, db_name=None):
         super().__init__(db_name=db_name)
@@ -55,6 +57,19 @@ class DOICoreActionReserve(DOICoreAction):
         self._submitter = None
         self._force = False
         self._dry_run = True
+        self._include = None
+        self._exclude = None
+        self._max_depth = None
+        self._offline = False
+        self._output = None
+
+        # Remote input labels are read through the same cache used to
+        # archive them with their transaction.
+        self._http_cache = self.m_transaction_builder.get_transaction_logger().get_http_cache()
+
+        # Content of the remote input labels read, by URL, archived with the
+        # transaction instead of being requested again.
+        self._remote_input_contents = {}
 
     @classmethod
     def add_to_subparser(cls, subparsers):
@@ -81,6 +96,8 @@ class DOICoreActionReserve(DOICoreAction):
             metavar='input/DOI_Reserved_GEO_200318.csv',
             help='A PDS4 XML label, or XLS/CSV spreadsheet file with the '
                  'following columns: ' + ','.join(DOIInputUtil.MANDATORY_COLUMNS)
+                 + '. May also be a directory, or a .zip, .tar or .tar.gz archive '
+                   'read without being extracted, of such files.'
         )
         action_parser.add_argument(
             '-s', '--submitter-email', required=True,
@@ -93,29 +110,71 @@ class DOICoreActionReserve(DOICoreAction):
                  "OSTI. The record is logged to the local database with a status "
                  "of 'reserved_not_submitted'."
         )
+        action_parser.add_argument(
+            '--include', required=False, metavar='"DOI_Reserved_*.xlsx"',
+            help='Glob patterns of the file names to reserve DOIs for when '
+                 'crawling an input directory. Multiple patterns must be '
+                 'separated by ",". All files are read if not provided.'
+        )
+        action_parser.add_argument(
+            '--exclude', required=False, metavar='"*_broken.xlsx,archive"',
+            help='Glob patterns of the file and directory names to skip when '
+                 'crawling an input directory. Multiple patterns must be '
+                 'separated by ",".'
+        )
+        action_parser.add_argument(
+            '--max-depth', required=False, type=int, metavar='2',
+            help='Number of levels of subdirectories to crawl below an input '
+                 'directory. There is no limit if not provided, nor within '
+                 'archives.'
+        )
+        action_parser.add_argument(
+            '--offline', required=False, action='store_true',
+            help='If provided, remote input labels are only read from the HTTP '
+                 'cache, as left by previous runs, rather than requested.'
+        )
+        action_parser.add_argument(
+            '-o', '--output', required=False, type=argparse.FileType('wb'),
+            metavar='reserved.xml',
+            help='A file to write the reserved records to one at a time, '
+                 'rather than printing them. With --dry-run, the transaction '
+                 'output is written the same way, keeping memory use flat for '
+                 'large batches. "-" writes them to the standard output.'
+        )
 
     def _read_from_path(self, path):
-        if os.path.isfile(path):
-            if path.endswith('.xml'):
-                return self._read_from_local_pdf4(path)
-            elif path.endswith('.xlsx') or path.endswith('.xls'):
-                return self._read_from_local_xlsx(path)
-            elif path.endswith('.csv'):
-                return self._read_from_local_csv(path)
-            else:
-                logger.info(f'file {path} not supported')
-        else:
-            dois = []
+        dois = []
+
+        input_resolver = DOIInputResolver(
+            include=DOIInputResolver.split_patterns(self._include),
+            exclude=DOIInputResolver.split_patterns(self._exclude),
+            max_depth=self._max_depth
+        )
 
-            for sub_path in os.listdir(path):
-                dois.extend(self._read_from_path(os.path.join(path, sub_path)))
+        # Files within a directory are read as they are found, only the
+        # supported files within an archive are read, in memory.
+        for input_file, input_content in input_resolver.resolve_contents(
+                [path], extensions=('.xml', '.xlsx', '.xls', '.csv')):
+            source = BytesIO(input_content) if input_content is not None else input_file
+
+            # As when resolved, extensions are matched regardless of case
+            extension = os.path.splitext(input_file)[1].lower()
+
+            if extension == '.xml':
+                dois.extend(self._read_from_local_pdf4(input_file, source))
+            elif extension in ('.xlsx', '.xls'):
+                dois.extend(self._read_from_local_xlsx(input_file, source))
+            elif extension == '.csv':
+                dois.extend(self._read_from_local_csv(input_file, source))
+            else:
+                logger.info(f'file {input_file} not supported')
 
-            return dois
+        return dois
 
     def _read_from_remote_pds4(self, url):
         try:
-            response = requests.get(url)
-            xml_tree = etree.fromstring(response.content)
+            self._remote_input_contents[url] = self._http_cache.get(url)
+            xml_tree = DOIPDS4LabelUtil.parse_pds4_label(BytesIO(self._remote_input_contents[url]))
             label_util = DOIPDS4LabelUtil(
                 landing_page_template=self._config.get('LANDING_PAGES', 'url')
             )
@@ -127,10 +186,10 @@ class DOICoreActionReserve(DOICoreAction):
             logger.error(msg)
             raise InputFormatException(msg)
 
-    def _read_from_local_pdf4(self, path):
-        # parse input
+    def _read_from_local_pdf4(self, path, source=None):
+        # parse input, from source if it was already read
         try:
-            xml_tree = etree.parse(path)
+            xml_tree = DOIPDS4LabelUtil.parse_pds4_label(source or path)
             label_util =  DOIPDS4LabelUtil(
                 landing_page_template=self._config.get('LANDING_PAGES', 'url')
             )
@@ -142,10 +201,13 @@ class DOICoreActionReserve(DOICoreAction):
             logger.error(msg)
             raise InputFormatException(msg)
 
-    def _read_from_local_xlsx(self, path):
-        """Processes a Reserve action based on a file with an .xlsx ending."""
+    def _read_from_local_xlsx(self, path, source=None):
+        """
+        Processes a Reserve action based on a file with an .xlsx ending,
+        read from source if provided.
+        """
         try:
-            dois = DOIInputUtil().parse_sxls_file(path)
+            dois = DOIInputUtil().parse_sxls_file(source or path)
 
             # Do a sanity check on content of dict_condition_data.
             if len(dois) == 0:
@@ -162,10 +224,13 @@ class DOICoreActionReserve(DOICoreAction):
             logger.error(msg)
             raise InputFormatException(msg)
 
-    def _read_from_local_csv(self, path):
-        """Processes a Reserve action based on a file with a .csv ending."""
+    def _read_from_local_csv(self, path, source=None):
+        """
+        Processes a Reserve action based on a file with a .csv ending,
+        read from source if provided.
+        """
         try:
-            dois = DOIInputUtil().parse_csv_file(path)
+            dois = DOIInputUtil().parse_csv_file(source or path)
 
             # Do a sanity check on content of dict_condition_data.
             if len(dois) == 0:
@@ -281,6 +346,11 @@ class DOICoreActionReserve(DOICoreAction):
 
         self.parse_arguments(kwargs)
 
+        if self._offline:
+            self._http_cache.offline = True
+
+        self._remote_input_contents = {}
+
         try:
             dois = self._parse_input(self._input)
 
@@ -293,7 +363,14 @@ class DOICoreActionReserve(DOICoreAction):
                 dois, NodeUtil().get_node_long_name(self._node),
                 self._config.get('OTHER', 'doi_publisher'), self._dry_run
             )
-            o_doi_label = DOIOutputOsti().create_osti_doi_reserved_record(dois)
+            osti_output = DOIOutputOsti()
+
+            if self._output and self._dry_run:
+                # Nothing is submitted, so the records are only ever written
+                # one at a time, to the transaction and the output.
+                o_doi_label = functools.partial(osti_output.write_osti_doi_reserved_records, dois)
+            else:
+                o_doi_label = osti_output.create_osti_doi_reserved_record(dois)
 
             if not self._dry_run:
                 dois, o_doi_label = DOIOstiWebClient().webclient_submit_existing_content(
@@ -305,12 +382,19 @@ class DOICoreActionReserve(DOICoreAction):
 
             transaction = self.m_transaction_builder.prepare_transaction(
                 self._node, self._submitter, dois, input_path=self._input,
-                output_content=o_doi_label
+                output_content=o_doi_label,
+                input_content=self._remote_input_contents.get(self._input)
             )
 
             # Commit the transaction to the local database
             transaction.log()
 
+            if self._output:
+                # The records of the reserved DOIs, as updated from the OSTI
+                # response when submitted
+                osti_output.write_osti_doi_reserved_records(dois, self._output)
+                return None
+
             logger.debug(f"reserve_response {o_doi_label}")
             logger.debug(f"_input,self,_dry_run {self._input, self._dry_run}")
             return o_doi_label
@@ -1,10 +1,19 @@
 import datetime
+import glob
 import unittest
 import os
+import signal
+import tempfile
+from unittest.mock import patch
+
+from filelock import FileLock
 
 from pds_doi_service.core.db.doi_database import DOIDataBase
-from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
 from pds_doi_service.core.actions.check import DOICoreActionCheck
+from pds_doi_service.core.input.exceptions import CriticalDOIException
+from pds_doi_service.core.outputs.osti import DOIOutputOsti
+from pds_doi_service.core.outputs.osti_web_client import DOIOstiWebClient
 
 from pds_doi_service.core.util.general_util import get_logger
 
@@ -77,6 +86,10 @@ class MyTestCase(unittest.TestCase):
             os.remove(cls.db_name)
             logger.info("Removed test artifact database file {self.db_name}")
 
+        # Lock files are left next to the database by the workers
+        for lock_file in glob.glob('check-*.lock'):
+            os.remove(lock_file)
+
     def test_1(self):
         # Note that if the status return 'Error', is OK depending on what the
         # server has for the following 3 dois: ['10.17189/21938','10.17189/21939','10.17189/21940']
@@ -92,6 +105,294 @@ class MyTestCase(unittest.TestCase):
         result_list = self._action.run(to_send_mail_flag=False)  # Don't send email with this line.
         logger.info(result_list)
 
+    @staticmethod
+    def _osti_label(doi_values, status=DoiStatus.Registered):
+        """Creates an OSTI label reporting the provided DOIs with a status."""
+        dois = [
+            Doi(title=f'Laboratory Shocked Feldspars Bundle {index}',
+                publication_date=datetime.datetime.now(),
+                product_type='Collection',
+                product_type_specific='PDS4 Collection',
+                related_identifier=f'urn:nasa:pds:lab_shocked_feldspars{index}::1.0',
+                status=status,
+                doi=doi_value,
+                id=doi_value.split('/')[-1] if doi_value else None)
+            for index, doi_value in enumerate(doi_values, start=1)
+        ]
+
+        # Responses from OSTI do not carry an XML declaration
+        return DOIOutputOsti().create_osti_doi_review_record(dois).split('\n', 1)[1]
+
+    def test_batched_query(self):
+        """Test that check fetches updates in one query before falling back"""
+        queries = []
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            queries.append(query_dict)
+
+            # The batched query reports all but the last pending DOI
+            if 'updated_after' in query_dict:
+                return self._osti_label(['10.17189/21940', '10.17189/21939'])
+
+            return self._osti_label([query_dict['doi']])
+
+        with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch):
+            pending_state_list = self._action.run(email=False)
+
+        self.assertEqual(len(pending_state_list), 3)
+        self.assertEqual(len(queries), 2)
+        self.assertIn('updated_after', queries[0])
+        self.assertDictEqual(queries[1], {'doi': '10.17189/21938'})
+
+        for pending_record in pending_state_list:
+            self.assertEqual(pending_record['initial_status'], DoiStatus.Pending)
+            self.assertEqual(pending_record['status'], DoiStatus.Registered)
+
+    def test_batched_query_pages(self):
+        """Test that a page of records without a DOI does not end the paging"""
+        queries = []
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            queries.append(query_dict)
+
+            if 'updated_after' in query_dict:
+                pages = [[None, None], ['10.17189/21940', '10.17189/21939'], []]
+
+                return self._osti_label(pages[query_dict['start'] // query_dict['rows']])
+
+            return self._osti_label([query_dict['doi']])
+
+        config = self._action._config
+        page_size = config.get('OSTI', 'query_page_size')
+        config.set('OSTI', 'query_page_size', '2')
+
+        try:
+            with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch):
+                pending_state_list = self._action.run(email=False)
+        finally:
+            config.set('OSTI', 'query_page_size', page_size)
+
+        self.assertListEqual([query.get('start') for query in queries], [0, 2, 4, None])
+        self.assertDictEqual(queries[-1], {'doi': '10.17189/21938'})
+
+        for pending_record in pending_state_list:
+            self.assertEqual(pending_record['status'], DoiStatus.Registered)
+
+    def test_no_pending_records(self):
+        """Test that check does not query OSTI when nothing is pending"""
+        with patch.object(self._action._list_obj, 'run', return_value='[]'), \
+                patch.object(DOIOstiWebClient, 'webclient_query_doi') as query_patch:
+            pending_state_list = self._action.run(email=False)
+
+        self.assertListEqual(pending_state_list, [])
+        query_patch.assert_not_called()
+
+    def test_incremental_polling(self):
+        """Test that a check only re-queries records when they are due"""
+        queries = []
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            queries.append(query_dict)
+
+            # Nothing has changed at OSTI, every record is still pending
+            if 'updated_after' in query_dict:
+                return '<records></records>'
+
+            return self._osti_label([query_dict['doi']], status=DoiStatus.Pending)
+
+        with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch):
+            # First check has no history, so each record is queried on its own
+            self._action.run(email=False)
+
+            self.assertEqual(len(queries), 4)
+
+            database = self._action.m_transaction_builder.get_doi_database_writer()
+            check_state = database.select_check_state()
+
+            self.assertSetEqual(
+                set(check_state.keys()),
+                {'10.17189/21940', '10.17189/21939', '10.17189/21938'}
+            )
+            watermark = database.select_check_watermark()
+            self.assertIsNotNone(watermark)
+
+            # Second check only asks for what changed since the first one
+            del queries[:]
+            pending_state_list = self._action.run(email=False)
+
+            self.assertEqual(len(queries), 1)
+            self.assertEqual(
+                queries[0]['updated_after'],
+                (DOICoreActionCheck._from_timestamp(watermark)
+                 - datetime.timedelta(days=1)).strftime('%m/%d/%Y')
+            )
+
+        self.assertEqual(len(pending_state_list), 3)
+
+        for pending_record in pending_state_list:
+            self.assertEqual(pending_record['status'], DoiStatus.Pending)
+
+    def test_worker_leases(self):
+        """Test that workers sharing the database split the pending records"""
+        queries = []
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            queries.append(query_dict)
+
+            if 'updated_after' in query_dict:
+                return '<records></records>'
+
+            return self._osti_label([query_dict['doi']], status=DoiStatus.Pending)
+
+        # Another worker is busy checking one of the pending records
+        database = self._action.m_transaction_builder.get_doi_database_writer()
+        now = datetime.datetime.now().timestamp()
+        database.claim_check_leases('other-worker', ['10.17189/21939'], now + 900, 500, now)
+
+        with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch):
+            pending_state_list = self._action.run(email=False, worker_id='worker-1')
+
+        self.assertSetEqual(
+            {pending_record['doi'] for pending_record in pending_state_list},
+            {'10.17189/21940', '10.17189/21938'}
+        )
+        self.assertNotIn({'doi': '10.17189/21939'}, queries)
+
+        # The worker did not cover every pending record, so the watermark
+        # must not move past the one it left to the other worker
+        self.assertIsNone(database.select_check_watermark())
+
+        # Leases taken by the worker are released once it is done, so the
+        # other worker can claim them
+        self.assertListEqual(
+            database.claim_check_leases('other-worker', ['10.17189/21940'], now + 900, 500, now),
+            ['10.17189/21940']
+        )
+
+    def test_watermark_batches(self):
+        """Test that the watermark advances once batches covered every pending record"""
+        queries = []
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            queries.append(query_dict)
+
+            if 'updated_after' in query_dict:
+                return '<records></records>'
+
+            return self._osti_label([query_dict['doi']], status=DoiStatus.Pending)
+
+        config_get = self._action._config.get
+
+        def config_get_patch(section, option, *args, **kwargs):
+            # Each check may only claim two of the three pending records
+            if option == 'check_lease_batch_size':
+                return '2'
+
+            return config_get(section, option, *args, **kwargs)
+
+        database = self._action.m_transaction_builder.get_doi_database_writer()
+
+        with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch), \
+                patch.object(self._action._config, 'get', config_get_patch):
+            first_checked = {pending_record['doi']
+                             for pending_record in self._action.run(email=False)}
+
+            # One pending record has not been covered by any check yet
+            self.assertEqual(len(first_checked), 2)
+            self.assertIsNone(database.select_check_watermark())
+
+            # The next check starts with the record left out of the first one
+            second_checked = {pending_record['doi']
+                              for pending_record in self._action.run(email=False)}
+
+        self.assertSetEqual(first_checked | second_checked,
+                            {'10.17189/21940', '10.17189/21939', '10.17189/21938'})
+
+        # Every pending record has now been covered, so the watermark is the
+        # start of the oldest check covering one of them
+        check_coverage = database.select_check_coverage()
+
+        self.assertEqual(database.select_check_watermark(),
+                         min(check_coverage.values()))
+
+    def test_email_session(self):
+        """Test that check sends the report of every node over one SMTP session"""
+
+        def webclient_query_patch(client, i_url, query_dict=None,
+                                  i_username=None, i_password=None):
+            return self._osti_label(['10.17189/21940', '10.17189/21939', '10.17189/21938'])
+
+        # Only the lock, which sits next to the database, may be created
+        files_before = set(os.listdir('.')) | {os.path.basename(self._action._get_lock_file())}
+
+        with patch.object(DOIOstiWebClient, 'webclient_query_doi', webclient_query_patch), \
+                patch('pds_doi_service.core.util.emailer.smtplib.SMTP') as smtp_class:
+            self._action.run(email=True, attachment=True)
+
+        # One report per node, 'img' and 'naif', sent over a single connection
+        smtp_class.assert_called_once()
+        self.assertEqual(smtp_class.return_value.send_message.call_count, 2)
+        smtp_class.return_value.quit.assert_called_once()
+
+        # Attachments are built in memory
+        self.assertLessEqual(set(os.listdir('.')), files_before)
+
+    def test_daemon_shutdown(self):
+        """Test that the check daemon cycles until it receives SIGTERM"""
+        cycles = []
+
+        def run_check_patch(action):
+            cycles.append(datetime.datetime.now())
+
+            # Errors in a cycle should not stop the daemon
+            if len(cycles) == 1:
+                raise CriticalDOIException('OSTI is unreachable')
+
+            os.kill(os.getpid(), signal.SIGTERM)
+
+            return []
+
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        with patch.object(DOICoreActionCheck, '_run_check', run_check_patch), \
+                patch.object(DOICoreActionCheck, '_get_daemon_delay', lambda action: 0):
+            pending_state_list = self._action.run(daemon=True, email=False)
+
+        self.assertEqual(len(cycles), 2)
+        self.assertListEqual(pending_state_list, [])
+        self.assertEqual(signal.getsignal(signal.SIGTERM), previous_handler)
+
+    def test_single_instance(self):
+        """Test that only one check may run at a time"""
+        lock_file = self._action._get_lock_file()
+
+        with FileLock(lock_file):
+            with self.assertRaises(CriticalDOIException):
+                self._action.run(email=False)
+
+    def test_lock_file_location(self):
+        """Test that the lock does not depend on the directory check runs from"""
+        with tempfile.TemporaryDirectory() as db_dir:
+            action = DOICoreActionCheck(os.path.join(db_dir, self.db_name))
+            lock_file = action._get_lock_file()
+
+            # The lock sits next to the database rather than in the current
+            # directory, so checks started elsewhere still share it
+            self.assertEqual(os.path.dirname(lock_file), db_dir)
+
+            cwd = os.getcwd()
+
+            try:
+                os.chdir(db_dir)
+                self.assertEqual(action._get_lock_file(), lock_file)
+            finally:
+                os.chdir(cwd)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -4,6 +4,7 @@ import os
 from os.path import abspath, dirname, join
 import unittest
 import tempfile
+from unittest.mock import patch
 
 from pds_doi_service.core.actions.draft import DOICoreActionDraft
 from pds_doi_service.core.actions.release import DOICoreActionRelease
@@ -80,6 +81,86 @@ class DraftActionTestCase(unittest.TestCase):
         self.assertEqual(dois[1].related_identifier,
                          'urn:nasa:pds:insight_cameras::1.0')
 
+    def test_local_dir_two_files_workers(self):
+        """Test draft request with local dir parsed by several workers"""
+        kwargs = {
+            'input': join(self.input_dir, 'draft_dir_two_files'),
+            'node': 'img',
+            'submitter': 'my_user@my_node.gov',
+            'force': True,
+            'workers': 2
+        }
+
+        osti_doi = self._draft_action.run(**kwargs)
+
+        dois, errors = DOIOstiWebParser.response_get_parse_osti_xml(osti_doi)
+
+        self.assertEqual(len(dois), 2)
+        self.assertEqual(len(errors), 0)
+
+        # Records are returned in input order, as in a serial draft
+        self.assertEqual(dois[0].related_identifier,
+                         'urn:nasa:pds:insight_cameras::1.1')
+        self.assertEqual(dois[1].related_identifier,
+                         'urn:nasa:pds:insight_cameras::1.0')
+
+    def test_local_dir_two_files_cached(self):
+        """Test that a re-draft only prepares the labels that changed"""
+        kwargs = {
+            'input': join(self.input_dir, 'draft_dir_two_files'),
+            'node': 'img',
+            'submitter': 'my_user@my_node.gov',
+            'force': True
+        }
+
+        osti_doi = self._draft_action.run(**kwargs)
+
+        with patch.object(DOICoreActionDraft, '_prepare_single_file') as prepare_single_file:
+            cached_osti_doi = self._draft_action.run(**kwargs)
+
+        prepare_single_file.assert_not_called()
+        self.assertEqual(cached_osti_doi, osti_doi)
+
+    def test_draft_cache_version(self):
+        """Test that the draft cache version follows the label extraction code"""
+        dependencies = DOICoreActionDraft._get_draft_cache_dependencies()
+
+        for module in ('draft.py', 'pds4_util.py', 'keyword_tokenizer.py', 'keyword_engines.py'):
+            self.assertIn(module, [os.path.basename(dependency) for dependency in dependencies])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dependency = join(temp_dir, 'pds4_util.py')
+
+            with open(dependency, 'w') as outfile:
+                outfile.write('# extraction')
+
+            with patch.object(DOICoreActionDraft, '_get_draft_cache_dependencies',
+                              return_value=(dependency,)):
+                version = DOICoreActionDraft(db_name=self.db_name)._get_draft_cache_version()
+
+                with open(dependency, 'w') as outfile:
+                    outfile.write('# changed extraction')
+
+                self.assertNotEqual(
+                    DOICoreActionDraft(db_name=self.db_name)._get_draft_cache_version(), version
+                )
+
+    def test_draft_cache_version_config(self):
+        """Test that the draft cache version only follows the drafting options"""
+        version = DOICoreActionDraft(db_name=self.db_name)._get_draft_cache_version()
+
+        draft_action = DOICoreActionDraft(db_name=self.db_name)
+
+        # Rotating a credential does not change drafted records
+        with patch.dict(draft_action._config['OSTI'], {'password': 'rotated'}):
+            self.assertEqual(draft_action._get_draft_cache_version(), version)
+
+        draft_action = DOICoreActionDraft(db_name=self.db_name)
+
+        with patch.dict(draft_action._config['LANDING_PAGES'],
+                        {'url': 'https://pds.nasa.gov/landing/{}/{}/{}'}):
+            self.assertNotEqual(draft_action._get_draft_cache_version(), version)
+
     def test_local_bundle(self):
         """Test draft request with a local bundle path"""
         kwargs = {
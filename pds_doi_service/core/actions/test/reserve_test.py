@@ -1,5 +1,11 @@
 import os
+import tempfile
 import unittest
+import zipfile
+from io import BytesIO
+
+from lxml import etree
+
 from pds_doi_service.core.util.general_util import get_logger
 from pds_doi_service.core.actions.reserve import DOICoreActionReserve
 
@@ -62,6 +68,38 @@ class MyTestCase(unittest.TestCase):
             dry_run=True,force=True)
         logger.info(osti_doi)
 
+    def test_reserve_csv_to_output(self):
+        logger.info("test reserve csv file format written to an output file")
+        output = BytesIO()
+
+        osti_doi = self._action.run(
+            input='input/DOI_Reserved_GEO_200318.csv',
+            node='img', submitter='my_user@my_node.gov',
+            dry_run=True, force=True, output=output)
+
+        # The records are only written to the output
+        self.assertIsNone(osti_doi)
+
+        records = etree.fromstring(output.getvalue())
+        self.assertEqual(len(records.findall('record')), 3)
+        self.assertEqual(records.find('record').get('status'), 'reserved_not_submitted')
+
+    def test_reserve_csv_in_archive(self):
+        logger.info("test reserve csv file read from an archive, with an upper-case extension")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive_path = os.path.join(temp_dir, 'reserve.zip')
+
+            with zipfile.ZipFile(archive_path, 'w') as archive:
+                archive.write('input/DOI_Reserved_GEO_200318.csv', 'DOI_RESERVED_GEO_200318.CSV')
+
+            osti_doi = self._action.run(
+                input=archive_path,
+                node='img', submitter='my_user@my_node.gov',
+                dry_run=True, force=True)
+
+        self.assertEqual(len(etree.fromstring(osti_doi.encode()).findall('record')), 3)
+
     def test_reserve_csv_and_submit(self):
         logger.info("test reserve csv file format and submit")
         osti_doi = self._action.run(
@@ -37,7 +37,10 @@ def main():
     action = action_class()
     action.parse_arguments_from_cmd(arguments)
     output = action.run()
-    print(output)
+
+    # Nothing is returned when the output was written to a file
+    if output is not None:
+        print(output)
 
 
 if __name__ == '__main__':
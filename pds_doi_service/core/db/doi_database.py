@@ -29,6 +29,10 @@ class DOIDataBase:
     def __init__(self, db_file):
         self._config = self.m_doi_config_util.get_config()
         self.m_default_table_name = 'doi'
+        self.m_check_state_table_name = 'check_state'
+        self.m_check_watermark_table_name = 'check_watermark'
+        self.m_check_lease_table_name = 'check_lease'
+        self.m_draft_cache_table_name = 'draft_cache'
         self.m_default_db_file = db_file  # Default name of the database.
 
     def get_database_name(self):
@@ -74,6 +78,11 @@ class DOIDataBase:
             if not self.check_if_table_exist():
                 self.create_table()
 
+            # The check state and draft cache tables were added after the doi
+            # table, so make sure they exist in databases created by older versions.
+            self.create_check_state_tables()
+            self.create_draft_cache_table()
+
         return self.m_my_conn
 
     def check_if_table_exist(self):
@@ -196,6 +205,242 @@ class DOIDataBase:
 
         return o_query_string
 
+    def create_q_string_for_check_state_create(self):
+        ''' Build the query string to create the check state table in the SQLite database. '''
+
+        # One row per DOI polled by the check action.
+        o_query_string = 'CREATE TABLE IF NOT EXISTS ' + self.m_check_state_table_name + ' '
+        o_query_string += '(doi TEXT PRIMARY KEY'        # DOI polled at the provider
+        o_query_string += ',last_checked INT NOT NULL'   # as Unix Time, the number of seconds since 1970-01-01 00:00:00 UTC.
+        o_query_string += ',date_record_updated TEXT'  # last 'date_record_updated' value reported by the provider
+        o_query_string += ',last_covered INT); '       # as Unix Time, start of the last check that saw every update of the DOI
+        logger.debug(f"o_query_string {o_query_string}")
+
+        return o_query_string
+
+    def create_q_string_for_check_watermark_create(self):
+        ''' Build the query string to create the check watermark table in the SQLite database. '''
+
+        # The table only ever holds the single row with id 0.
+        o_query_string = 'CREATE TABLE IF NOT EXISTS ' + self.m_check_watermark_table_name + ' '
+        o_query_string += '(id INTEGER PRIMARY KEY CHECK (id = 0)'
+        o_query_string += ',watermark INT NOT NULL); '  # start of the last successful check, as Unix Time
+        logger.debug(f"o_query_string {o_query_string}")
+
+        return o_query_string
+
+    def create_q_string_for_check_lease_create(self):
+        ''' Build the query string to create the check lease table in the SQLite database. '''
+
+        # One row per DOI currently claimed by a check worker.
+        o_query_string = 'CREATE TABLE IF NOT EXISTS ' + self.m_check_lease_table_name + ' '
+        o_query_string += '(doi TEXT PRIMARY KEY'      # DOI claimed by the worker
+        o_query_string += ',worker_id TEXT NOT NULL'   # identifier of the check worker holding the lease
+        o_query_string += ',expires INT NOT NULL); '   # as Unix Time, when other workers may claim the DOI again
+        logger.debug(f"o_query_string {o_query_string}")
+
+        return o_query_string
+
+    def create_check_state_tables(self):
+        ''' Create the tables used by the check action to poll incrementally, if they do not exist yet. '''
+
+        self.m_my_conn.execute(self.create_q_string_for_check_state_create())
+        self.m_my_conn.execute(self.create_q_string_for_check_watermark_create())
+        self.m_my_conn.execute(self.create_q_string_for_check_lease_create())
+        self.m_my_conn.commit()
+
+        return 1
+
+    def create_q_string_for_draft_cache_create(self):
+        ''' Build the query string to create the draft cache table in the SQLite database. '''
+
+        # One row per input label already prepared by the draft action.
+        o_query_string = 'CREATE TABLE IF NOT EXISTS ' + self.m_draft_cache_table_name + ' '
+        o_query_string += '(cache_key TEXT PRIMARY KEY'   # SHA-256 of the label bytes and of what else the record depends on
+        o_query_string += ',doi_label TEXT NOT NULL'      # OSTI record produced and validated for the label
+        o_query_string += ',doi BLOB NOT NULL'            # pickled Doi object parsed from the label
+        o_query_string += ',version TEXT NOT NULL'        # digest of the code and configuration the record depends on
+        o_query_string += ',update_date INT NOT NULL); '  # as Unix Time, the number of seconds since 1970-01-01 00:00:00 UTC.
+        logger.debug(f"o_query_string {o_query_string}")
+
+        return o_query_string
+
+    def create_draft_cache_table(self):
+        ''' Create the table used by the draft action to skip unchanged labels, if it does not exist yet. '''
+
+        self.m_my_conn.execute(self.create_q_string_for_draft_cache_create())
+        self.m_my_conn.commit()
+
+        return 1
+
+    def select_draft_cache(self, cache_key):
+        ''' Returns the (doi_label, doi) pair cached for cache_key, or None if there is none. '''
+
+        query_string = f'SELECT doi_label, doi FROM {self.m_draft_cache_table_name} WHERE cache_key = ?'
+        logger.debug(f"query_string {query_string}")
+
+        cursor = self.get_connection().cursor()
+        cursor.execute(query_string, (cache_key,))
+        row = cursor.fetchone()
+
+        return (row[0], row[1]) if row else None
+
+    def write_draft_cache(self, cache_key, doi_label, doi, version):
+        ''' Insert or replace the doi_label and pickled doi cached for cache_key by the given draft cache version. '''
+
+        query_string = (f'INSERT OR REPLACE INTO {self.m_draft_cache_table_name} '
+                        '(cache_key, doi_label, doi, version, update_date) VALUES (?,?,?,?,?)')
+        logger.debug(f"query_string {query_string}")
+
+        update_date = datetime.datetime.now().replace(tzinfo=datetime.timezone.utc).timestamp()
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.execute(query_string, (cache_key, doi_label, doi, version, update_date))
+        self.m_my_conn.commit()
+
+    def evict_draft_cache(self, version):
+        ''' Delete the records cached by any draft cache version other than the given one. '''
+
+        query_string = f'DELETE FROM {self.m_draft_cache_table_name} WHERE version != ?'
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        cursor = self.m_my_conn.execute(query_string, (version,))
+        self.m_my_conn.commit()
+
+        logger.debug(f"evicted {cursor.rowcount} record(s) from the draft cache")
+
+    def select_check_state(self):
+        ''' Returns the check state of every polled DOI as a dict of (last_checked, date_record_updated) keyed by DOI. '''
+
+        query_string = f'SELECT doi, last_checked, date_record_updated FROM {self.m_check_state_table_name}'
+        logger.debug(f"query_string {query_string}")
+
+        cursor = self.get_connection().cursor()
+        cursor.execute(query_string)
+
+        return {row[0]: (row[1], row[2]) for row in cursor}
+
+    def write_check_state(self, check_states):
+        ''' Insert or replace the check state for a list of (doi, last_checked, date_record_updated) tuples. '''
+
+        query_string = (f'INSERT OR REPLACE INTO {self.m_check_state_table_name} '
+                        '(doi, last_checked, date_record_updated) VALUES (?,?,?)')
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.executemany(query_string, check_states)
+        self.m_my_conn.commit()
+
+    def select_check_coverage(self):
+        ''' Returns the start time (as Unix Time) of the last check covering each polled DOI, keyed by DOI. '''
+
+        query_string = f'SELECT doi, last_covered FROM {self.m_check_state_table_name}'
+        logger.debug(f"query_string {query_string}")
+
+        cursor = self.get_connection().cursor()
+        cursor.execute(query_string)
+
+        return {row[0]: row[1] for row in cursor}
+
+    def write_check_coverage(self, dois, last_covered):
+        ''' Record last_covered (as Unix Time) as the start of the last check covering the given polled DOIs. '''
+
+        query_string = (f'UPDATE {self.m_check_state_table_name} SET last_covered = ? '
+                        'WHERE doi = ?')
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.executemany(query_string, [(last_covered, doi) for doi in dois])
+        self.m_my_conn.commit()
+
+    def select_check_watermark(self):
+        ''' Returns the start time (as Unix Time) of the last successful check, or None if there was none. '''
+
+        query_string = f'SELECT watermark FROM {self.m_check_watermark_table_name} WHERE id = 0'
+        logger.debug(f"query_string {query_string}")
+
+        cursor = self.get_connection().cursor()
+        cursor.execute(query_string)
+        row = cursor.fetchone()
+
+        return row[0] if row else None
+
+    def write_check_watermark(self, watermark):
+        ''' Record the start time (as Unix Time) of the last successful check. '''
+
+        query_string = (f'INSERT OR REPLACE INTO {self.m_check_watermark_table_name} '
+                        '(id, watermark) VALUES (0, ?)')
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.execute(query_string, (watermark,))
+        self.m_my_conn.commit()
+
+    def claim_check_leases(self, worker_id, dois, lease_expires, max_leases, current_time):
+        ''' Claim leases on up to max_leases of the given DOIs for worker_id, skipping DOIs leased by another worker
+            that has not expired at current_time. Leases already held by worker_id are renewed.
+            Returns the list of DOIs claimed, in the order provided. '''
+
+        self.m_my_conn = self.get_connection()
+
+        # Finish any implicit transaction, then lock the database for writing
+        # so two workers cannot read the same leases as free.
+        self.m_my_conn.commit()
+
+        try:
+            self.m_my_conn.execute('BEGIN IMMEDIATE')
+
+            cursor = self.m_my_conn.cursor()
+            cursor.execute(f'SELECT doi, worker_id, expires FROM {self.m_check_lease_table_name}')
+            leases = {row[0]: (row[1], row[2]) for row in cursor}
+
+            o_claimed_dois = [
+                doi for doi in dois
+                if doi not in leases
+                or leases[doi][0] == worker_id
+                or leases[doi][1] <= current_time
+            ][:max_leases]
+
+            query_string = (f'INSERT OR REPLACE INTO {self.m_check_lease_table_name} '
+                            '(doi, worker_id, expires) VALUES (?,?,?)')
+            logger.debug(f"query_string {query_string}")
+
+            self.m_my_conn.executemany(
+                query_string, [(doi, worker_id, lease_expires) for doi in o_claimed_dois]
+            )
+            self.m_my_conn.commit()
+        except sqlite3.Error as e:
+            self.m_my_conn.rollback()
+            logger.error("Database error: %s", e)
+            raise Exception("Database error: %s" % e)
+
+        logger.debug(f"worker {worker_id} claimed {len(o_claimed_dois)} of {len(dois)} DOIs")
+
+        return o_claimed_dois
+
+    def renew_check_leases(self, worker_id, dois, lease_expires):
+        ''' Extend the leases held by worker_id on the given DOIs until lease_expires. '''
+
+        query_string = (f'UPDATE {self.m_check_lease_table_name} SET expires = ? '
+                        'WHERE worker_id = ? AND doi = ?')
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.executemany(query_string, [(lease_expires, worker_id, doi) for doi in dois])
+        self.m_my_conn.commit()
+
+    def release_check_leases(self, worker_id, dois):
+        ''' Release the leases held by worker_id on the given DOIs. '''
+
+        query_string = (f'DELETE FROM {self.m_check_lease_table_name} '
+                        'WHERE worker_id = ? AND doi = ?')
+        logger.debug(f"query_string {query_string}")
+
+        self.m_my_conn = self.get_connection()
+        self.m_my_conn.executemany(query_string, [(worker_id, doi) for doi in dois])
+        self.m_my_conn.commit()
+
     def create_table(self):
         ''' Create a given table in the SQLite database. '''
 
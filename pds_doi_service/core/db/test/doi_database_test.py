@@ -45,5 +45,108 @@ class MyTestCase(unittest.TestCase):
         if os.path.exists("doi_temp.db"):
             os.remove("doi_temp.db")
 
+    def test_check_state(self):
+        logger.info("test persisting the state of the check action")
+
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+        self._doi_database = DOIDataBase('doi_temp.db')
+
+        # Nothing has been checked yet.
+        self.assertDictEqual(self._doi_database.select_check_state(), {})
+        self.assertIsNone(self._doi_database.select_check_watermark())
+
+        self._doi_database.write_check_state(
+            [('10.17189/21729', 1600000000, '2020-09-13'),
+             ('10.17189/21730', 1600000000, None)]
+        )
+        self._doi_database.write_check_state([('10.17189/21729', 1600000600, '2020-09-14')])
+        self._doi_database.write_check_watermark(1600000000)
+        self._doi_database.write_check_watermark(1600000600)
+
+        self.assertDictEqual(self._doi_database.select_check_state(),
+                             {'10.17189/21729': (1600000600, '2020-09-14'),
+                              '10.17189/21730': (1600000000, None)})
+        self.assertEqual(self._doi_database.select_check_watermark(), 1600000600)
+
+        # Only the DOIs covered by a check have a coverage time.
+        self._doi_database.write_check_coverage(['10.17189/21729'], 1600000600)
+
+        self.assertDictEqual(self._doi_database.select_check_coverage(),
+                             {'10.17189/21729': 1600000600,
+                              '10.17189/21730': None})
+
+        # Remove test artifact.
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+    def test_check_leases(self):
+        logger.info("test claiming pending DOIs between check workers")
+
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+        self._doi_database = DOIDataBase('doi_temp.db')
+
+        dois = ['10.17189/21729', '10.17189/21730', '10.17189/21731']
+
+        # Each worker claims at most two DOIs, skipping those leased by the other.
+        self.assertListEqual(
+            self._doi_database.claim_check_leases('worker-1', dois, 1600000900, 2, 1600000000),
+            ['10.17189/21729', '10.17189/21730']
+        )
+        self.assertListEqual(
+            self._doi_database.claim_check_leases('worker-2', dois, 1600000900, 2, 1600000000),
+            ['10.17189/21731']
+        )
+
+        # A worker renewing its claim keeps its DOIs.
+        self._doi_database.renew_check_leases('worker-1', ['10.17189/21729'], 1600001800)
+        self.assertListEqual(
+            self._doi_database.claim_check_leases('worker-2', dois, 1600001000, 2, 1600000900),
+            ['10.17189/21730', '10.17189/21731']
+        )
+
+        # Released DOIs may be claimed right away.
+        self._doi_database.release_check_leases('worker-1', ['10.17189/21729'])
+        self.assertListEqual(
+            self._doi_database.claim_check_leases('worker-2', dois, 1600001000, 3, 1600000900),
+            dois
+        )
+
+        # Remove test artifact.
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+    def test_draft_cache(self):
+        logger.info("test caching the records prepared by the draft action")
+
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+        self._doi_database = DOIDataBase('doi_temp.db')
+
+        self.assertIsNone(self._doi_database.select_draft_cache('0123abcd'))
+
+        self._doi_database.write_draft_cache('0123abcd', '<record/>', b'doi', 'v1')
+        self._doi_database.write_draft_cache('0123abcd', '<record status="draft"/>', b'doi', 'v1')
+        self._doi_database.write_draft_cache('4567efab', '<record/>', b'doi', 'v2')
+
+        self.assertTupleEqual(self._doi_database.select_draft_cache('0123abcd'),
+                              ('<record status="draft"/>', b'doi'))
+
+        # Only the records cached by the current version are kept.
+        self._doi_database.evict_draft_cache('v2')
+
+        self.assertIsNone(self._doi_database.select_draft_cache('0123abcd'))
+        self.assertTupleEqual(self._doi_database.select_draft_cache('4567efab'),
+                              ('<record/>', b'doi'))
+
+        # Remove test artifact.
+        if os.path.exists("doi_temp.db"):
+            os.remove("doi_temp.db")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -13,9 +13,10 @@ doi.py
 Contains the dataclass and enumeration definitions for Doi objects.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum, unique
+from operator import attrgetter
 
 
 class ProductTypeEnum(Enum):
@@ -61,14 +62,24 @@ class DoiStatus(str, Enum):
 
 @dataclass
 class Doi:
-    """The dataclass definition for a Doi object."""
+    """
+    The dataclass definition for a Doi object.
+
+    The keywords may be provided as a callable returning them, which is only
+    called the first time they are read, so they are not computed when no
+    output needs them. They are left out of the representation of the Doi,
+    so logging it does not compute them.
+
+    Doi objects store their attributes in __slots__ rather than a __dict__,
+    so to_render_context() and to_row() provide their fields as dictionaries.
+    """
     title: str
     publication_date: datetime
     product_type: ProductTypeEnum
     product_type_specific: str
     related_identifier: str
     authors: list = None
-    keywords: list = None
+    keywords: list = field(default=None, repr=False)
     editors: list = None
     description: str = None
     id: str = None
@@ -81,3 +92,89 @@ class Doi:
     message: str = None
     date_record_added: datetime = None
     date_record_updated: datetime = None
+
+    def to_render_context(self, exclude=(), omit_none=False):
+        """
+        Returns the fields of the Doi as a dictionary, for rendering a label
+        template. The keywords are only read if not excluded, as they may have
+        to be computed.
+
+        Parameters
+        ----------
+        exclude : iterable of str
+            Names of the fields to leave out.
+        omit_none : bool
+            If True, the fields set to None are left out, so the string
+            literal "None" is not rendered in their place.
+
+        """
+        if exclude:
+            names = [name for name in DOI_FIELD_NAMES if name not in exclude]
+            values = [getattr(self, name) for name in names]
+        else:
+            names, values = DOI_FIELD_NAMES, _get_field_values(self)
+
+        if omit_none:
+            return {name: value for name, value in zip(names, values) if value is not None}
+
+        return dict(zip(names, values))
+
+    def to_row(self):
+        """Returns the fields of the Doi written to the transaction database."""
+        return {'doi': self.doi,
+                'status': self.status,
+                'title': self.title,
+                'product_type': self.product_type,
+                'product_type_specific': self.product_type_specific}
+
+
+# The attributes set on Doi objects besides their fields: the fields of an
+# OSTI record without a Doi field, and the submitter of a check action
+EXTRA_ATTRIBUTES = ('sponsoring_organization', 'availability', 'country',
+                    'site_code', 'contributors', 'submitter')
+
+
+def _add_slots(cls, slots):
+    """
+    Returns a copy of the dataclass cls storing its instance attributes in
+    the given slots. The default values of the fields are kept by the
+    __init__() generated by the dataclass, so they are removed from the class
+    attributes, which would otherwise conflict with the slots.
+    """
+    cls_dict = dict(cls.__dict__)
+
+    for cls_field in fields(cls):
+        cls_dict.pop(cls_field.name, None)
+
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__slots__'] = slots
+
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+def _get_keywords(doi):
+    if callable(doi._keywords):
+        doi._keywords = doi._keywords()
+
+    return doi._keywords
+
+
+def _set_keywords(doi, keywords):
+    doi._keywords = keywords
+
+
+# The names of the fields of a Doi, in their order of definition
+DOI_FIELD_NAMES = tuple(doi_field.name for doi_field in fields(Doi))
+
+# Returns the values of all the fields of a Doi at once
+_get_field_values = attrgetter(*DOI_FIELD_NAMES)
+
+# The keywords are stored in the _keywords slot by their property
+Doi = _add_slots(
+    Doi, tuple(name for name in DOI_FIELD_NAMES if name != 'keywords') + ('_keywords',) + EXTRA_ATTRIBUTES
+)
+
+# Set once the dataclass is created, so its __init__() keeps None as the
+# default of keywords, and assigns them through the property.
+Doi.keywords = property(_get_keywords, _set_keywords)
@@ -0,0 +1,88 @@
+import copy
+import pickle
+import unittest
+from datetime import datetime
+
+from pds_doi_service.core.entities.doi import DOI_FIELD_NAMES, Doi, DoiStatus
+
+
+class DoiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._doi = Doi(title='InSight Cameras Bundle',
+                        publication_date=datetime(2019, 1, 1),
+                        product_type='Collection',
+                        product_type_specific='PDS4 Collection',
+                        related_identifier='urn:nasa:pds:insight_cameras::1.0',
+                        doi='10.17189/29569',
+                        status=DoiStatus.Draft)
+
+    def test_slots(self):
+        """Test that the attributes are stored in slots, the extra ones included"""
+        self.assertFalse(hasattr(self._doi, '__dict__'))
+
+        self._doi.contributors = [{'full_name': 'Cartography and Imaging Sciences Discipline'}]
+        self._doi.submitter = 'img-submitter@jpl.nasa.gov'
+
+        with self.assertRaises(AttributeError):
+            self._doi.unknown_field = None
+
+        for doi in (copy.copy(self._doi), pickle.loads(pickle.dumps(self._doi))):
+            self.assertEqual(doi, self._doi)
+            self.assertEqual(doi.contributors, self._doi.contributors)
+            self.assertEqual(doi.submitter, self._doi.submitter)
+
+    def test_lazy_keywords(self):
+        """Test that keywords provided as a callable are computed once, when read"""
+        calls = []
+
+        def get_keywords():
+            calls.append(None)
+            return ['insight', 'camera']
+
+        self._doi.keywords = get_keywords
+
+        self.assertEqual(self._doi.to_render_context(exclude=('keywords',)).get('keywords'), None)
+        self.assertListEqual(calls, [])
+
+        # Nor when the Doi is represented, as when logged
+        self.assertNotIn('keywords', repr(self._doi))
+        self.assertListEqual(calls, [])
+
+        self.assertListEqual(self._doi.to_render_context()['keywords'], ['insight', 'camera'])
+        self.assertListEqual(self._doi.keywords, ['insight', 'camera'])
+        self.assertEqual(len(calls), 1)
+
+    def test_to_render_context(self):
+        context = self._doi.to_render_context()
+
+        self.assertListEqual(list(context), list(DOI_FIELD_NAMES))
+        self.assertEqual(context['title'], 'InSight Cameras Bundle')
+        self.assertIsNone(context['authors'])
+
+        context = self._doi.to_render_context(omit_none=True)
+
+        self.assertDictEqual(
+            context,
+            {'title': 'InSight Cameras Bundle',
+             'publication_date': datetime(2019, 1, 1),
+             'product_type': 'Collection',
+             'product_type_specific': 'PDS4 Collection',
+             'related_identifier': 'urn:nasa:pds:insight_cameras::1.0',
+             'doi': '10.17189/29569',
+             'status': DoiStatus.Draft}
+        )
+
+    def test_to_row(self):
+        self.assertDictEqual(
+            self._doi.to_row(),
+            {'doi': '10.17189/29569',
+             'status': DoiStatus.Draft,
+             'title': 'InSight Cameras Bundle',
+             'product_type': 'Collection',
+             'product_type_specific': 'PDS4 Collection'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
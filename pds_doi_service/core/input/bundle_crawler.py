@@ -0,0 +1,157 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=================
+bundle_crawler.py
+=================
+
+Contains the class used to crawl a remote PDS4 bundle for the labels of its
+collections.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urljoin
+
+import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+
+from pds_doi_service.core.input.exceptions import InputFormatException
+from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil
+from pds_doi_service.core.util.config_parser import DOIConfigUtil
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger('pds_doi_core.input.bundle_crawler')
+
+
+class DOIBundleCrawler:
+    """
+    Crawls a remote PDS4 bundle label for the labels of the collections
+    listed by its Bundle_Member_Entry elements.
+
+    The URL of each collection label is derived from its LID with the
+    bundle_collection_label_path configuration value, relative to the bundle
+    label URL. Collection labels are requested concurrently, over a session
+    pooling at most bundle_crawler_max_connections_per_host connections to a
+    host, and yielded in bundle order along with their content so they do
+    not have to be requested again. Since a bundle label does not name the
+    files of its collections, a collection label missing from the derived
+    URL fails the whole crawl rather than leaving the collection out.
+    """
+    m_doi_config_util = DOIConfigUtil()
+
+    def __init__(self, http_cache):
+        """
+        Parameters
+        ----------
+        http_cache : DOIHttpCache
+            Cache to request the bundle and collection labels through.
+
+        """
+        self._config = self.m_doi_config_util.get_config()
+        self._http_cache = http_cache
+        self._collection_label_path = self._config.get('OTHER', 'bundle_collection_label_path')
+        self._max_connections_per_host = self._config.getint(
+            'OTHER', 'bundle_crawler_max_connections_per_host'
+        )
+
+    def _create_session(self):
+        """
+        Creates a session keeping connections open between requests, blocking
+        rather than opening more than the limit of connections to a host.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=self._max_connections_per_host, pool_block=True)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return session
+
+    def get_collection_label_url(self, bundle_url, collection_lid):
+        """Returns the URL of the label of a collection of the bundle at bundle_url."""
+        collection_id = collection_lid.split(':')[-1]
+
+        return urljoin(bundle_url, self._collection_label_path.format(collection_id=collection_id))
+
+    def _get_collection_label(self, collection_url, session):
+        """
+        Returns the (content, None) pair of the collection label at
+        collection_url, or (None, reason) if it cannot be requested.
+        """
+        try:
+            return self._http_cache.get(collection_url, session=session), None
+        except OSError as err:
+            return None, str(err)
+
+    def crawl(self, bundle_url):
+        """
+        Requests the bundle label at bundle_url, then the labels of its primary
+        collections.
+
+        Parameters
+        ----------
+        bundle_url : str
+            URL of the bundle label.
+
+        Returns
+        -------
+        labels : generator of (str, bytes)
+            The URL and content of the bundle label, followed by those of each
+            of its collection labels.
+
+        Raises
+        ------
+        InputFormatException
+            If the bundle label cannot be requested or parsed, or any of its
+            collection labels cannot be requested.
+
+        """
+        session = self._create_session()
+
+        try:
+            try:
+                bundle_content = self._http_cache.get(bundle_url, session=session)
+                collection_lids = DOIPDS4LabelUtil.get_bundle_member_lids(
+                    etree.parse(BytesIO(bundle_content))
+                )
+            except (OSError, etree.XMLSyntaxError) as err:
+                msg = f'Error reading bundle {bundle_url}, reason: {str(err)}'
+                logger.error(msg)
+                raise InputFormatException(msg)
+
+            collection_urls = [self.get_collection_label_url(bundle_url, collection_lid)
+                               for collection_lid in collection_lids]
+
+            logger.info(f'Found {len(collection_urls)} collection(s) in bundle {bundle_url}')
+
+            # Every collection label is requested before any label is
+            # yielded, so a bundle is not drafted without some of its
+            # collections.
+            with ThreadPoolExecutor(max_workers=self._max_connections_per_host) as executor:
+                collection_labels = list(executor.map(
+                    lambda collection_url: self._get_collection_label(collection_url, session),
+                    collection_urls
+                ))
+
+            failures = [f'{collection_url} ({reason})'
+                        for collection_url, (_, reason) in zip(collection_urls, collection_labels)
+                        if reason is not None]
+
+            if failures:
+                msg = (f'Error reading {len(failures)} collection label(s) of bundle '
+                       f'{bundle_url}: {", ".join(failures)}')
+                logger.error(msg)
+                raise InputFormatException(msg)
+
+            yield bundle_url, bundle_content
+
+            for collection_url, (collection_content, _) in zip(collection_urls, collection_labels):
+                yield collection_url, collection_content
+        finally:
+            session.close()
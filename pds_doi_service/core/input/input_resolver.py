@@ -0,0 +1,211 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=================
+input_resolver.py
+=================
+
+Contains the class used by actions to resolve their input locations into
+the individual input files to process.
+"""
+
+import os
+import tarfile
+import zipfile
+from fnmatch import fnmatch
+from os.path import join, normpath
+
+from pds_doi_service.core.input.exceptions import InputFormatException
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger('pds_doi_core.input.input_resolver')
+
+# Archives whose members resolve_contents() reads in place
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+class DOIInputResolver:
+    """
+    Resolves input locations, which may be local files, local directories or
+    URLs, into the individual input files to process.
+
+    Directories are crawled lazily with os.scandir, so the first input files
+    may be processed before the crawl of a large tree completes. The entries
+    of each directory are crawled in name order, so the order of the input
+    files does not depend on the file system.
+
+    Zip and tar archives may be read in place with resolve_contents(), as
+    they are delivered, rather than extracted first.
+    """
+
+    def __init__(self, include=None, exclude=None, max_depth=None):
+        """
+        Parameters
+        ----------
+        include : list of str, optional
+            Glob patterns, matched against file names, of the files to keep
+            when crawling a directory. All files are kept if not provided.
+        exclude : list of str, optional
+            Glob patterns, matched against file and directory names, of the
+            files to skip and directories not to descend into when crawling
+            a directory.
+        max_depth : int, optional
+            Number of levels of subdirectories to descend into below an input
+            directory. 0 only keeps the files directly within the input
+            directory. There is no limit if not provided.
+
+        """
+        self._include = include or []
+        self._exclude = exclude or []
+        self._max_depth = max_depth
+
+    @staticmethod
+    def split_patterns(patterns):
+        """
+        Splits a comma-delimited list of glob patterns, as provided on the
+        command line, into a list.
+        """
+        if not patterns:
+            return []
+
+        return [pattern.strip() for pattern in patterns.split(',') if pattern.strip()]
+
+    def _is_excluded(self, name):
+        return any(fnmatch(name, pattern) for pattern in self._exclude)
+
+    def _is_included(self, name):
+        return (not self._include
+                or any(fnmatch(name, pattern) for pattern in self._include))
+
+    def _crawl(self, directory, depth):
+        """Yields the paths to the files kept within directory, depth first."""
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError as err:
+            logger.warning(f'Could not list directory {directory}, reason: {str(err)}')
+            return
+
+        for entry in entries:
+            if self._is_excluded(entry.name):
+                continue
+
+            # As with os.walk, do not follow symbolic links to directories
+            # to avoid crawling loops.
+            if entry.is_dir(follow_symlinks=False):
+                if self._max_depth is None or depth < self._max_depth:
+                    yield from self._crawl(entry.path, depth + 1)
+            elif entry.is_file() and self._is_included(entry.name):
+                yield entry.path
+
+    def resolve(self, inputs):
+        """
+        Resolves the provided input locations into input files.
+
+        Parameters
+        ----------
+        inputs : str or list of str
+            A location or comma-delimited list of locations, or a list of
+            locations. Each may be a local file or directory, or a URL.
+
+        Returns
+        -------
+        input_files : generator of str
+            URLs and local files are yielded as provided, followed by the
+            files found within each local directory.
+
+        """
+        if isinstance(inputs, str):
+            inputs = inputs.split(',')
+
+        for token in inputs:
+            # Skip empty names, as in the case of a comma being the last
+            # character or a comma provided on its own.
+            if not token:
+                continue
+
+            if os.path.isdir(token):
+                yield from self._crawl(token, 0)
+            else:
+                # The token is either the name of a file or a URL.
+                yield token
+
+    @staticmethod
+    def is_archive(path):
+        return not path.startswith('http') and path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+    def _is_member_kept(self, member_name, extensions):
+        """
+        Returns whether an archive member is read, based on the include and
+        exclude patterns and, if provided, its extension.
+        """
+        name_parts = member_name.strip('/').split('/')
+
+        if any(self._is_excluded(name_part) for name_part in name_parts):
+            return False
+
+        if extensions and not name_parts[-1].lower().endswith(extensions):
+            return False
+
+        return self._is_included(name_parts[-1])
+
+    def _read_archive(self, archive_path, extensions):
+        """
+        Yields the path and content of the members of an archive that are
+        kept. Only those members are read, zip archives being read at random
+        and tar archives as a stream, so nothing is extracted to disk.
+        """
+        try:
+            if archive_path.lower().endswith('.zip'):
+                with zipfile.ZipFile(archive_path) as archive:
+                    for member in archive.infolist():
+                        if not member.is_dir() and self._is_member_kept(member.filename, extensions):
+                            yield normpath(join(archive_path, member.filename)), archive.read(member)
+            else:
+                with tarfile.open(archive_path, mode='r|*') as archive:
+                    for member in archive:
+                        if member.isfile() and self._is_member_kept(member.name, extensions):
+                            yield (normpath(join(archive_path, member.name)),
+                                   archive.extractfile(member).read())
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as err:
+            msg = f'Error reading archive {archive_path}, reason: {str(err)}'
+            logger.error(msg)
+            raise InputFormatException(msg)
+
+    def resolve_contents(self, inputs, extensions=None):
+        """
+        Resolves the provided input locations into input files, as resolve()
+        does, reading the members of archives in place.
+
+        Parameters
+        ----------
+        inputs : str or list of str
+            A location or comma-delimited list of locations, or a list of
+            locations. Each may be a local file, directory or archive, or a URL.
+        extensions : tuple of str, optional
+            Extensions of the archive members to read. All members are read
+            if not provided. The max_depth limit does not apply to members.
+
+        Returns
+        -------
+        input_files_and_contents : generator of (str, bytes)
+            The path and content of each archive member read, the path being
+            the one it would be extracted to, and (input file, None) for the
+            other input files, which are left to the caller to read.
+
+        Raises
+        ------
+        InputFormatException
+            If an archive cannot be read.
+
+        """
+        for input_file in self.resolve(inputs):
+            if self.is_archive(input_file):
+                yield from self._read_archive(input_file, extensions)
+            else:
+                yield input_file, None
@@ -18,9 +18,9 @@ class DOIInputUtil:
     MANDATORY_COLUMNS = ['status', 'title', 'publication_date','product_type_specific','author_last_name','author_first_name','related_resource']
 
     def parse_sxls_file(self, i_filepath):
-        """Function receives a URI containing SXLS format and create one external file per row to output directory."""
+        """Function receives a URI, or file-like object, containing SXLS format and create one external file per row to output directory."""
 
-        logger.info("i_filepath" + " " + i_filepath)
+        logger.info(f"i_filepath {i_filepath}")
 
         xl_wb = pd.ExcelFile(i_filepath, engine='openpyxl')
         actual_sheet_name = xl_wb.sheet_names[0]  # We only want the first sheet.
@@ -74,15 +74,15 @@ class DOIInputUtil:
                       related_identifier=row['related_resource'],
                       authors=[{'first_name': row['author_first_name'],
                                 'last_name': row['author_last_name']}])
-            logger.debug(f'getting doi metadata {doi.__dict__}')
+            logger.debug('getting doi metadata %s', doi)
             doi_records.append(doi)
 
         return doi_records
 
     def parse_csv_file(self, i_filepath):
-        """Function receives a URI containing CSV format and create one external file per row to output directory."""
+        """Function receives a URI, or file-like object, containing CSV format and create one external file per row to output directory."""
 
-        logger.info("i_filepath" + " " + i_filepath)
+        logger.info(f"i_filepath {i_filepath}")
 
         # Read the CSV file into memory.
 
@@ -99,7 +99,7 @@ class DOIInputUtil:
             logger.error(
                 "expecting" + " " + str(self.m_EXPECTED_NUM_COLUMNS) + " columns in CSV file has %i columns." % (
                     num_cols))
-            logger.error("i_filepath" + " " + i_filepath)
+            logger.error(f"i_filepath {i_filepath}")
             logger.error("data columns " + " " + str(list(csv_sheet.columns)))
             raise InputFormatException("columns " + " " + str(list(csv_sheet.columns)))
         else:
@@ -1,13 +1,54 @@
+import functools
 import requests
 from datetime import datetime
 from enum import Enum
 
+from lxml import etree
+
 from pds_doi_service.core.input.exceptions import InputFormatException
 from pds_doi_service.core.util.general_util import get_logger
 from pds_doi_service.core.util.keyword_tokenizer import KeywordTokenizer
 from pds_doi_service.core.entities.doi import Doi
 logger = get_logger('pds_doi_core.input.pds4_util')
 
+PDS4_NAMESPACE = {'pds4': 'http://pds.nasa.gov/pds4/pds/v1'}
+
+# The areas of a PDS4 label read_pds4() extracts fields from. They come first
+# in a label, so parse_pds4_label() can stop parsing once they have been read.
+PDS4_IDENTIFICATION_AREA = etree.QName(PDS4_NAMESPACE['pds4'], 'Identification_Area').text
+PDS4_CONTEXT_AREA = etree.QName(PDS4_NAMESPACE['pds4'], 'Context_Area').text
+
+# Compiled once, rather than for every label read.
+PDS4_XPATHS = {
+    key: etree.XPath(xpath, namespaces=PDS4_NAMESPACE)
+    for key, xpath in {
+        'lid': '/*/pds4:Identification_Area/pds4:logical_identifier',
+        'vid': '/*/pds4:Identification_Area/pds4:version_id',
+        'title': '/*/pds4:Identification_Area/pds4:title',
+        'publication_year':
+            '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:publication_year',
+        'modification_date':
+            '/*/pds4:Identification_Area/pds4:Modification_History/pds4:Modification_Detail/pds4:modification_date',
+        'description': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:description',
+        'product_class': '/*/pds4:Identification_Area/pds4:product_class',
+        'authors': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:author_list',
+        'editors': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:editor_list',
+        # Desire only the 'name' field
+        'investigation_area': '/*/pds4:Context_Area/pds4:Investigation_Area/pds4:name',
+        # Desire only the 'name' field.
+        'observing_system_component':
+            '/*/pds4:Context_Area/pds4:Observing_System/pds4:Observing_System_Component/pds4:name',
+        # Desire only the 'name' field
+        'target_identication': '/*/pds4:Context_Area/pds4:Target_Identification/pds4:name',
+        'primary_result_summary': '/pds4:Product_Bundle/pds4:Context_Area/pds4:Primary_Result_Summary/*',
+        'doi': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:doi'
+    }.items()
+}
+
+# The collections of a bundle, read by get_bundle_member_lids()
+PDS4_BUNDLE_MEMBER_ENTRY_XPATH = etree.XPath('/pds4:Product_Bundle/pds4:Bundle_Member_Entry',
+                                             namespaces=PDS4_NAMESPACE)
+
 class BestParserMethod(Enum):
     BY_COMMA      = 1
     BY_SEMI_COLON = 2
@@ -22,6 +63,44 @@ class DOIPDS4LabelUtil:
         doi_fields = self.process_pds4_fields(pds4_fields)
         return doi_fields
 
+    @staticmethod
+    def parse_pds4_label(source):
+        """
+        Parses the parts of a PDS4 label read_pds4() extracts fields from.
+
+        Parsing stops once the Identification_Area, and the Context_Area
+        following it if any, have been read, so whatever comes after them in
+        the label (such as a large inventory) is neither read nor parsed.
+
+        :param source: path to, or file-like object with, the PDS4 label
+        :return: lxml etree, with the root element of the label holding the
+                 areas parsed
+        """
+        depth = 0
+        root = None
+
+        for event, element in etree.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                if depth == 0:
+                    root = element
+                elif depth == 1 and element.tag not in (PDS4_IDENTIFICATION_AREA, PDS4_CONTEXT_AREA):
+                    break
+
+                depth += 1
+            else:
+                depth -= 1
+
+                if depth == 1 and element.tag == PDS4_CONTEXT_AREA:
+                    break
+
+        # The parser reads ahead of the events, so drop the partially parsed
+        # areas that come next.
+        for element in list(root):
+            if element.tag not in (PDS4_IDENTIFICATION_AREA, PDS4_CONTEXT_AREA):
+                root.remove(element)
+
+        return root.getroottree()
+
     def read_pds4(self, xml_tree):
         """
 
@@ -30,38 +109,43 @@ class DOIPDS4LabelUtil:
         """
         pds4_field_value_dict = {}
 
-        pds4_namespace = {'pds4': 'http://pds.nasa.gov/pds4/pds/v1'}
-        xpath_dict = {
-            'lid': '/*/pds4:Identification_Area/pds4:logical_identifier',
-            'vid': '/*/pds4:Identification_Area/pds4:version_id',
-            'title': '/*/pds4:Identification_Area/pds4:title',
-            'publication_year':
-                '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:publication_year',
-            'modification_date':
-                '/*/pds4:Identification_Area/pds4:Modification_History/pds4:Modification_Detail/pds4:modification_date',
-            'description': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:description',
-            'product_class': '/*/pds4:Identification_Area/pds4:product_class',
-            'authors': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:author_list',
-            'editors': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:editor_list',
-            # Desire only the 'name' field
-            'investigation_area': '/*/pds4:Context_Area/pds4:Investigation_Area/pds4:name',
-            # Desire only the 'name' field.
-            'observing_system_component':
-                '/*/pds4:Context_Area/pds4:Observing_System/pds4:Observing_System_Component/pds4:name',
-            # Desire only the 'name' field
-            'target_identication': '/*/pds4:Context_Area/pds4:Target_Identification/pds4:name',
-            'primary_result_summary':  '/pds4:Product_Bundle/pds4:Context_Area/pds4:Primary_Result_Summary/*',
-            'doi': '/*/pds4:Identification_Area/pds4:Citation_Information/pds4:doi'
-
-        }
-
-        for key, xpath in xpath_dict.items():
-            elmts = xml_tree.xpath(xpath, namespaces=pds4_namespace)
+        for key, xpath in PDS4_XPATHS.items():
+            elmts = xpath(xml_tree)
             if elmts:
                 pds4_field_value_dict[key] = ' '.join([elmt.text.strip() for elmt in elmts if elmt.text]).strip()
 
         return pds4_field_value_dict
 
+    @staticmethod
+    def get_bundle_member_lids(xml_tree, primary_only=True):
+        """
+        Returns the LIDs of the collections referenced by the
+        Bundle_Member_Entry elements of a bundle label, in label order.
+
+        :param xml_tree: lxml etree of the whole bundle label
+        :param primary_only: only return the collections the bundle is the
+                             primary member of, skipping those of other bundles
+        :return: list of LIDs, any version of a lidvid_reference removed
+        """
+        member_lids = []
+
+        for entry in PDS4_BUNDLE_MEMBER_ENTRY_XPATH(xml_tree):
+            reference = (entry.findtext('pds4:lid_reference', namespaces=PDS4_NAMESPACE)
+                         or entry.findtext('pds4:lidvid_reference', namespaces=PDS4_NAMESPACE)
+                         or '').strip()
+            member_status = entry.findtext('pds4:member_status', namespaces=PDS4_NAMESPACE) or ''
+
+            if not reference:
+                logger.warning('Skipping a Bundle_Member_Entry without a reference')
+                continue
+
+            if primary_only and member_status.strip().lower() != 'primary':
+                continue
+
+            member_lids.append(reference.split('::')[0])
+
+        return member_lids
+
     def _check_for_possible_full_name(self,names_list):
         # Given this list of token splitted using comma:
         # Case 1: "R. Deen, H. Abarca, P. Zamani, J.Maki"
@@ -189,7 +273,7 @@ class DOIPDS4LabelUtil:
                   site_url=site_url,
                   authors=self.get_author_names(authors_list),
                   editors=editors,
-                  keywords=self.get_keywords(pds4_fields),
+                  keywords=functools.partial(self.get_keywords, pds4_fields),  # Computed when read
                   date_record_added=self.get_record_added_date(pds4_fields),
                   id=osti_id
                   )
@@ -0,0 +1,107 @@
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from os.path import abspath, dirname, join
+
+from pds_doi_service.core.input.bundle_crawler import DOIBundleCrawler
+from pds_doi_service.core.input.exceptions import InputFormatException
+from pds_doi_service.core.util.http_cache import DOIHttpCache
+
+
+class ArchiveRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the archive directory, recording each path requested."""
+    protocol_version = 'HTTP/1.1'
+
+    def log_request(self, code='-', size='-'):
+        self.server.paths.append(self.path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class BundleCrawlerTestCase(unittest.TestCase):
+    _collection_ids = ('browse', 'calibration', 'data', 'miscellaneous', 'xml_schema')
+
+    def setUp(self):
+        input_dir = abspath(
+            join(dirname(__file__), os.pardir, os.pardir, os.pardir, os.pardir, 'input')
+        )
+
+        # An archive with the bundle and its primary collections
+        self._archive_dir = tempfile.TemporaryDirectory()
+        shutil.copy(join(input_dir, 'bundle_in.xml'), join(self._archive_dir.name, 'bundle.xml'))
+
+        for collection_id in self._collection_ids:
+            os.makedirs(join(self._archive_dir.name, collection_id))
+
+            with open(join(self._archive_dir.name, collection_id,
+                           f'collection_{collection_id}.xml'), 'w') as outfile:
+                outfile.write(f'<Product_Collection>{collection_id}</Product_Collection>')
+
+        self._server = ThreadingHTTPServer(
+            ('localhost', 0),
+            functools.partial(ArchiveRequestHandler, directory=self._archive_dir.name)
+        )
+        self._server.paths = []
+
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        self._url = 'http://{}:{}'.format(*self._server.server_address)
+        self._crawler = DOIBundleCrawler(DOIHttpCache(max_size=0))
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._archive_dir.cleanup()
+
+    def test_get_collection_label_url(self):
+        self.assertEqual(
+            self._crawler.get_collection_label_url(
+                'https://pds-imaging.jpl.nasa.gov/data/nsyt/insight_cameras/bundle.xml',
+                'urn:nasa:pds:insight_cameras:data'
+            ),
+            'https://pds-imaging.jpl.nasa.gov/data/nsyt/insight_cameras/data/collection_data.xml'
+        )
+
+    def test_crawl(self):
+        """Test that the bundle and its collections are read in order"""
+        labels = list(self._crawler.crawl(self._url + '/bundle.xml'))
+
+        self.assertListEqual(
+            [url for url, _ in labels],
+            [self._url + '/bundle.xml'] + [
+                f'{self._url}/{collection_id}/collection_{collection_id}.xml'
+                for collection_id in self._collection_ids
+            ]
+        )
+        self.assertEqual(labels[3][1], b'<Product_Collection>data</Product_Collection>')
+
+        # Each label is only requested once
+        self.assertEqual(len(self._server.paths), 6)
+        self.assertEqual(len(set(self._server.paths)), 6)
+
+    def test_crawl_missing_collections(self):
+        """Test that a bundle is not read without some of its collections"""
+        for collection_id in ('miscellaneous', 'xml_schema'):
+            shutil.rmtree(join(self._archive_dir.name, collection_id))
+
+        labels = self._crawler.crawl(self._url + '/bundle.xml')
+
+        with self.assertRaises(InputFormatException) as context:
+            next(labels)
+
+        for collection_id in ('miscellaneous', 'xml_schema'):
+            self.assertIn(f'{self._url}/{collection_id}/collection_{collection_id}.xml',
+                          str(context.exception))
+
+    def test_crawl_missing_bundle(self):
+        with self.assertRaises(InputFormatException):
+            list(self._crawler.crawl(self._url + '/missing_bundle.xml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import join
+
+from pds_doi_service.core.input.exceptions import InputFormatException
+from pds_doi_service.core.input.input_resolver import DOIInputResolver
+
+
+class InputResolverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = self._temp_dir.name
+
+        for path in ('bundle_insight.xml', 'readme.txt',
+                     join('data', 'collection_data.xml'),
+                     join('data', 'collection_data_inventory.csv'),
+                     join('data', 'raw', 'collection_raw.xml'),
+                     join('browse', 'collection_browse.xml')):
+            os.makedirs(join(self.input_dir, os.path.dirname(path)), exist_ok=True)
+
+            with open(join(self.input_dir, path), 'w') as outfile:
+                outfile.write(f'<Product_Collection>{path}</Product_Collection>')
+
+    def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _resolve(self, inputs, **kwargs):
+        return sorted(os.path.relpath(path, self.input_dir)
+                      for path in DOIInputResolver(**kwargs).resolve(inputs))
+
+    def test_resolve(self):
+        self.assertListEqual(
+            self._resolve(self.input_dir),
+            ['browse/collection_browse.xml', 'bundle_insight.xml',
+             'data/collection_data.xml', 'data/collection_data_inventory.csv',
+             'data/raw/collection_raw.xml', 'readme.txt']
+        )
+
+    def test_resolve_order(self):
+        """Test that directories are crawled in name order, depth first"""
+        self.assertListEqual(
+            [os.path.relpath(path, self.input_dir)
+             for path in DOIInputResolver().resolve(self.input_dir)],
+            ['browse/collection_browse.xml', 'bundle_insight.xml',
+             'data/collection_data.xml', 'data/collection_data_inventory.csv',
+             'data/raw/collection_raw.xml', 'readme.txt']
+        )
+
+    def test_resolve_filtered(self):
+        self.assertListEqual(
+            self._resolve(self.input_dir,
+                          include=DOIInputResolver.split_patterns('bundle_*.xml, collection_*.xml'),
+                          exclude=DOIInputResolver.split_patterns('browse')),
+            ['bundle_insight.xml', 'data/collection_data.xml',
+             'data/raw/collection_raw.xml']
+        )
+
+    def test_resolve_max_depth(self):
+        self.assertListEqual(self._resolve(self.input_dir, max_depth=0),
+                             ['bundle_insight.xml', 'readme.txt'])
+        self.assertNotIn('data/raw/collection_raw.xml',
+                         self._resolve(self.input_dir, max_depth=1))
+
+    def test_resolve_list(self):
+        url = 'https://pds.nasa.gov/data/insight_cameras/bundle.xml'
+        input_files = DOIInputResolver(max_depth=0).resolve(
+            f'{url},{join(self.input_dir, "data")},'
+        )
+
+        # Input files are produced lazily, in input order
+        self.assertEqual(next(input_files), url)
+        self.assertListEqual(
+            sorted(input_files),
+            [join(self.input_dir, 'data', 'collection_data.xml'),
+             join(self.input_dir, 'data', 'collection_data_inventory.csv')]
+        )
+
+    def test_resolve_contents_archives(self):
+        """Test that only the needed members of zip and tar archives are read, in place"""
+        archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, archive_dir)
+
+        for archive_format, extension in (('zip', '.zip'), ('gztar', '.tar.gz')):
+            archive = shutil.make_archive(join(archive_dir, 'insight_cameras'), archive_format,
+                                          root_dir=self.input_dir)
+
+            self.assertTrue(archive.endswith(extension))
+
+            input_files_and_contents = sorted(
+                DOIInputResolver(exclude=['browse']).resolve_contents(archive, extensions=('.xml',))
+            )
+
+            self.assertListEqual(
+                [input_file for input_file, _ in input_files_and_contents],
+                [join(archive, 'bundle_insight.xml'), join(archive, 'data', 'collection_data.xml'),
+                 join(archive, 'data', 'raw', 'collection_raw.xml')]
+            )
+            self.assertEqual(input_files_and_contents[1][1],
+                             b'<Product_Collection>data/collection_data.xml</Product_Collection>')
+
+    def test_resolve_contents_files(self):
+        """Test that files other than archives are left to be read by the caller"""
+        self.assertListEqual(
+            list(DOIInputResolver().resolve_contents(join(self.input_dir, 'bundle_insight.xml'))),
+            [(join(self.input_dir, 'bundle_insight.xml'), None)]
+        )
+
+    def test_resolve_contents_bad_archive(self):
+        bad_archive = join(self.input_dir, 'insight_cameras.zip')
+
+        with open(bad_archive, 'w') as outfile:
+            outfile.write('not an archive')
+
+        with self.assertRaises(InputFormatException):
+            list(DOIInputResolver().resolve_contents(bad_archive))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+from io import BytesIO
+from os.path import abspath, dirname, join
+
+from lxml import etree
+
+from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil
+
+
+class Pds4UtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = abspath(dirname(__file__))
+        self.input_dir = abspath(
+            join(self.test_dir, os.pardir, os.pardir, os.pardir, os.pardir, 'input')
+        )
+        self._label_util = DOIPDS4LabelUtil(
+            landing_page_template='https://pds.nasa.gov/ds-view/pds/view{}.jsp?identifier={}&version={}'
+        )
+
+    def test_parse_pds4_label(self):
+        """Test that only parsing the needed areas reads the same fields"""
+        for label in (join(self.input_dir, 'bundle_in_with_contributors.xml'),
+                      join(self.input_dir, 'bundle_in.xml'),
+                      join(self.test_dir, 'data', 'bundle.xml')):
+            pds4_fields = self._label_util.read_pds4(etree.parse(label))
+
+            self.assertDictEqual(
+                self._label_util.read_pds4(DOIPDS4LabelUtil.parse_pds4_label(label)),
+                pds4_fields
+            )
+            self.assertEqual(pds4_fields['vid'], '1.0')
+
+    def test_parse_pds4_label_stops_early(self):
+        """Test that nothing past the Context_Area of a label is parsed"""
+        with open(join(self.input_dir, 'bundle_in_with_contributors.xml'), 'rb') as infile:
+            label = infile.read()
+
+        # Truncate the label right after its Context_Area, so any attempt to
+        # parse further fails.
+        end_of_context_area = label.index(b'</Context_Area>') + len(b'</Context_Area>')
+        truncated_label = label[:end_of_context_area] + b'<Bundle><bundle_type>'
+
+        xml_tree = DOIPDS4LabelUtil.parse_pds4_label(BytesIO(truncated_label))
+
+        self.assertListEqual(
+            [etree.QName(element).localname for element in xml_tree.getroot()],
+            ['Identification_Area', 'Context_Area']
+        )
+        self.assertDictEqual(
+            self._label_util.read_pds4(xml_tree),
+            self._label_util.read_pds4(etree.fromstring(label))
+        )
+
+    def test_get_bundle_member_lids(self):
+        """Test reading the primary collections of a bundle, skipping incomplete entries"""
+        xml_tree = etree.parse(join(self.input_dir, 'bundle_in.xml'))
+
+        self.assertListEqual(
+            DOIPDS4LabelUtil.get_bundle_member_lids(xml_tree),
+            ['urn:nasa:pds:insight_cameras:browse',
+             'urn:nasa:pds:insight_cameras:calibration',
+             'urn:nasa:pds:insight_cameras:data',
+             'urn:nasa:pds:insight_cameras:miscellaneous',
+             'urn:nasa:pds:insight_cameras:xml_schema']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,13 +13,13 @@ osti.py
 Contains classes for creating output OSTI labels from DOI objects.
 """
 
-import copy
 import datetime
 from os.path import dirname, join
 
-import pystache
+from lxml import etree
 
 from pds_doi_service.core.util.general_util import get_logger
+from pds_doi_service.core.util.template_cache import get_template_cache
 from pds_doi_service.core.entities.doi import Doi
 
 logger = get_logger('pds_doi_service.core.outputs.osti')
@@ -36,58 +36,168 @@ class DOIOutputOsti:
             dirname(__file__), 'DOI_IAD2_reserved_template_20200205-mustache.xml'
         )
 
-    def create_osti_doi_draft_record(self, doi: Doi):
-        doi_fields = copy.copy(doi.__dict__)
+    @staticmethod
+    def _get_draft_record_fields(doi: Doi):
+        doi_fields = doi.to_render_context()
 
         # It is possible that the 'publication_date' type is string if the input
         # is string, check for it here.
         if not isinstance(doi.publication_date, str):
             doi_fields['publication_date'] = doi.publication_date.strftime('%Y-%m-%d')
 
+        # The keywords may be a set, sorted so records are reproducible
         if doi.keywords is not None:
-            doi_fields['keywords'] = "; ".join(doi.keywords)
+            doi_fields['keywords'] = "; ".join(sorted(doi.keywords))
+
+        return doi_fields
 
-        renderer = pystache.Renderer()
+    def create_osti_doi_draft_record_element(self, doi: Doi):
+        """Returns the draft <record> element of doi, as rendered by the template."""
+        records = etree.fromstring(
+            get_template_cache().render(
+                self._draft_template_path, self._get_draft_record_fields(doi)
+            ).encode(),
+            parser=etree.XMLParser(remove_blank_text=True)
+        )
 
-        return renderer.render_path(self._draft_template_path, doi_fields)
+        # Whitespace only text is left by the template within empty elements,
+        # such as <authors> without any author
+        for element in records.iter():
+            if element.text is not None and not element.text.strip():
+                element.text = None
 
-    def create_osti_doi_reserved_record(self, dois: list):
-        doi_fields_list = []
+        return records[0]
 
-        for doi in dois:
-            doi_fields = copy.copy(doi.__dict__)
+    def create_osti_doi_draft_record(self, doi: Doi):
+        records = etree.Element('records')
+        records.append(self.create_osti_doi_draft_record_element(doi))
 
-            logger.debug(f"convert datetime {doi_fields['publication_date']}")
-            logger.debug(f"type(doi_fields['publication_date') "
-                         f"{type(doi_fields['publication_date'])}")
+        return etree.tostring(records, pretty_print=True, xml_declaration=True,
+                              encoding='UTF-8').decode()
 
-            # It is possible that the 'publication_date' type is string if the
-            # input is string, check for it here.
-            if doi.publication_date and not isinstance(doi.publication_date, str):
-                doi_fields['publication_date'] = doi.publication_date.strftime('%Y-%m-%d')
+    def _get_reserved_record_fields(self, doi: Doi):
+        # Reserved records are not submitted with keywords, these are
+        # provided with the draft and release records.
+        doi_fields = doi.to_render_context(exclude=('keywords',))
 
-            doi_fields_list.append(doi_fields)
+        logger.debug(f"convert datetime {doi_fields['publication_date']}")
+        logger.debug(f"type(doi_fields['publication_date') "
+                     f"{type(doi_fields['publication_date'])}")
 
-        renderer = pystache.Renderer()
+        # It is possible that the 'publication_date' type is string if the
+        # input is string, check for it here.
+        if doi.publication_date and not isinstance(doi.publication_date, str):
+            doi_fields['publication_date'] = doi.publication_date.strftime('%Y-%m-%d')
 
-        return renderer.render_path(self._reserve_template_path, {'dois': doi_fields_list})
+        return doi_fields
 
-    def create_osti_doi_review_record(self, dois: list):
-        doi_fields_list = []
+    def create_osti_doi_reserved_record(self, dois: list):
+        doi_fields_list = [self._get_reserved_record_fields(doi) for doi in dois]
 
-        for doi in dois:
-            # Filter out any keys with None as the value, so the string literal
-            # "None" is not written out as an XML tag's text body
-            doi_fields_list.append(
-                dict(filter(lambda elem: elem[1] is not None, doi.__dict__.items()))
-            )
+        return get_template_cache().render(self._reserve_template_path, {'dois': doi_fields_list})
 
-        renderer = pystache.Renderer()
+    def create_osti_doi_reserved_record_element(self, doi: Doi):
+        """Returns the reserved <record> element of doi, as rendered by the template."""
+        records = etree.fromstring(
+            get_template_cache().render(
+                self._reserve_template_path, {'dois': [self._get_reserved_record_fields(doi)]}
+            ).encode(),
+            parser=etree.XMLParser(remove_blank_text=True)
+        )
+
+        return records[0]
+
+    @staticmethod
+    def _write_records(record_elements, output):
+        """
+        Writes the <records> of record_elements to output as they are
+        iterated, so only one record is held in memory at a time.
+        """
+        with etree.xmlfile(output, encoding='UTF-8') as xml_file:
+            xml_file.write_declaration()
+
+            with xml_file.element('records'):
+                xml_file.write('\n')
+
+                for record in record_elements:
+                    xml_file.write(record, pretty_print=True)
+                    xml_file.flush()
+
+    @staticmethod
+    def iter_label_records(osti_labels):
+        """
+        Yields the <record> elements of each of the provided OSTI labels, one
+        label at a time, so they may be output as they were validated.
+        """
+        parser = etree.XMLParser(remove_blank_text=True)
+
+        for osti_label in osti_labels:
+            if isinstance(osti_label, str):
+                osti_label = osti_label.encode()
+
+            yield from etree.fromstring(osti_label, parser=parser).iterfind('record')
+
+    def write_osti_label_records(self, osti_labels, output):
+        """
+        Writes the records of the provided OSTI labels to output, one label
+        at a time.
+
+        Parameters
+        ----------
+        osti_labels : iterable of str or bytes
+            The OSTI labels to write the records of, which may be produced
+            as they are written.
+        output : str or file-like
+            Path of the file, or binary file-like object such as a socket
+            file, to write the records to.
+
+        """
+        self._write_records(self.iter_label_records(osti_labels), output)
+
+    def write_osti_doi_draft_records(self, dois, output):
+        """
+        Writes the draft records of dois to output, one record at a time.
+
+        Parameters
+        ----------
+        dois : iterable of Doi
+            The Doi objects to write the records of, which may be produced
+            as they are written.
+        output : str or file-like
+            Path of the file, or binary file-like object such as a socket
+            file, to write the records to.
+
+        """
+        self._write_records(
+            (self.create_osti_doi_draft_record_element(doi) for doi in dois), output
+        )
+
+    def write_osti_doi_reserved_records(self, dois, output):
+        """
+        Writes the reserved records of dois to output, one record at a time.
+
+        Parameters
+        ----------
+        dois : iterable of Doi
+            The Doi objects to write the records of.
+        output : str or file-like
+            Path of the file, or binary file-like object such as a socket
+            file, to write the records to.
+
+        """
+        self._write_records(
+            (self.create_osti_doi_reserved_record_element(doi) for doi in dois), output
+        )
+
+    def create_osti_doi_review_record(self, dois: list):
+        # Leave out the fields set to None, so the string literal "None" is
+        # not written out as an XML tag's text body
+        doi_fields_list = [doi.to_render_context(omit_none=True) for doi in dois]
 
-        return renderer.render_path(self._reserve_template_path, {'dois': doi_fields_list})
+        return get_template_cache().render(self._reserve_template_path, {'dois': doi_fields_list})
 
     def create_osti_doi_release_record(self, doi: Doi):
-        doi_fields = copy.copy(doi.__dict__)
+        doi_fields = doi.to_render_context()
 
         # Convert 'date_record_added' to proper format if value is set and not
         # a string, otherwise use today's date.
@@ -97,6 +207,4 @@ class DOIOutputOsti:
         else:
             doi_fields['date_record_added'] = datetime.date.today().strftime('%Y-%m-%d')
 
-        renderer = pystache.Renderer()
-
-        return renderer.render_path(self._draft_template_path, doi_fields)
+        return get_template_cache().render(self._draft_template_path, doi_fields)
@@ -0,0 +1,175 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+===================
+osti_label_index.py
+===================
+
+Contains the index of the records of an OSTI label written to a transaction,
+so the record of a single LIDVID may be read without parsing the whole label.
+"""
+
+import json
+import mmap
+import os
+import re
+
+from lxml import etree
+
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger(__name__)
+
+# Suffix appended to the path of a label to name its index file
+INDEX_SUFFIX = '.index.json'
+
+# The markup the record tags are searched in: the record start and end tags,
+# and the comments, CDATA sections and processing instructions, in which
+# tags are not markup
+RECORD_MARKUP = re.compile(
+    rb'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>|<(/?)record(?=[\s/>])[^>]*?(/?)>',
+    re.DOTALL
+)
+
+
+class DOIOstiLabelIndex:
+    """
+    Maps the LIDVID of each record of an OSTI label to the offset and length,
+    in bytes, of the record in the label file, and the length of its tail,
+    the text following it.
+
+    The index is built on the first lookup of a record of the label, saved
+    next to the label, and checked against the size and modification time of
+    the label before use, so it is built again once the label changes.
+    """
+
+    def __init__(self, osti_label_file):
+        self._osti_label_file = osti_label_file
+        self._index_file = osti_label_file + INDEX_SUFFIX
+
+    @staticmethod
+    def _get_label_stat(osti_label_file):
+        label_stat = os.stat(osti_label_file)
+
+        return [label_stat.st_size, label_stat.st_mtime_ns]
+
+    @staticmethod
+    def iter_record_spans(osti_label):
+        """
+        Yields the (offset, length, tail length) of each top-level record of
+        the provided OSTI label bytes, or memory map, in document order. The
+        tail of a record is the text following it, up to the next markup.
+        """
+        record_offset = None
+        depth = 0
+
+        for match in RECORD_MARKUP.finditer(osti_label):
+            if match.group(1) is None:
+                # A comment, CDATA section or processing instruction
+                continue
+
+            if match.group(1):
+                depth -= 1
+            elif not match.group(2):
+                depth += 1
+
+                if depth > 1:
+                    continue
+
+            if record_offset is None:
+                record_offset = match.start()
+
+            if depth == 0:
+                tail_end = osti_label.find(b'<', match.end())
+
+                if tail_end < 0:
+                    tail_end = len(osti_label)
+
+                yield record_offset, match.end() - record_offset, tail_end - match.end()
+
+                record_offset = None
+
+    def build(self):
+        """
+        Builds the index of the label, saves it, and returns its mapping of
+        LIDVID to (offset, length, tail length).
+        """
+        # Imported here, as the parser imports this module
+        from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
+
+        label_stat = self._get_label_stat(self._osti_label_file)
+
+        records = {}
+
+        # The label is mapped rather than read, so only the pages scanned for
+        # record tags, and one record at a time, are held in memory. An empty
+        # label, which cannot be mapped, has no records.
+        if label_stat[0]:
+            with open(self._osti_label_file, 'rb') as infile, \
+                    mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as osti_label:
+                for offset, length, tail_length in self.iter_record_spans(osti_label):
+                    record = etree.fromstring(osti_label[offset:offset + length])
+                    lidvid = DOIOstiWebParser.get_lidvid(record)
+
+                    # The first record of a LIDVID is the one returned, as by a search
+                    if lidvid and lidvid not in records:
+                        records[lidvid] = [offset, length, tail_length]
+
+        try:
+            # Replaced at once, so a concurrent reader never reads half an index
+            temp_index_file = f'{self._index_file}.{os.getpid()}'
+
+            with open(temp_index_file, 'w') as outfile:
+                json.dump({'label': label_stat, 'records': records}, outfile)
+
+            os.replace(temp_index_file, self._index_file)
+        except OSError as err:
+            # The index is rebuilt by the next lookup
+            logger.warning(f'Could not save the index of {self._osti_label_file}: {str(err)}')
+
+        logger.debug(f'Indexed {len(records)} record(s) of {self._osti_label_file}')
+
+        return records
+
+    def get_records(self):
+        """
+        Returns the mapping of LIDVID to (offset, length, tail length) of the
+        records of the label, from its saved index if up to date, or else from
+        the index built again.
+        """
+        try:
+            with open(self._index_file, 'r') as infile:
+                index = json.load(infile)
+
+            if index['label'] == self._get_label_stat(self._osti_label_file):
+                return index['records']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        return self.build()
+
+    def get_record(self, lidvid):
+        """
+        Returns the record element of the LIDVID, with its tail, read from its
+        span of the label only, or None if the label has no such record.
+        """
+        span = self.get_records().get(lidvid)
+
+        if span is None:
+            return None
+
+        offset, length, tail_length = span
+
+        with open(self._osti_label_file, 'rb') as infile:
+            infile.seek(offset)
+            record_bytes = infile.read(length + tail_length)
+
+        record = etree.fromstring(record_bytes[:length])
+        record.tail = record_bytes[length:].decode('utf-8') or None
+
+        return record
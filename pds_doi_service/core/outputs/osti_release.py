@@ -26,75 +26,54 @@ class DOIReleaseOstiUtil:
         o_response_dicts = []
 
         doc = etree.fromstring(render_doc.encode())  # The content of render_doc may have preamble.  Change to bytes.
-        my_root = doc.getroottree()
-
-        # Trim down input to just fields we want.
-        element_record = 0
-        for element in my_root.iter():
-            if element.tag == 'record':
-                my_record = my_root.xpath(element.tag)[0]
-
-                response_dict = {}  # This dictionary will be added to o_response_dicts when all fields have been extracted.
-
-                if my_root.xpath('record/title')[element_record] is not None and my_root.xpath('record/title')[element_record].text:
-                    response_dict['title']               = my_root.xpath('record/title')[element_record].text
-                if my_root.xpath('record/id')[element_record] is not None and len(my_root.xpath('record/id')[element_record].text) > 0:
-                    response_dict['id']                  = my_root.xpath('record/id')[element_record].text
-                if my_root.xpath('record/site_url')[element_record] is not None and len(my_root.xpath('record/site_url')[element_record].text) > 0:
-                    response_dict['site_url']                  = my_root.xpath('record/site_url')[element_record].text
-                if my_root.xpath('record/doi')[element_record] is not None and my_root.xpath('record/doi')[element_record].text:
-                    response_dict['doi']                 = my_root.xpath('record/doi')[element_record].text
-                if my_root.xpath('record/publication_date')[element_record] is not None and my_root.xpath('record/publication_date')[element_record].text:
-                    response_dict['publication_date']      = my_root.xpath('record/publication_date')[element_record].text
-                if my_root.xpath('record/product_type')[element_record] is not None and my_root.xpath('record/product_type')[element_record].text:
-                    response_dict['product_type']          = my_root.xpath('record/product_type')[element_record].text
-                if my_root.xpath('record/product_type_specific')[element_record] is not None and my_root.xpath('record/product_type_specific')[element_record].text:
-                    response_dict['product_type_specific'] = my_root.xpath('record/product_type_specific')[element_record].text
-
-                if my_root.xpath('record/authors'):
-                    num_authors = len(my_root.xpath('record/authors')[0])
-                    logger.debug(f"num_authors {num_authors}")
-
-                    # Only create an entry for 'authors' in response_dict if there are any sub fields 'record/authors'
-                    if num_authors > 0:
-                        response_dict['authors'] = []
-                        for ii in range(num_authors):
-                            one_author = {}
-                            author_element = my_root.xpath('record/authors')[0]
-
-                            # No need to check for existence of 'first_name' and 'last_name' since schematron would already have done that validation.
-                            one_author['first_name'] = author_element.xpath('author/first_name')[ii].text
-                            one_author['last_name']  = author_element.xpath('author/last_name')[ii].text
-                            response_dict['authors'].append(one_author)
-
-                        logger.debug("response_dict['authors'] {response_dict['authors']}")
-                    else:
-                        pass
-
-                if my_root.xpath('record/related_identifiers'):
-                    num_identifiers = len(my_root.xpath('record/related_identifiers')[0])
-                    logger.debug(f"num_identifiers {num_identifiers}")
-
-                    # Only create an entry for 'related_identifiers' if there are any sub fields 'record/related_identifiers'
-                    if num_identifiers > 0:
-                        response_dict['related_identifiers'] = []
-                        for ii in range(num_identifiers):
-                            one_identifier = {}
-                            identifier_element = my_root.xpath('record/related_identifiers')[0]
-
-                            # No need to check for existence of 'identifier_value' and 'identifier_type' since schematron would already have done that validation.
-                            one_identifier['identifier_value'] = identifier_element.xpath('related_identifier/identifier_value')[ii].text 
-                            one_identifier['identifier_type']  = identifier_element.xpath('related_identifier/identifier_type')[ii].text 
-                            one_identifier['relation_type']    = identifier_element.xpath('related_identifier/relation_type')[ii].text 
-
-                            response_dict['related_identifiers'].append(one_identifier)
-                        logger.debug("response_dict['related_identifiers'] {response_dict['related_identifiers']}")
-                    else:
-                        pass
-
-                o_response_dicts.append(response_dict)
-                element_record += 1
 
+        # Trim down input to just fields we want, reading each record once rather than querying all records
+        # for the fields of each one.
+        for my_record in doc.findall('record'):
+            response_dict = {}  # This dictionary will be added to o_response_dicts when all fields have been extracted.
+
+            for field in ('title', 'id', 'site_url', 'doi', 'publication_date', 'product_type', 'product_type_specific'):
+                field_element = my_record.find(field)
+
+                if field_element is not None and field_element.text:
+                    response_dict[field] = field_element.text
+
+            authors_element = my_record.find('authors')
+
+            if authors_element is not None:
+                author_elements = authors_element.findall('author')
+                logger.debug(f"num_authors {len(author_elements)}")
+
+                # Only create an entry for 'authors' in response_dict if there are any sub fields 'record/authors'
+                if author_elements:
+                    # No need to check for existence of 'first_name' and 'last_name' since schematron would already have done that validation.
+                    response_dict['authors'] = [
+                        {'first_name': author_element.find('first_name').text,
+                         'last_name': author_element.find('last_name').text}
+                        for author_element in author_elements
+                    ]
+
+                    logger.debug(f"response_dict['authors'] {response_dict['authors']}")
+
+            identifiers_element = my_record.find('related_identifiers')
+
+            if identifiers_element is not None:
+                identifier_elements = identifiers_element.findall('related_identifier')
+                logger.debug(f"num_identifiers {len(identifier_elements)}")
+
+                # Only create an entry for 'related_identifiers' if there are any sub fields 'record/related_identifiers'
+                if identifier_elements:
+                    # No need to check for existence of 'identifier_value' and 'identifier_type' since schematron would already have done that validation.
+                    response_dict['related_identifiers'] = [
+                        {'identifier_value': identifier_element.find('identifier_value').text,
+                         'identifier_type': identifier_element.find('identifier_type').text,
+                         'relation_type': identifier_element.find('relation_type').text}
+                        for identifier_element in identifier_elements
+                    ]
+
+                    logger.debug(f"response_dict['related_identifiers'] {response_dict['related_identifiers']}")
+
+            o_response_dicts.append(response_dict)
 
         logger.debug(f"o_response_dicts {o_response_dicts}")
 
@@ -20,14 +20,22 @@ from requests.auth import HTTPBasicAuth
 import requests
 
 from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.util.config_parser import DOIConfigUtil
 from pds_doi_service.core.util.general_util import get_logger
 from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
 
 logger = get_logger('pds_doi_core.cmd.pds_doi_cmd')
 
+# The content type requested from OSTI for each query_format
+QUERY_CONTENT_TYPES = {
+    'xml': 'application/xml',
+    'json': 'application/json'
+}
+
 
 class DOIOstiWebClient:
     _web_parser = DOIOstiWebParser()
+    m_doi_config_util = DOIConfigUtil()
 
     def webclient_draft_doi(self, target_url, contributor_value):
         """Draft a DOI from input by making a request to the server."""
@@ -97,13 +105,51 @@ class DOIOstiWebClient:
             if query_dict = {'id'=1327397,'status'='Registered'}
                 then https://www.osti.gov/iad2test/api/records?id=1327397&status=Registered
         """
+        osti_response = self._query_records(i_url, query_dict, i_username, i_password,
+                                            QUERY_CONTENT_TYPES['xml'])
+
+        return osti_response.text
+
+    def webclient_query_dois(self, i_url, query_dict=None, i_username=None,
+                             i_password=None, query_format=None):
+        """
+        Queries records from the OSTI server as webclient_query_doi() does,
+        and returns them parsed as Doi objects, along with the errors
+        reported by OSTI.
+
+        The records are requested in the query_format configuration value,
+        either xml or json, unless query_format is provided. JSON responses
+        are decoded straight into Doi objects, without building an XML tree.
+
+        Raises
+        ------
+        ValueError
+            If the query format is not one of xml or json.
+
+        """
+        if query_format is None:
+            query_format = self.m_doi_config_util.get_config().get('OSTI', 'query_format')
+
+        if query_format not in QUERY_CONTENT_TYPES:
+            raise ValueError(f'Unknown query_format {query_format}, '
+                             f'expected one of {", ".join(QUERY_CONTENT_TYPES)}')
+
+        osti_response = self._query_records(i_url, query_dict, i_username, i_password,
+                                            QUERY_CONTENT_TYPES[query_format])
+
+        if query_format == 'json':
+            return self._web_parser.response_get_parse_osti_json(osti_response.content)
+
+        return self._web_parser.response_get_parse_osti_xml(osti_response.content)
+
+    def _query_records(self, i_url, query_dict, i_username, i_password, content_type):
         MAX_TOTAL_ROWS_RETRIEVE= 1000000000
 
         auth = HTTPBasicAuth(i_username, i_password)
 
         headers = {
-            'Accept': 'application/xml',
-            'Content-Type': 'application/xml'
+            'Accept': content_type,
+            'Content-Type': content_type
         }
 
         # OSTI server requires 'rows' field to know how many max rows to fetch at once.
@@ -121,12 +167,10 @@ class DOIOstiWebClient:
         logger.debug(f"query_dict {query_dict}")
         logger.debug(f"i_url {i_url}")
 
-        osti_response = requests.get(i_url,
-                                     auth=auth,
-                                     params=query_dict,
-                                     headers=headers)
-
-        return osti_response.text
+        return requests.get(i_url,
+                            auth=auth,
+                            params=query_dict,
+                            headers=headers)
 
     def _verify_osti_reserved_status(self, i_doi_label):
         """
@@ -147,9 +191,8 @@ class DOIOstiWebClient:
         num_reserved_statuses = 0
         num_record_records = 0
 
-        for element in my_root.findall('record'):
+        for my_record in my_root.findall('record'):
             num_record_records += 1
-            my_record = my_root.xpath(element.tag)[0]
 
             if my_record.attrib['status'] == DoiStatus.Reserved:
                 num_reserved_statuses += 1
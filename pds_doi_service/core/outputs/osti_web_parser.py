@@ -14,14 +14,127 @@ Contains classes and functions for parsing OSTI XML labels.
 """
 
 from datetime import datetime
+from io import BytesIO
+
 from lxml import etree
 
+try:
+    # Decodes OSTI JSON responses with orjson when installed
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 from pds_doi_service.core.entities.doi import Doi, DoiStatus
 from pds_doi_service.core.input.exceptions import InputFormatException, UnknownLIDVIDException
+from pds_doi_service.core.outputs.osti_label_index import DOIOstiLabelIndex
 from pds_doi_service.core.util.general_util import get_logger
 
 logger = get_logger('pds_doi_core.outputs.osti_web_parser')
 
+# Fields every record other than an error record must have
+REQUIRED_FIELDS = ('title', 'publication_date', 'product_type', 'product_type_specific')
+
+# Fields set on the Doi of a record when present
+OPTIONAL_FIELDS = ('id', 'doi', 'sponsoring_organization', 'publisher',
+                   'availability', 'country', 'description', 'site_url',
+                   'site_code', 'date_record_added', 'date_record_updated',
+                   'keywords', 'authors', 'contributors')
+
+# The identifier values of the related identifiers of a record of a given
+# type, compiled once rather than on every record
+RELATED_IDENTIFIER_VALUES = etree.XPath(
+    "related_identifiers/related_identifier[identifier_type=$identifier_type]/identifier_value"
+)
+
+
+def _read_text(element):
+    return element.text
+
+
+def _read_keywords(element):
+    return element.text.split('; ') if element.text is not None else None
+
+
+def _read_authors(element):
+    return DOIOstiWebParser.parse_author_names(element)
+
+
+def _read_contributors(element):
+    return DOIOstiWebParser.parse_contributor_names(element)
+
+
+def _read_presence(element):
+    return True
+
+
+def _read_json_text(value):
+    # Numbers such as the OSTI id are text in the XML responses
+    return value if isinstance(value, str) else str(value)
+
+
+def _read_json_keywords(value):
+    return value.split('; ') if isinstance(value, str) else value
+
+
+def _read_json_authors(value):
+    authors = []
+
+    for author in value:
+        full_name = author.get('full_name')
+
+        if full_name is not None:
+            authors.append({'full_name': full_name})
+            continue
+
+        author_dict = {}
+        first_name = author.get('first_name')
+        last_name = author.get('last_name')
+        middle_name = author.get('middle_name')
+
+        if first_name is not None and last_name is not None:
+            author_dict.update({'first_name': first_name, 'last_name': last_name})
+
+        if middle_name is not None:
+            author_dict['middle_name'] = middle_name
+
+        if author_dict:
+            authors.append(author_dict)
+
+    return authors
+
+
+def _read_json_contributors(value):
+    return [{'full_name': contributor['full_name']}
+            for contributor in value if contributor.get('full_name') is not None]
+
+
+# The fields a LIDVID is read from, by DOIOstiWebParser.get_lidvid()
+LIDVID_FIELD_READERS = {
+    'accession_number': _read_text,
+    'related_identifiers': _read_presence,
+    'report_numbers': _read_text,
+    'site_url': _read_presence
+}
+
+# The fields read from a record, by DOIOstiWebParser.read_record_fields()
+RECORD_FIELD_READERS = dict(
+    {field: _read_text for field in REQUIRED_FIELDS + OPTIONAL_FIELDS},
+    keywords=_read_keywords,
+    authors=_read_authors,
+    contributors=_read_contributors,
+    accession_number=_read_text,
+    related_identifiers=_read_presence,
+    report_numbers=_read_text
+)
+
+# The optional fields read from a JSON record, as from RECORD_FIELD_READERS
+JSON_FIELD_READERS = dict(
+    {field: _read_json_text for field in OPTIONAL_FIELDS},
+    keywords=_read_json_keywords,
+    authors=_read_json_authors,
+    contributors=_read_json_contributors
+)
+
 
 class DOIOstiWebParser:
     """
@@ -66,24 +179,25 @@ class DOIOstiWebParser:
         # If they exist, collect all the first name, middle name, last names or
         # full name fields into a list of dictionaries.
         for single_author in authors_element:
-            first_name = single_author.xpath('first_name')
-            last_name = single_author.xpath('last_name')
-            full_name = single_author.xpath('full_name')
-            middle_name = single_author.xpath('middle_name')
+            # The first name element of each tag, read in a single pass
+            names = {}
+
+            for name_element in single_author:
+                names.setdefault(name_element.tag, name_element.text)
 
             author_dict = {}
 
-            if full_name:
-                author_dict['full_name'] = full_name[0].text
+            if 'full_name' in names:
+                author_dict['full_name'] = names['full_name']
             else:
-                if first_name and last_name:
+                if 'first_name' in names and 'last_name' in names:
                     author_dict.update(
-                        {'first_name': first_name[0].text,
-                         'last_name': last_name[0].text}
+                        {'first_name': names['first_name'],
+                         'last_name': names['last_name']}
                     )
 
-                if middle_name:
-                    author_dict.update({'middle_name': middle_name[0].text})
+                if 'middle_name' in names:
+                    author_dict.update({'middle_name': names['middle_name']})
 
             # It is possible that the record contains no authors.
             if author_dict:
@@ -103,12 +217,12 @@ class DOIOstiWebParser:
 
         # If they exist, collect all the contributor name fields into a list of dictionaries.
         for single_contributor in contributors_element:
-            full_name = single_contributor.xpath('full_name')
-
             contributor_dict = {}
 
-            if full_name:
-                contributor_dict['full_name'] = full_name[0].text
+            for name_element in single_contributor:
+                if name_element.tag == 'full_name':
+                    contributor_dict['full_name'] = name_element.text
+                    break
 
             # It is possible that the record contains no contributor.
             if contributor_dict:
@@ -119,47 +233,68 @@ class DOIOstiWebParser:
         return o_contributors_list
 
     @staticmethod
-    def parse_optional_fields(io_doi, single_record_element):
+    def read_record_fields(record, field_readers=None):
         """
-        Given a single record element, parse the following optional fields which
-        may not be present from the OSTI response:
+        Reads the fields of a single record element in a single pass over its
+        children, dispatching each child on its tag to the reader of the field.
+        Only the first child of each tag is read.
 
-            'id', 'site_url', 'doi', 'date_record_added', 'date_record_updated',
-            'doi_message', 'authors'.
+        Parameters
+        ----------
+        record : lxml.etree._Element
+            The <record> element to read.
+        field_readers : dict, optional
+            Maps the tag of each field to read to the function returning its
+            value from the field element. Defaults to RECORD_FIELD_READERS.
+
+        Returns
+        -------
+        record_fields : dict
+            Maps the tag of each field present in the record to its value.
 
         """
-        optional_fields = ['id', 'doi', 'sponsoring_organization',
-                           'publisher', 'availability', 'country',
-                           'description', 'site_url', 'site_code',
-                           'date_record_added', 'date_record_updated',
-                           'keywords', 'authors', 'contributors']
-
-        for optional_field in optional_fields:
-            optional_field_element = single_record_element.xpath(optional_field)
-
-            if optional_field_element:
-                if optional_field == 'keywords' and optional_field_element[0].text is not None:
-                    io_doi.keywords = optional_field_element[0].text.split('; ')
-                elif optional_field == 'authors':
-                    io_doi.authors = DOIOstiWebParser.parse_author_names(
-                        optional_field_element[0]
-                    )
-                elif optional_field == 'contributors':
-                    io_doi.contributors = DOIOstiWebParser.parse_contributor_names(
-                        optional_field_element[0]
-                    )
-                else:
-                    setattr(io_doi, optional_field, optional_field_element[0].text)
+        if field_readers is None:
+            field_readers = RECORD_FIELD_READERS
 
-                logger.debug(
-                    f"Adding optional field "
-                    f"'{optional_field}': {getattr(io_doi, optional_field)}"
-                )
+        record_fields = {}
+
+        for child in record:
+            tag = child.tag
 
-        logger.debug(f"io_doi) {io_doi}")
+            if tag not in record_fields:
+                field_reader = field_readers.get(tag)
+
+                if field_reader is not None:
+                    record_fields[tag] = field_reader(child)
+
+        return record_fields
+
+    @staticmethod
+    def _set_optional_fields(io_doi, record_fields):
+        for optional_field in OPTIONAL_FIELDS:
+            if optional_field in record_fields:
+                setattr(io_doi, optional_field, record_fields[optional_field])
+
+        logger.debug('io_doi) %s', io_doi)
 
         return io_doi
 
+    @staticmethod
+    def parse_optional_fields(io_doi, single_record_element):
+        """
+        Given a single record element, parse the following optional fields which
+        may not be present from the OSTI response:
+
+            'id', 'doi', 'sponsoring_organization', 'publisher', 'availability',
+            'country', 'description', 'site_url', 'site_code',
+            'date_record_added', 'date_record_updated', 'keywords', 'authors',
+            'contributors'.
+
+        """
+        return DOIOstiWebParser._set_optional_fields(
+            io_doi, DOIOstiWebParser.read_record_fields(single_record_element)
+        )
+
     @staticmethod
     def get_lidvid_from_site_url(record):
         """
@@ -169,7 +304,10 @@ class DOIOstiWebParser:
             https://pds.jpl.nasa.gov/ds-view/pds/viewBundle.jsp?identifier=urn%3Anasa%3Apds%3Ainsight_cameras&amp;version=1.0
 
         """
-        site_url = record.xpath("site_url")[0].text
+        return DOIOstiWebParser._parse_site_url_lidvid(record.find("site_url").text)
+
+    @staticmethod
+    def _parse_site_url_lidvid(site_url):
         site_tokens = site_url.split("identifier=")
 
         identifier_tokens = site_tokens[1].split(";")
@@ -183,6 +321,32 @@ class DOIOstiWebParser:
 
         return lid_vid_value
 
+    @staticmethod
+    def _get_lidvid(record, record_fields):
+        if 'accession_number' in record_fields:
+            return record_fields['accession_number']
+
+        if 'related_identifiers' in record_fields:
+            for identifier_type in ('URL', 'URN'):
+                identifier_values = RELATED_IDENTIFIER_VALUES(
+                    record, identifier_type=identifier_type
+                )
+
+                if identifier_values:
+                    return identifier_values[0].text
+
+        if 'report_numbers' in record_fields:
+            return record_fields['report_numbers']
+
+        if 'site_url' in record_fields:
+            # For some record, the lidvid can be parsed from 'site_url' field as last resort.
+            return DOIOstiWebParser.get_lidvid_from_site_url(record)
+
+        # For now, do not consider it an error if cannot get the lidvid.
+        logger.debug("Cannot find identifier_value. "
+                     "Expecting one of ['accession_number','identifier_type','report_numbers'] tags")
+        return None
+
     @staticmethod
     def get_lidvid(record):
         """
@@ -190,25 +354,9 @@ class DOIOstiWebParser:
         This function searches each location, and returns the first encountered
         LIDVID.
         """
-        if record.xpath("accession_number"):
-            return record.xpath("accession_number")[0].text
-        elif record.xpath("related_identifiers/related_identifier[./identifier_type='URL']"):
-            return record.xpath(
-                "related_identifiers/related_identifier[./identifier_type='URL']/identifier_value")[0].text
-        elif record.xpath("related_identifiers/related_identifier[./identifier_type='URN']"):
-            return record.xpath(
-                "related_identifiers/related_identifier[./identifier_type='URN']/identifier_value")[0].text
-        elif record.xpath("report_numbers"):
-            return record.xpath("report_numbers")[0].text
-        elif record.xpath("site_url"):
-            # For some record, the lidvid can be parsed from 'site_url' field as last resort.
-            lid_vid_value = DOIOstiWebParser.get_lidvid_from_site_url(record)
-            return lid_vid_value
-        else:
-            # For now, do not consider it an error if cannot get the lidvid.
-            logger.debug("Cannot find identifier_value. "
-                         "Expecting one of ['accession_number','identifier_type','report_numbers'] tags")
-            return None
+        return DOIOstiWebParser._get_lidvid(
+            record, DOIOstiWebParser.read_record_fields(record, LIDVID_FIELD_READERS)
+        )
 
     @staticmethod
     def get_record_for_lidvid(osti_label_file, lidvid):
@@ -216,6 +364,10 @@ class DOIOstiWebParser:
         Returns the record entry corresponding to the provided LIDVID from the
         OSTI XML label file.
 
+        Only the record is read from the label, located with the index of the
+        label, which is built first if the label has none (see
+        DOIOstiLabelIndex).
+
         Parameters
         ----------
         osti_label_file : str
@@ -236,15 +388,9 @@ class DOIOstiWebParser:
             label file.
 
         """
-        root = etree.parse(osti_label_file).getroot()
-
-        records = root.xpath('record')
+        result = DOIOstiLabelIndex(osti_label_file).get_record(lidvid)
 
-        for record in records:
-            if DOIOstiWebParser.get_lidvid(record) == lidvid:
-                result = record
-                break
-        else:
+        if result is None:
             raise UnknownLIDVIDException(
                 f'Could not find entry for lidvid "{lidvid}" in OSTI label file '
                 f'{osti_label_file}.'
@@ -257,6 +403,170 @@ class DOIOstiWebParser:
             new_root, pretty_print=True, xml_declaration=True, encoding='UTF-8'
         ).decode('utf-8')
 
+    @staticmethod
+    def get_record_labels(osti_response_text):
+        """
+        Splits a multi-record OSTI response into single-record labels.
+
+        Parameters
+        ----------
+        osti_response_text : str or bytes
+            The OSTI XML label or query response to split.
+
+        Returns
+        -------
+        record_labels : list of tuple
+            One (doi, label) tuple per <record> element, in document order.
+            The doi is None for records without a <doi> tag. Each label
+            embeds its record in a <records> tag, so it can be parsed with
+            response_get_parse_osti_xml() or written to disk as-is.
+
+        """
+        record_labels = []
+
+        root = etree.fromstring(osti_response_text)
+
+        for record in root.findall('record'):
+            doi_value = record.findtext('doi')
+
+            new_root = etree.Element('records')
+            new_root.append(record)
+
+            record_labels.append(
+                (doi_value, etree.tostring(new_root, pretty_print=True, encoding='unicode'))
+            )
+
+        return record_labels
+
+    @staticmethod
+    def _parse_record(single_record_element, index):
+        """
+        Parses a single record element into a (doi, errors) tuple, see
+        iter_osti_records().
+        """
+        errors = []
+
+        status = single_record_element.get('status')
+
+        if status is None:
+            raise InputFormatException(
+                f'Could not parse a status for record {index + 1} from the '
+                f'provided OSTI XML.'
+            )
+
+        if status.lower() == 'error':
+            # The 'error' record is parsed differently and does not have all
+            # the attributes we desire.
+            # Get the entire text and save it in 'error' key. Print a WARN
+            # only since it is not related to any particular 'doi' or 'id' action.
+            logger.error(f"ERROR OSTI RECORD {single_record_element.text}")
+
+            # Check for any errors reported back from OSTI and save
+            # them off to be returned
+            errors_element = single_record_element.find('errors')
+
+            if errors_element is not None:
+                for error_element in errors_element:
+                    errors.append(error_element.text)
+
+            return None, errors
+
+        record_fields = DOIOstiWebParser.read_record_fields(single_record_element)
+        lidvid = DOIOstiWebParser._get_lidvid(single_record_element, record_fields)
+
+        if not lidvid:
+            logger.warning(
+                f"No lidvid reference found in DOI "
+                f"{record_fields.get('doi')}"
+            )
+
+            return None, errors
+
+        for required_field in REQUIRED_FIELDS:
+            if required_field not in record_fields:
+                raise InputFormatException(
+                    f'Could not parse a {required_field} for record '
+                    f'{index + 1} from the provided OSTI XML.'
+                )
+
+        # Move the fetching of identifier_type in parse_optional_fields() function.
+        # The following 4 fields were deleted from constructor of Doi
+        # to inspect individually since the code was failing:
+        #     ['id','doi','date_record_added',date_record_updated']
+        doi = Doi(
+            title=record_fields['title'],
+            publication_date=record_fields['publication_date'],
+            product_type=record_fields['product_type'],
+            product_type_specific=record_fields['product_type_specific'],
+            related_identifier=lidvid,
+            status=DoiStatus(status.lower())
+        )
+
+        # Parse for some optional fields that may not be present in
+        # every record from OSTI.
+        doi = DOIOstiWebParser._set_optional_fields(doi, record_fields)
+
+        return doi, errors
+
+    @staticmethod
+    def iter_osti_records(source):
+        """
+        Parses a response from a GET (query) or a PUT to the OSTI server
+        (in XML query format) one record at a time, yielding each record as
+        soon as it is parsed and freeing it afterwards, so memory does not
+        grow with the number of records.
+
+        Parameters
+        ----------
+        source : str, bytes or file-like object
+            The OSTI XML, as text or bytes, the path to an OSTI XML file, or
+            a binary stream to read it from, such as the raw stream of a
+            response.
+
+        Yields
+        ------
+        doi : Doi or None
+            The Doi parsed from the record, or None for an error record.
+        errors : list of str
+            The errors reported by OSTI in an error record, empty otherwise.
+
+        Records without a LIDVID are skipped.
+
+        Raises
+        ------
+        InputFormatException
+            If a record has no status, or misses one of the required fields.
+
+        """
+        if isinstance(source, str) and source.lstrip().startswith('<'):
+            source = source.encode('utf-8')
+
+        if isinstance(source, (bytes, bytearray)):
+            source = BytesIO(source)
+
+        index = 0
+
+        for _, single_record_element in etree.iterparse(source, events=('end',), tag='record'):
+            parent_element = single_record_element.getparent()
+
+            # Only parse the records of the root element, a record tag nested
+            # in one of them is one of its fields.
+            if parent_element is None or parent_element.getparent() is not None:
+                continue
+
+            doi, errors = DOIOstiWebParser._parse_record(single_record_element, index)
+
+            if doi is not None or errors:
+                yield doi, errors
+
+            index += 1
+
+            # Free the record, and the whitespace or comments preceding it
+            single_record_element.clear()
+
+            while single_record_element.getprevious() is not None:
+                del parent_element[0]
+
     @staticmethod
     def response_get_parse_osti_xml(osti_response_text):
         """
@@ -266,106 +576,137 @@ class DOIOstiWebParser:
         By default, all possible fields are extracted. If desire to only extract
         smaller set of fields, they should be specified accordingly.
         Specific fields are extracted from input. Not all fields in XML are used.
+        The children of each record are read in a single pass, see
+        read_record_fields(). To process the records of a large response
+        one at a time instead, see iter_osti_records().
 
         """
         dois = []
         errors = []
 
-        doc = etree.fromstring(osti_response_text)
-        my_root = doc.getroottree()
+        for doi, record_errors in DOIOstiWebParser.iter_osti_records(osti_response_text):
+            if doi is not None:
+                dois.append(doi)
 
-        # Trim down input to just fields we want.
-        for index, single_record_element in enumerate(my_root.findall('record')):
-            status = single_record_element.get('status')
+            errors.extend(record_errors)
 
-            if status is None:
-                raise InputFormatException(
-                    f'Could not parse a status for record {index + 1} from the '
-                    f'provided OSTI XML.'
-                )
+        return dois, errors
 
-            if status.lower() == 'error':
-                # The 'error' record is parsed differently and does not have all
-                # the attributes we desire.
-                # Get the entire text and save it in 'error' key. Print a WARN
-                # only since it is not related to any particular 'doi' or 'id' action.
-                logger.error(f"ERROR OSTI RECORD {single_record_element.text}")
+    @staticmethod
+    def _get_json_lidvid(record):
+        if record.get('accession_number') is not None:
+            return record['accession_number']
 
-                # Check for any errors reported back from OSTI and save
-                # them off to be returned
-                errors_element = single_record_element.xpath('errors')
+        for identifier_type in ('URL', 'URN'):
+            for related_identifier in record.get('related_identifiers') or ():
+                if (related_identifier.get('identifier_type') == identifier_type
+                        and related_identifier.get('identifier_value') is not None):
+                    return related_identifier['identifier_value']
 
-                if len(errors_element):
-                    for error_element in errors_element[0]:
-                        errors.append(error_element.text)
-            else:
-                lidvid = DOIOstiWebParser.get_lidvid(single_record_element)
-
-                if lidvid:
-                    # Move the fetching of identifier_type in parse_optional_fields() function.
-                    # The following 4 fields were deleted from constructor of Doi
-                    # to inspect individually since the code was failing:
-                    #     ['id','doi','date_record_added',date_record_updated']
-                    doi = Doi(
-                        title=single_record_element.xpath('title')[0].text,
-                        publication_date=single_record_element.xpath('publication_date')[0].text,
-                        product_type=single_record_element.xpath('product_type')[0].text,
-                        product_type_specific=single_record_element.xpath('product_type_specific')[0].text,
-                        related_identifier=lidvid,
-                        status=DoiStatus(status.lower())
-                    )
+        if record.get('report_numbers') is not None:
+            return record['report_numbers']
 
-                    # Parse for some optional fields that may not be present in
-                    # every record from OSTI.
-                    doi = DOIOstiWebParser.parse_optional_fields(doi, single_record_element)
+        if record.get('site_url') is not None:
+            return DOIOstiWebParser._parse_site_url_lidvid(record['site_url'])
 
-                    dois.append(doi)
-                else:
-                    logger.warning(
-                        f"No lidvid reference found in DOI "
-                        f"{single_record_element.xpath('doi')[0].text}"
-                    )
+        return None
+
+    @staticmethod
+    def _parse_json_record(record, index):
+        """
+        Parses a single record of an OSTI JSON response into a (doi, errors)
+        tuple, as _parse_record() does for a record element.
+        """
+        status = record.get('status')
 
-        # end for index, single_record_element in enumerate(my_root.findall('record')):
+        if status is None:
+            raise InputFormatException(
+                f'Could not parse a status for record {index + 1} from the '
+                f'provided OSTI JSON.'
+            )
 
-        return dois, errors
+        if status.lower() == 'error':
+            errors = list(record.get('errors') or ())
+
+            logger.error(f"ERROR OSTI RECORD {errors}")
+
+            return None, errors
+
+        lidvid = DOIOstiWebParser._get_json_lidvid(record)
+
+        if not lidvid:
+            logger.warning(f"No lidvid reference found in DOI {record.get('doi')}")
+
+            return None, []
+
+        for required_field in REQUIRED_FIELDS:
+            if record.get(required_field) is None:
+                raise InputFormatException(
+                    f'Could not parse a {required_field} for record '
+                    f'{index + 1} from the provided OSTI JSON.'
+                )
+
+        doi = Doi(
+            title=record['title'],
+            publication_date=record['publication_date'],
+            product_type=record['product_type'],
+            product_type_specific=record['product_type_specific'],
+            related_identifier=lidvid,
+            status=DoiStatus(status.lower())
+        )
+
+        for optional_field, json_field_reader in JSON_FIELD_READERS.items():
+            value = record.get(optional_field)
+
+            if value is not None:
+                setattr(doi, optional_field, json_field_reader(value))
+
+        logger.debug('io_doi) %s', doi)
+
+        return doi, []
 
     @staticmethod
     def response_get_parse_osti_json(osti_response):
         """
-        Parses a response from a query to the OSTI server (in JSON format) and
-        returns a JSON object.
+        Parses a response from a query to the OSTI server (in JSON format)
+        into a list of Doi objects, mapping each record directly rather than
+        through an XML tree.
+
+        The records are read as response_get_parse_osti_xml() reads them,
+        null values being treated as missing fields.
+
+        Parameters
+        ----------
+        osti_response : str, bytes, dict or list
+            The OSTI JSON response, either as text or bytes, which are decoded
+            with orjson if installed, or already decoded.
 
-        Specific fields are extracted from input. Not all fields in JSON are used.
+        Returns
+        -------
+        dois : list of Doi
+            The Doi objects of the records with a LIDVID.
+        errors : list of str
+            The errors reported by OSTI in error records.
 
         """
-        dois = []  # It is possible that the query resulted in no rows.
-
-        # These are the fields in a record returned by OSTI
-        # fields_returned_from_osti =
-        #    ['id','site_code','title' 'sponsoring_organization', 'accession_number', 'doi',
-        #     'authors', 'status', 'publisher', 'availability', 'publication_date', 'country',
-        #     'description', 'site_url', 'product_type', 'product_type_specific',
-        #     'related_identifiers', 'date_record_added', 'date_record_updated',
-        #     'keywords', 'doi_message']
-
-        for record in osti_response['records']:
-            doi = Doi(title=record['title'],
-                      publication_date=record['publication_date'],
-                      product_type=record['product_type'],
-                      product_type_specific=record['product_type_specific'],
-                      related_identifier=record['related_identifiers'][0]['identifier_value'],
-                      status=record['status'],
-                      id=record['id'],
-                      doi=record['doi'],
-                      date_record_added=record['date_record_added'],
-                      date_record_updated=record['date_record_updated'])
-
-            if 'doi_message' in record:
-                doi.message = record['doi_message']
-
-            dois.append(doi)
-
-        return dois
+        if isinstance(osti_response, (str, bytes, bytearray)):
+            osti_response = json_loads(osti_response)
+
+        # The record list may be returned alone, or with the paging fields
+        if isinstance(osti_response, dict):
+            osti_response = osti_response.get('records') or []
+
+        dois = []
+        errors = []
+
+        for index, record in enumerate(osti_response):
+            doi, record_errors = DOIOstiWebParser._parse_json_record(record, index)
+
+            if doi is not None:
+                dois.append(doi)
+
+            errors.extend(record_errors)
+
+        return dois, errors
 
 # end class DOIOstiWebParser
@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+from os.path import abspath, dirname, join
+from unittest.mock import patch
+
+from lxml import etree
+
+from pds_doi_service.core.outputs.osti_label_index import INDEX_SUFFIX, DOIOstiLabelIndex
+from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
+
+
+class OstiLabelIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._label_dir = tempfile.TemporaryDirectory()
+        self._osti_label_file = join(self._label_dir.name, 'output.xml')
+
+        shutil.copy(
+            abspath(join(dirname(__file__), os.pardir, os.pardir, os.pardir,
+                         'api', 'test', 'data', 'output.xml')),
+            self._osti_label_file
+        )
+
+    def tearDown(self):
+        self._label_dir.cleanup()
+
+    def test_iter_record_spans(self):
+        osti_label = (b'<?xml version="1.0"?>\n<records>\n'
+                      b'  <!-- <record>commented</record> -->\n'
+                      b'  <record status="Reserved"><title><![CDATA[</record>]]></title></record>\n'
+                      b'  <record/>\n'
+                      b'  <record><related><record>nested</record></related></record>'
+                      b'</records>\n')
+
+        spans = list(DOIOstiLabelIndex.iter_record_spans(osti_label))
+
+        self.assertListEqual(
+            [osti_label[offset:offset + length] for offset, length, _ in spans],
+            [b'<record status="Reserved"><title><![CDATA[</record>]]></title></record>',
+             b'<record/>',
+             b'<record><related><record>nested</record></related></record>']
+        )
+        self.assertListEqual([tail_length for _, _, tail_length in spans], [3, 3, 0])
+
+    def test_get_record_for_lidvid(self):
+        """Test that a record is read from the index as from a search of the whole label"""
+        records = etree.parse(self._osti_label_file).getroot().findall('record')
+
+        for record in records:
+            lidvid = DOIOstiWebParser.get_lidvid(record)
+
+            new_root = etree.Element('records')
+            new_root.append(record)
+            expected_label = etree.tostring(
+                new_root, pretty_print=True, xml_declaration=True, encoding='UTF-8'
+            ).decode('utf-8')
+
+            with self.subTest(lidvid=lidvid):
+                self.assertEqual(
+                    DOIOstiWebParser.get_record_for_lidvid(self._osti_label_file, lidvid),
+                    expected_label
+                )
+
+        self.assertTrue(os.path.exists(self._osti_label_file + INDEX_SUFFIX))
+
+    def test_get_record_unknown_lidvid(self):
+        self.assertIsNone(
+            DOIOstiLabelIndex(self._osti_label_file).get_record('urn:nasa:pds:unknown::1.0')
+        )
+
+    def test_build_empty_label(self):
+        open(self._osti_label_file, 'w').close()
+
+        self.assertDictEqual(DOIOstiLabelIndex(self._osti_label_file).build(), {})
+
+    def test_index_rebuilt_once_label_changes(self):
+        osti_label_index = DOIOstiLabelIndex(self._osti_label_file)
+        osti_label_index.build()
+
+        with patch.object(DOIOstiLabelIndex, 'build', wraps=osti_label_index.build) as build:
+            osti_label_index.get_records()
+
+            build.assert_not_called()
+
+            with open(self._osti_label_file, 'w') as outfile:
+                outfile.write('<records><record>'
+                              '<accession_number>urn:nasa:pds:new::1.0</accession_number>'
+                              '</record></records>')
+
+            self.assertListEqual(list(osti_label_index.get_records()), ['urn:nasa:pds:new::1.0'])
+            self.assertEqual(build.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from pds_doi_service.core.outputs.osti_release import DOIReleaseOstiUtil
+
+
+class OstiReleaseTestCase(unittest.TestCase):
+
+    def test_remove_empty_fields_from_render_doc(self):
+        """Test that each record keeps its own non-empty fields, authors and related identifiers"""
+        render_doc = '<?xml version="1.0" encoding="UTF-8"?>\n<records>{}</records>'.format(''.join(
+            f'<record><id/><title>Bundle {index}</title><doi></doi>'
+            f'<publication_date>2020-01-0{index + 1}</publication_date>'
+            f'<authors><author><first_name>A.</first_name><last_name>Author {index}</last_name></author></authors>'
+            f'<related_identifiers><related_identifier><identifier_type>URL</identifier_type>'
+            f'<identifier_value>urn:nasa:pds:bundle_{index}::1.0</identifier_value>'
+            f'<relation_type>IsIdenticalTo</relation_type></related_identifier></related_identifiers>'
+            f'</record>'
+            for index in range(2)
+        ))
+
+        render_dicts = DOIReleaseOstiUtil().remove_empty_fields_from_render_doc(render_doc)
+
+        self.assertListEqual(
+            render_dicts,
+            [{'title': f'Bundle {index}',
+              'publication_date': f'2020-01-0{index + 1}',
+              'authors': [{'first_name': 'A.', 'last_name': f'Author {index}'}],
+              'related_identifiers': [{'identifier_value': f'urn:nasa:pds:bundle_{index}::1.0',
+                                       'identifier_type': 'URL',
+                                       'relation_type': 'IsIdenticalTo'}]}
+             for index in range(2)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import datetime
+import os
+import tempfile
+import unittest
+from dataclasses import fields
+from io import BytesIO
+from os.path import abspath, dirname, join
+from unittest.mock import patch
+
+import pystache
+from lxml import etree
+
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
+from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil
+from pds_doi_service.core.outputs.osti import DOIOutputOsti
+
+
+class OstiOutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.input_dir = abspath(
+            join(dirname(__file__), os.pardir, os.pardir, os.pardir, os.pardir, 'input')
+        )
+        self._osti_output = DOIOutputOsti()
+
+    def _render_draft_template(self, doi):
+        """Renders a draft record with the mustache template, as done previously"""
+        doi_fields = {field.name: getattr(doi, field.name) for field in fields(doi)}
+
+        if not isinstance(doi.publication_date, str):
+            doi_fields['publication_date'] = doi.publication_date.strftime('%Y-%m-%d')
+
+        # The keywords of draft records are sorted, so they are reproducible
+        if doi.keywords is not None:
+            doi_fields['keywords'] = "; ".join(sorted(doi.keywords))
+
+        return pystache.Renderer().render_path(self._osti_output._draft_template_path, doi_fields)
+
+    @staticmethod
+    def _canonicalize(label):
+        parser = etree.XMLParser(remove_blank_text=True)
+        tree = etree.fromstring(label.encode(), parser)
+
+        # Whitespace only text is left by the template within empty elements
+        for element in tree.iter():
+            if element.text is not None and not element.text.strip():
+                element.text = None
+
+        return etree.tostring(tree, method='c14n')
+
+    def _assert_same_as_template(self, doi):
+        self.assertEqual(self._canonicalize(self._osti_output.create_osti_doi_draft_record(doi)),
+                         self._canonicalize(self._render_draft_template(doi)))
+
+    def test_draft_record_from_label(self):
+        """Test that a record built from a PDS4 label is the same as rendering the template"""
+        label_util = DOIPDS4LabelUtil(
+            landing_page_template='https://pds.nasa.gov/ds-view/pds/view{}.jsp?identifier={}&version={}'
+        )
+
+        for label in ('bundle_in_with_contributors.xml', 'bundle_in.xml'):
+            # Keyword extraction is not under test, the keywords are only
+            # extracted once rendered
+            with patch.object(DOIPDS4LabelUtil, 'get_keywords', return_value={'insight', 'cameras'}):
+                doi = label_util.get_doi_fields_from_pds4(etree.parse(join(self.input_dir, label)))
+
+                doi.publisher = 'NASA Planetary Data System'
+                doi.contributor = 'Cartography and Imaging Sciences Discipline'
+                doi.status = DoiStatus.Draft
+
+                self._assert_same_as_template(doi)
+
+    def test_reserved_record_from_label(self):
+        """Test that the keywords of a label are not extracted for its reserved record"""
+        label_util = DOIPDS4LabelUtil(
+            landing_page_template='https://pds.nasa.gov/ds-view/pds/view{}.jsp?identifier={}&version={}'
+        )
+
+        with patch.object(DOIPDS4LabelUtil, 'get_keywords', return_value={'insight'}) as get_keywords:
+            doi = label_util.get_doi_fields_from_pds4(
+                etree.parse(join(self.input_dir, 'bundle_in.xml'))
+            )
+            doi.status = DoiStatus.Reserved_not_submitted
+
+            reserved_record = etree.fromstring(
+                self._osti_output.create_osti_doi_reserved_record([doi]).encode()
+            )
+
+            get_keywords.assert_not_called()
+            self.assertFalse(reserved_record.findtext('record/keywords'))
+
+            # Until they are read
+            self.assertSetEqual(doi.keywords, {'insight'})
+            self.assertSetEqual(doi.keywords, {'insight'})
+            get_keywords.assert_called_once()
+
+    def test_draft_record_all_fields(self):
+        """Test that a record with every field, and special characters, is the same as rendering the template"""
+        doi = Doi(title='Cameras & "Sensors" <Raw>',
+                  publication_date=datetime.datetime(2020, 1, 2),
+                  product_type='Dataset',
+                  product_type_specific='PDS4 Refereed Data Bundle',
+                  related_identifier='urn:nasa:pds:insight_cameras::1.0',
+                  id='22692', doi='10.17189/22692',
+                  authors=[{'first_name': 'R.', 'last_name': 'Deen'},
+                           {'full_name': 'InSight Team'},
+                           {'first_name': 'H.', 'middle_name': 'A.', 'last_name': 'Abarca'}],
+                  editors=[{'first_name': 'P.', 'last_name': 'Smith'}],
+                  keywords=['insight', 'cameras'],
+                  description='Data Products', site_url='https://pds.nasa.gov/view?id=1&version=1.0',
+                  publisher='NASA Planetary Data System', contributor='Imaging',
+                  date_record_added='2020-01-01', status=DoiStatus.Draft)
+
+        self._assert_same_as_template(doi)
+
+    def test_draft_record_missing_fields(self):
+        """Test that a record with unset fields is the same as rendering the template"""
+        doi = Doi(title='InSight Cameras Bundle', publication_date='2019',
+                  product_type='Text', product_type_specific='technical documentation',
+                  related_identifier='urn:nasa:pds:insight_cameras::1.0')
+
+        self._assert_same_as_template(doi)
+
+    def test_draft_record_follows_template(self):
+        """Test that draft records are rendered from the template shared with release records"""
+        doi = Doi(title='InSight Cameras Bundle', publication_date='2019',
+                  product_type='Collection', product_type_specific='PDS4 Collection',
+                  related_identifier='urn:nasa:pds:insight_cameras::1.0',
+                  keywords={'insight'}, contributor='Imaging')
+
+        with open(self._osti_output._draft_template_path) as infile:
+            template = infile.read()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_path = join(temp_dir, 'DOI_template-mustache.xml')
+
+            with open(template_path, 'w') as outfile:
+                outfile.write(template.replace('<country>USA</country>',
+                                               '<country>US</country>'))
+
+            with patch.object(self._osti_output, '_draft_template_path', template_path):
+                record = self._osti_output.create_osti_doi_draft_record_element(doi)
+
+        self.assertEqual(record.findtext('country'), 'US')
+        self.assertEqual(record.findtext('contributors/contributor/full_name'),
+                         'Planetary Data System: Imaging Node')
+
+    def test_write_records(self):
+        """Test that the records written one at a time are the same as created at once"""
+        dois = [Doi(title=f'InSight Cameras Collection {index}', publication_date='2019',
+                    product_type='Collection', product_type_specific='PDS4 Collection',
+                    related_identifier=f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+                    authors=[{'first_name': 'R.', 'last_name': 'Deen'}],
+                    keywords=['insight', 'cameras'], status=DoiStatus.Draft)
+                for index in range(3)]
+
+        output = BytesIO()
+        self._osti_output.write_osti_doi_draft_records(iter(dois), output)
+
+        records = etree.Element('records')
+
+        for doi in dois:
+            records.append(self._osti_output.create_osti_doi_draft_record_element(doi))
+
+        self.assertEqual(self._canonicalize(output.getvalue().decode()),
+                         self._canonicalize(etree.tostring(records).decode()))
+
+        output = BytesIO()
+        self._osti_output.write_osti_doi_reserved_records(dois, output)
+
+        self.assertEqual(self._canonicalize(output.getvalue().decode()),
+                         self._canonicalize(self._osti_output.create_osti_doi_reserved_record(dois)))
+
+    def test_draft_record_keywords_sorted(self):
+        """Test that the keywords of a draft record do not depend on the order of their set"""
+        doi = Doi(title='InSight Cameras Bundle', publication_date='2019',
+                  product_type='Collection', product_type_specific='PDS4 Collection',
+                  related_identifier='urn:nasa:pds:insight_cameras::1.0',
+                  keywords={'mars', 'insight', 'cameras', 'edr'})
+
+        record = self._osti_output.create_osti_doi_draft_record_element(doi)
+
+        self.assertEqual(record.findtext('keywords'), 'PDS; PDS4; cameras; edr; insight; mars')
+
+    def test_write_label_records(self):
+        """Test that the records of labels are written as they were rendered"""
+        dois = [Doi(title=f'InSight Cameras Collection {index}', publication_date='2019',
+                    product_type='Collection', product_type_specific='PDS4 Collection',
+                    related_identifier=f'urn:nasa:pds:insight_cameras:data_{index}::1.0',
+                    keywords={'insight', 'cameras'}, status=DoiStatus.Draft)
+                for index in range(3)]
+
+        osti_labels = [self._osti_output.create_osti_doi_draft_record(doi) for doi in dois]
+
+        output = BytesIO()
+        self._osti_output.write_osti_label_records(iter(osti_labels), output)
+
+        records = etree.Element('records')
+
+        for doi in dois:
+            records.append(self._osti_output.create_osti_doi_draft_record_element(doi))
+
+        self.assertEqual(self._canonicalize(output.getvalue().decode()),
+                         self._canonicalize(etree.tostring(records).decode()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import json
+import os
+import unittest
+from os.path import abspath, dirname, join
+from unittest.mock import MagicMock, patch
+
+from lxml import etree
+
+from pds_doi_service.core.outputs.osti_web_client import DOIOstiWebClient
+
+
+class OstiWebClientTestCase(unittest.TestCase):
+
+    def setUp(self):
+        data_dir = abspath(
+            join(dirname(__file__), os.pardir, os.pardir, os.pardir, 'api', 'test', 'data')
+        )
+
+        with open(join(data_dir, 'release_osti_record.xml'), 'rb') as infile:
+            self._osti_xml = infile.read()
+
+        record = etree.fromstring(self._osti_xml).find('record')
+
+        self._osti_json = json.dumps(
+            {'records': [dict(record.attrib,
+                              **{child.tag: child.text for child in record
+                                 if isinstance(child.tag, str) and not len(child)})]}
+        ).encode()
+
+    def _query_dois(self, query_format):
+        responses = {'application/xml': self._osti_xml, 'application/json': self._osti_json}
+
+        def get_patch(url, auth=None, params=None, headers=None):
+            return MagicMock(content=responses[headers['Accept']])
+
+        with patch('pds_doi_service.core.outputs.osti_web_client.requests.get',
+                   side_effect=get_patch) as get_mock:
+            dois, errors = DOIOstiWebClient().webclient_query_dois(
+                'https://www.osti.gov/iad2test/api/records', {'doi': '10.17189/28957'},
+                query_format=query_format
+            )
+
+        self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(get_mock.call_args[1]['params']['doi'], '10.17189/28957')
+        self.assertListEqual(errors, [])
+
+        return dois
+
+    def test_query_dois(self):
+        """Test that records are parsed alike from the XML and JSON responses"""
+        xml_dois = self._query_dois('xml')
+        json_dois = self._query_dois('json')
+
+        self.assertEqual(len(xml_dois), 1)
+        self.assertEqual(len(json_dois), 1)
+
+        for field in ('title', 'doi', 'id', 'related_identifier', 'status', 'publication_date'):
+            self.assertEqual(getattr(json_dois[0], field), getattr(xml_dois[0], field))
+
+    def test_query_dois_unknown_format(self):
+        with self.assertRaises(ValueError):
+            DOIOstiWebClient().webclient_query_dois(
+                'https://www.osti.gov/iad2test/api/records', query_format='csv'
+            )
+
+    def test_verify_osti_reserved_status(self):
+        """Test that the status of every record is checked, and reset to reserved"""
+        osti_label = ('<records><record status="reserved"><id>1</id></record>'
+                      '<record status="Pending"><id>2</id></record></records>')
+
+        reserved_flag, out_text = DOIOstiWebClient()._verify_osti_reserved_status(osti_label)
+
+        self.assertTrue(reserved_flag)
+        self.assertListEqual(
+            [record.get('status') for record in etree.fromstring(out_text).findall('record')],
+            ['reserved', 'reserved']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
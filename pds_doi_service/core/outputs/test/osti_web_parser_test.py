@@ -0,0 +1,341 @@
+import json
+import os
+import unittest
+from dataclasses import fields
+from io import BytesIO
+from os.path import abspath, dirname, join
+
+from lxml import etree
+
+from pds_doi_service.core.entities.doi import DOI_FIELD_NAMES, EXTRA_ATTRIBUTES, Doi, DoiStatus
+from pds_doi_service.core.input.exceptions import InputFormatException
+from pds_doi_service.core.outputs.osti_web_parser import OPTIONAL_FIELDS, DOIOstiWebParser
+
+# A record exercising the less common layouts: comments, repeated tags,
+# empty keywords, authors with a full name or no name, and a lidvid only
+# found in a URN related identifier
+EDGE_CASE_RECORDS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<records>
+    <record status="Registered">
+        <!-- a comment -->
+        <id>1234</id>
+        <id>5678</id>
+        <title>First title</title>
+        <title>Second title</title>
+        <publication_date>2020-01-01</publication_date>
+        <product_type>Collection</product_type>
+        <product_type_specific>PDS4 Collection</product_type_specific>
+        <keywords/>
+        <related_identifiers>
+            <related_identifier>
+                <identifier_type>DOI</identifier_type>
+                <identifier_value>10.17189/1234</identifier_value>
+            </related_identifier>
+        </related_identifiers>
+        <related_identifiers>
+            <related_identifier>
+                <identifier_type>URN</identifier_type>
+                <identifier_value>urn:nasa:pds:edge_case::1.0</identifier_value>
+            </related_identifier>
+        </related_identifiers>
+        <authors>
+            <!-- an author -->
+            <author><full_name>PDS Node</full_name><first_name>A.</first_name></author>
+            <author><first_name>B.</first_name><middle_name>C.</middle_name><last_name>D</last_name></author>
+            <author><middle_name>E.</middle_name></author>
+            <author><email/></author>
+        </authors>
+        <contributors>
+            <contributor><full_name>PDS Imaging Node</full_name></contributor>
+            <contributor><first_name>F.</first_name></contributor>
+        </contributors>
+    </record>
+    <record status="Pending">
+        <title>No lidvid</title>
+        <publication_date>2020-01-01</publication_date>
+        <product_type>Collection</product_type>
+        <product_type_specific>PDS4 Collection</product_type_specific>
+        <doi>10.17189/5678</doi>
+    </record>
+    <record status="Reserved">
+        <title>Report number</title>
+        <publication_date>2020-01-01</publication_date>
+        <product_type>Bundle</product_type>
+        <product_type_specific>PDS4 Bundle</product_type_specific>
+        <report_numbers>urn:nasa:pds:report_number::1.0</report_numbers>
+        <keywords>PDS; PDS4; Mars</keywords>
+    </record>
+</records>
+"""
+
+
+def parse_record_with_xpath(record):
+    """Parses a record with one XPath query per field, as done previously"""
+    if record.xpath("accession_number"):
+        lidvid = record.xpath("accession_number")[0].text
+    elif record.xpath("related_identifiers/related_identifier[./identifier_type='URL']"):
+        lidvid = record.xpath(
+            "related_identifiers/related_identifier[./identifier_type='URL']/identifier_value")[0].text
+    elif record.xpath("related_identifiers/related_identifier[./identifier_type='URN']"):
+        lidvid = record.xpath(
+            "related_identifiers/related_identifier[./identifier_type='URN']/identifier_value")[0].text
+    elif record.xpath("report_numbers"):
+        lidvid = record.xpath("report_numbers")[0].text
+    elif record.xpath("site_url"):
+        lidvid = DOIOstiWebParser.get_lidvid_from_site_url(record)
+    else:
+        lidvid = None
+
+    if not lidvid:
+        return None
+
+    doi = Doi(
+        title=record.xpath('title')[0].text,
+        publication_date=record.xpath('publication_date')[0].text,
+        product_type=record.xpath('product_type')[0].text,
+        product_type_specific=record.xpath('product_type_specific')[0].text,
+        related_identifier=lidvid,
+        status=DoiStatus(record.get('status').lower())
+    )
+
+    for optional_field in ['id', 'doi', 'sponsoring_organization',
+                           'publisher', 'availability', 'country',
+                           'description', 'site_url', 'site_code',
+                           'date_record_added', 'date_record_updated',
+                           'keywords', 'authors', 'contributors']:
+        optional_field_element = record.xpath(optional_field)
+
+        if optional_field_element:
+            if optional_field == 'keywords' and optional_field_element[0].text is not None:
+                doi.keywords = optional_field_element[0].text.split('; ')
+            elif optional_field == 'authors':
+                doi.authors = []
+
+                for author in optional_field_element[0]:
+                    author_dict = {}
+
+                    if author.xpath('full_name'):
+                        author_dict['full_name'] = author.xpath('full_name')[0].text
+                    else:
+                        if author.xpath('first_name') and author.xpath('last_name'):
+                            author_dict['first_name'] = author.xpath('first_name')[0].text
+                            author_dict['last_name'] = author.xpath('last_name')[0].text
+
+                        if author.xpath('middle_name'):
+                            author_dict['middle_name'] = author.xpath('middle_name')[0].text
+
+                    if author_dict:
+                        doi.authors.append(author_dict)
+            elif optional_field == 'contributors':
+                doi.contributors = [
+                    {'full_name': contributor.xpath('full_name')[0].text}
+                    for contributor in optional_field_element[0]
+                    if contributor.xpath('full_name')
+                ]
+            else:
+                setattr(doi, optional_field, optional_field_element[0].text)
+
+    return doi
+
+
+def record_to_json(record):
+    """Returns the OSTI JSON record equivalent to a record element"""
+    json_record = dict(record.attrib)
+
+    for child in record:
+        if not isinstance(child.tag, str):
+            continue
+
+        if child.tag == 'related_identifiers':
+            json_record.setdefault(child.tag, []).extend(
+                {field.tag: field.text for field in item} for item in child
+            )
+        elif child.tag in json_record:
+            continue
+        elif child.tag in ('authors', 'contributors'):
+            json_record[child.tag] = [
+                {field.tag: field.text for field in reversed(item) if isinstance(field.tag, str)}
+                for item in child if isinstance(item.tag, str)
+            ]
+        elif child.tag == 'errors':
+            json_record[child.tag] = [error.text for error in child]
+        elif child.text is not None:
+            json_record[child.tag] = child.text
+
+    return json_record
+
+
+class OstiWebParserTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = abspath(
+            join(dirname(__file__), os.pardir, os.pardir, os.pardir, 'api', 'test', 'data')
+        )
+
+    @staticmethod
+    def _get_values(doi):
+        return {name: getattr(doi, name) for name in DOI_FIELD_NAMES + EXTRA_ATTRIBUTES
+                if hasattr(doi, name)}
+
+    def _assert_parsed_as_with_xpath(self, osti_xml):
+        dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(osti_xml)
+
+        expected_dois = [
+            parse_record_with_xpath(record)
+            for record in etree.fromstring(osti_xml).findall('record')
+            if record.get('status').lower() != 'error'
+        ]
+        expected_dois = [doi for doi in expected_dois if doi is not None]
+
+        self.assertListEqual([self._get_values(doi) for doi in dois],
+                             [self._get_values(doi) for doi in expected_dois])
+
+        return dois
+
+    def test_parse_as_with_xpath(self):
+        """Test that records are parsed as they were by one XPath query per field"""
+        for osti_file in ('draft_osti_record.xml', 'reserve_osti_record.xml',
+                          'release_osti_record.xml', 'output.xml'):
+            with self.subTest(osti_file=osti_file):
+                with open(join(self.data_dir, osti_file), 'rb') as infile:
+                    self._assert_parsed_as_with_xpath(infile.read())
+
+    def test_parse_edge_cases(self):
+        dois = self._assert_parsed_as_with_xpath(EDGE_CASE_RECORDS)
+
+        self.assertEqual(len(dois), 2)
+        self.assertEqual(dois[0].title, 'First title')
+        self.assertEqual(dois[0].id, '1234')
+        self.assertEqual(dois[0].related_identifier, 'urn:nasa:pds:edge_case::1.0')
+        self.assertIsNone(dois[0].keywords)
+        self.assertListEqual(
+            dois[0].authors,
+            [{'full_name': 'PDS Node'},
+             {'first_name': 'B.', 'last_name': 'D', 'middle_name': 'C.'},
+             {'middle_name': 'E.'}]
+        )
+        self.assertListEqual(dois[0].contributors, [{'full_name': 'PDS Imaging Node'}])
+        self.assertEqual(dois[1].related_identifier, 'urn:nasa:pds:report_number::1.0')
+        self.assertListEqual(dois[1].keywords, ['PDS', 'PDS4', 'Mars'])
+
+    def test_parse_errors(self):
+        with open(join(self.data_dir, 'error_osti_record.xml'), 'rb') as infile:
+            dois, errors = DOIOstiWebParser.response_get_parse_osti_xml(infile.read())
+
+        self.assertEqual(len(dois), 1)
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(errors[0], 'Title is required.')
+
+    def test_parse_missing_required_field(self):
+        osti_xml = (b'<records><record status="Reserved">'
+                    b'<accession_number>urn:nasa:pds:no_title::1.0</accession_number>'
+                    b'</record></records>')
+
+        with self.assertRaises(InputFormatException):
+            DOIOstiWebParser.response_get_parse_osti_xml(osti_xml)
+
+    def test_iter_osti_records(self):
+        """Test that records are parsed from bytes, text, a path or a stream alike"""
+        osti_path = join(self.data_dir, 'error_osti_record.xml')
+
+        with open(osti_path, 'rb') as infile:
+            osti_xml = infile.read()
+
+        expected_dois, expected_errors = DOIOstiWebParser.response_get_parse_osti_xml(osti_xml)
+
+        with open(osti_path, 'rb') as osti_stream:
+            for source in (osti_xml, osti_xml.decode(), osti_path, osti_stream):
+                records = list(DOIOstiWebParser.iter_osti_records(source))
+
+                self.assertEqual(len(records), 2)
+                self.assertIsNone(records[0][0])
+                self.assertListEqual(records[0][1], expected_errors)
+                self.assertEqual(self._get_values(records[1][0]),
+                                 self._get_values(expected_dois[0]))
+                self.assertListEqual(records[1][1], [])
+
+    def test_iter_osti_records_incrementally(self):
+        """Test that each record is yielded as soon as it is parsed"""
+        osti_stream = BytesIO(EDGE_CASE_RECORDS.replace(b'</records>', b'<record'))
+        records = DOIOstiWebParser.iter_osti_records(osti_stream)
+
+        doi, _ = next(records)
+
+        self.assertEqual(doi.title, 'First title')
+
+        doi, _ = next(records)
+
+        self.assertEqual(doi.title, 'Report number')
+
+        # The malformed end of the stream is only reached after both records
+        with self.assertRaises(etree.XMLSyntaxError):
+            next(records)
+
+    @staticmethod
+    def _get_fields(doi):
+        return {field: getattr(doi, field, None)
+                for field in [field.name for field in fields(doi)] + list(OPTIONAL_FIELDS)}
+
+    def test_parse_json_as_xml(self):
+        """Test that JSON records are parsed as the equivalent XML records are"""
+        for osti_file in ('draft_osti_record.xml', 'reserve_osti_record.xml',
+                          'release_osti_record.xml', 'output.xml', 'error_osti_record.xml'):
+            with self.subTest(osti_file=osti_file):
+                with open(join(self.data_dir, osti_file), 'rb') as infile:
+                    osti_xml = infile.read()
+
+                osti_json = json.dumps(
+                    {'records': [record_to_json(record)
+                                 for record in etree.fromstring(osti_xml).findall('record')]}
+                )
+
+                expected_dois, expected_errors = DOIOstiWebParser.response_get_parse_osti_xml(osti_xml)
+
+                for osti_response in (osti_json, osti_json.encode(), json.loads(osti_json)):
+                    dois, errors = DOIOstiWebParser.response_get_parse_osti_json(osti_response)
+
+                    self.assertListEqual([self._get_fields(doi) for doi in dois],
+                                         [self._get_fields(doi) for doi in expected_dois])
+                    self.assertListEqual(errors, expected_errors)
+
+    def test_parse_json_edge_cases(self):
+        osti_json = json.dumps([
+            record_to_json(record)
+            for record in etree.fromstring(EDGE_CASE_RECORDS).findall('record')
+        ])
+
+        dois, _ = DOIOstiWebParser.response_get_parse_osti_json(osti_json)
+        expected_dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(EDGE_CASE_RECORDS)
+
+        self.assertListEqual([self._get_fields(doi) for doi in dois],
+                             [self._get_fields(doi) for doi in expected_dois])
+
+        # Numbers are read as text, as from XML, and null values are ignored
+        dois, _ = DOIOstiWebParser.response_get_parse_osti_json(
+            [dict(record_to_json(etree.fromstring(EDGE_CASE_RECORDS).find('record')),
+                  id=1234, accession_number=None, keywords=['PDS', 'Mars'])]
+        )
+
+        self.assertEqual(dois[0].id, '1234')
+        self.assertEqual(dois[0].related_identifier, 'urn:nasa:pds:edge_case::1.0')
+        self.assertListEqual(dois[0].keywords, ['PDS', 'Mars'])
+
+    def test_get_lidvid(self):
+        record = etree.fromstring(
+            b'<record><site_url>https://pds.jpl.nasa.gov/ds-view/pds/viewBundle.jsp?'
+            b'identifier=urn%3Anasa%3Apds%3Ainsight_cameras&amp;version=1.0</site_url>'
+            b'<report_numbers>urn:nasa:pds:insight_cameras::2.0</report_numbers></record>'
+        )
+
+        self.assertEqual(DOIOstiWebParser.get_lidvid(record), 'urn:nasa:pds:insight_cameras::2.0')
+
+        record.remove(record.find('report_numbers'))
+
+        self.assertEqual(DOIOstiWebParser.get_lidvid(record), 'urn:nasa:pds:insight_cameras::1.0')
+
+        record.remove(record.find('site_url'))
+
+        self.assertIsNone(DOIOstiWebParser.get_lidvid(record))
+
+if __name__ == '__main__':
+    unittest.main()
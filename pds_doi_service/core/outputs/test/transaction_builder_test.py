@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from os.path import join
+
+from pds_doi_service.core.entities.doi import Doi, DoiStatus
+from pds_doi_service.core.input.exceptions import UnknownLIDVIDException
+from pds_doi_service.core.outputs.transaction_builder import TransactionBuilder
+
+
+class TransactionBuilderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._db_dir = tempfile.TemporaryDirectory()
+        self._transaction_builder = TransactionBuilder(db_name=join(self._db_dir.name, 'doi.db'))
+
+    def tearDown(self):
+        self._db_dir.cleanup()
+
+    @staticmethod
+    def _create_dois(num_dois):
+        return [Doi(title=f'Bundle {index}', publication_date='2020-01-01',
+                    product_type='Bundle', product_type_specific='PDS4 Bundle',
+                    related_identifier=f'urn:nasa:pds:bundle_{index}::1.0')
+                for index in range(num_dois)]
+
+    @staticmethod
+    def _create_osti_response(lidvids):
+        return '<records>{}</records>'.format(''.join(
+            f'<record status="Reserved"><id>{1000 + index}</id><doi>10.17189/{1000 + index}</doi>'
+            f'<accession_number>{lidvid}</accession_number></record>'
+            for index, lidvid in enumerate(lidvids)
+        ))
+
+    def test_set_doi_fields_osti(self):
+        """Test that each record updates the Doi of its LIDVID, whatever the order of the records"""
+        dois = [Doi(title=f'Bundle {index}', publication_date='2020-01-01',
+                    product_type='Bundle', product_type_specific='PDS4 Bundle',
+                    related_identifier=f'urn:nasa:pds:bundle_{index}::1.0')
+                for index in range(3)]
+
+        # The records are returned in reverse order, the second one without a doi
+        osti_response = '<records>{}</records>'.format(''.join(
+            f'<record status="Reserved"><id>{1000 + index}</id>'
+            + (f'<doi>10.17189/{1000 + index}</doi>' if index != 1 else '')
+            + f'<title>OSTI Bundle {index}</title>'
+            f'<accession_number>urn:nasa:pds:bundle_{index}::1.0</accession_number></record>'
+            for index in reversed(range(3))
+        ))
+
+        dois = self._transaction_builder.set_doi_fields_osti(osti_response, dois)
+
+        self.assertListEqual([doi.id for doi in dois], ['1000', '1001', '1002'])
+        self.assertListEqual([doi.doi for doi in dois], ['10.17189/1000', None, '10.17189/1002'])
+        self.assertListEqual([doi.title for doi in dois],
+                             ['OSTI Bundle 0', 'OSTI Bundle 1', 'OSTI Bundle 2'])
+        self.assertTrue(all(doi.status == DoiStatus.Reserved for doi in dois))
+
+    def test_set_doi_fields_osti_by_position(self):
+        """Test that records whose LIDVIDs are formatted differently update the Dois by position"""
+        dois = self._create_dois(2)
+
+        osti_response = self._create_osti_response(
+            ['urn:nasa:pds:bundle_0::1.0', 'URN:NASA:PDS:BUNDLE_1::1.0']
+        )
+
+        dois = self._transaction_builder.set_doi_fields_osti(osti_response, dois)
+
+        self.assertListEqual([doi.doi for doi in dois], ['10.17189/1000', '10.17189/1001'])
+
+    def test_set_doi_fields_osti_unmatched(self):
+        """Test that a Doi left without a record is an error"""
+        dois = self._create_dois(2)
+
+        osti_response = self._create_osti_response(['urn:nasa:pds:bundle_0::1.0'])
+
+        with self.assertRaises(UnknownLIDVIDException) as context:
+            self._transaction_builder.set_doi_fields_osti(osti_response, dois)
+
+        self.assertIn('urn:nasa:pds:bundle_1::1.0', str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
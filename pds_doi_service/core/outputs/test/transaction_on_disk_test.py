@@ -0,0 +1,88 @@
+import datetime
+import tempfile
+import unittest
+from os.path import exists, join
+from unittest.mock import patch
+
+from pds_doi_service.core.outputs.osti_label_index import INDEX_SUFFIX, DOIOstiLabelIndex
+from pds_doi_service.core.outputs.transaction_on_disk import TransactionOnDisk
+from pds_doi_service.core.util.http_cache import DOIHttpCache
+
+
+class TransactionOnDiskTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._transaction_dir = tempfile.TemporaryDirectory()
+
+        self._transaction_on_disk = TransactionOnDisk()
+        self._transaction_on_disk._config.set('OTHER', 'transaction_dir', self._transaction_dir.name)
+
+    def tearDown(self):
+        self._transaction_dir.cleanup()
+
+    def test_write_remote_input_content(self):
+        """Test that the content of a remote input read by an action is archived without requesting it again"""
+        with patch.object(DOIHttpCache, 'get') as http_cache_get:
+            transaction_io_dir = self._transaction_on_disk.write(
+                'img', datetime.datetime.now(),
+                input_ref='https://pds-imaging.jpl.nasa.gov/data/nsyt/insight_cameras/bundle.xml',
+                output_content='<records/>', input_content=b'<Product_Bundle/>'
+            )
+
+            http_cache_get.assert_not_called()
+
+        with open(join(transaction_io_dir, 'input.xml'), 'rb') as infile:
+            self.assertEqual(infile.read(), b'<Product_Bundle/>')
+
+        with open(join(transaction_io_dir, 'output.xml'), 'r') as infile:
+            self.assertEqual(infile.read(), '<records/>')
+
+    def test_write_output_incrementally(self):
+        """Test that the output may be written by a function, as records are rendered"""
+        def write_records(outfile):
+            outfile.write(b'<records>')
+
+            for record_id in range(3):
+                outfile.write(f'<record><id>{record_id}</id></record>'.encode())
+
+            outfile.write(b'</records>')
+
+        transaction_io_dir = self._transaction_on_disk.write(
+            'img', datetime.datetime.now(), output_content=write_records
+        )
+
+        with open(join(transaction_io_dir, 'output.xml'), 'rb') as infile:
+            self.assertEqual(infile.read().count(b'<record>'), 3)
+
+    def test_write_output_index(self):
+        """Test that the records of the output are indexed by LIDVID on the first lookup, not on write"""
+        output_content = '<records>{}</records>'.format(''.join(
+            f'<record><accession_number>urn:nasa:pds:bundle_{index}::1.0</accession_number></record>'
+            for index in range(3)
+        ))
+
+        with patch.object(DOIOstiLabelIndex, 'build') as build:
+            transaction_io_dir = self._transaction_on_disk.write(
+                'img', datetime.datetime.now(), output_content=output_content
+            )
+
+            build.assert_not_called()
+
+        output_file = join(transaction_io_dir, 'output.xml')
+
+        self.assertFalse(exists(output_file + INDEX_SUFFIX))
+
+        record = DOIOstiLabelIndex(output_file).get_record('urn:nasa:pds:bundle_1::1.0')
+
+        self.assertEqual(record.findtext('accession_number'), 'urn:nasa:pds:bundle_1::1.0')
+        self.assertTrue(exists(output_file + INDEX_SUFFIX))
+
+        with patch.object(DOIOstiLabelIndex, 'build') as build:
+            record = DOIOstiLabelIndex(output_file).get_record('urn:nasa:pds:bundle_2::1.0')
+
+            build.assert_not_called()
+
+        self.assertEqual(record.findtext('accession_number'), 'urn:nasa:pds:bundle_2::1.0')
+
+if __name__ == '__main__':
+    unittest.main()
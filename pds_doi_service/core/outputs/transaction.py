@@ -30,11 +30,13 @@ class Transaction:
                  dois,
                  transaction_disk_dao,
                  transaction_db_dao,
-                 input_path = None):
+                 input_path = None,
+                 input_content = None):
         self._config = self.m_doi_config_util.get_config()
         self._node_id = node_id.lower()
         self._submitter_email = submitter_email
         self._input_ref = input_path
+        self._input_content = input_content
         self._output_content = output_content
         self._transaction_time = datetime.now()
         self._dois = dois
@@ -44,13 +46,11 @@ class Transaction:
     def log(self):
         transaction_io_dir = self._transaction_disk_dao.write(self._node_id, self._transaction_time,
                                                               input_ref=self._input_ref,
-                                                              output_content=self._output_content)
+                                                              output_content=self._output_content,
+                                                              input_content=self._input_content)
 
         for doi in self._dois:
             lidvid = doi.related_identifier.split('::')
-            doi_field = doi.__dict__
-            k_doi_params = dict((k, doi_field[k]) for k in
-                 doi_field.keys() & {'doi', 'status', 'title', 'product_type', 'product_type_specific'})
 
             self._transaction_db_dao.write_doi_info_to_database(
                 lid=lidvid[0],
@@ -59,5 +59,5 @@ class Transaction:
                 submitter=self._submitter_email,
                 discipline_node=self._node_id,
                 transaction_key=transaction_io_dir,
-                **k_doi_params
+                **doi.to_row()
             )
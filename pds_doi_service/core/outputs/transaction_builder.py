@@ -20,9 +20,11 @@ from datetime import datetime
 from lxml import etree
 
 from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.input.exceptions import UnknownLIDVIDException
 from pds_doi_service.core.util.config_parser import DOIConfigUtil
 from pds_doi_service.core.util.general_util import get_logger
 from pds_doi_service.core.db.doi_database import DOIDataBase
+from pds_doi_service.core.outputs.osti_web_parser import DOIOstiWebParser
 from pds_doi_service.core.outputs.transaction import Transaction
 from pds_doi_service.core.outputs.transaction_on_disk import TransactionOnDisk
 
@@ -68,6 +70,18 @@ class TransactionBuilder:
         """
         Fetches the status, title, id and doi fields from i_doc and updates the
         io_doi_fields.
+
+        Each record of i_doc updates the Doi of the same LIDVID, so the records
+        may be in any order, and are read in a single pass. If the LIDVIDs of
+        the records and of the Dois do not all match, as when they are
+        formatted differently, but there are as many records as Dois, each
+        record updates the Doi at the same position instead.
+
+        Raises
+        ------
+        UnknownLIDVIDException
+            If a record or a Doi is left without a match.
+
         """
         # If i_doc is string, we expect it to be in XML format, otherwise an
         # Element object from lxml module.
@@ -76,33 +90,53 @@ class TransactionBuilder:
         else:
             my_root = i_doc.getroottree()
 
-        element_index = 0
+        records = my_root.findall('record')
+        record_lidvids = [DOIOstiWebParser.get_lidvid(record) for record in records]
+
+        dois_by_lidvid = {doi.related_identifier: doi for doi in reversed(dois)}
+        record_dois = [dois_by_lidvid.get(lidvid) for lidvid in record_lidvids]
 
-        for element in my_root.findall('record'):
-            # TODO: this is not safe to rely on the order of the response from OSTI
-            my_record = my_root.xpath(element.tag)[element_index]
-            my_id = my_root.xpath('record/id')[element_index]
-            my_doi = my_root.xpath('record/doi')[element_index]
-            my_title = my_root.xpath('record/title')[element_index]
+        matched_dois = {id(doi) for doi in record_dois if doi is not None}
 
+        if None in record_dois or len(matched_dois) < len(dois):
+            if len(records) != len(dois):
+                unmatched_lidvids = (
+                    [lidvid for lidvid, doi in zip(record_lidvids, record_dois) if doi is None]
+                    + [doi.related_identifier for doi in dois if id(doi) not in matched_dois]
+                )
+
+                raise UnknownLIDVIDException(
+                    f'{len(records)} record(s) returned for {len(dois)} DOI(s), '
+                    f'could not match lidvid(s) {unmatched_lidvids}'
+                )
+
+            logger.warning('The lidvids of the records do not match those of the DOIs, '
+                           'matching them by position')
+            record_dois = dois
+
+        for record, doi in zip(records, record_dois):
             # Add these new fields to io_doi_fields were not there before.
-            dois[element_index].status = DoiStatus(my_record.attrib['status'].lower())
-            dois[element_index].title = my_title.text
-            dois[element_index].id = my_id.text
-            dois[element_index].doi = my_doi.text
+            doi.status = DoiStatus(record.attrib['status'].lower())
+
+            for field in ('title', 'id', 'doi'):
+                field_element = record.find(field)
 
-            element_index += 1
+                if field_element is not None:
+                    setattr(doi, field, field_element.text)
 
         return dois
 
     def prepare_transaction(self, node_id, submitter_email, dois: list,
                             input_path=None, output_content=None,
-                            web_response=None):
+                            web_response=None, input_content=None):
         """
         Build a transaction from 'reserve' or 'draft' action. The transaction
         object and transaction logger will be returned.
 
-        The field output_content is used for writing the content to disk.
+        The field output_content is used for writing the content to disk, it
+        may also be a function writing the content to the file it is given.
+        The field input_content, if provided, is the content already read
+        from a remote input_path, written to disk instead of requesting it again.
         The field web_response is from any interaction with OSTI server.
         The status, id, doi and other fields can parsed from web_response.
         """
@@ -129,6 +163,7 @@ class TransactionBuilder:
                            dois,
                            self.m_transaction_ondisk_dao,
                            self.m_doi_database,
-                           input_path=input_path)
+                           input_path=input_path,
+                           input_content=input_content)
 
 # end class TransactionBuilder:
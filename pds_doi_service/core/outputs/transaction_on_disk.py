@@ -6,13 +6,13 @@
 #
 
 import os
-import requests
 
 from distutils.dir_util import copy_tree
 
 from pds_doi_service.core.input.node_util import NodeUtil
 from pds_doi_service.core.util.config_parser import DOIConfigUtil
 from pds_doi_service.core.util.general_util import get_logger
+from pds_doi_service.core.util.http_cache import DOIHttpCache
 
 logger = get_logger('pds_doi_core.outputs.transaction_logger')
 
@@ -28,11 +28,21 @@ class TransactionOnDisk:
 
     def __init__(self):
         self._config = self.m_doi_config_util.get_config()
+        self._http_cache = DOIHttpCache()
 
-    def write(self, node_id, update_time, input_ref=None, output_content=None):
+    def get_http_cache(self):
+        return self._http_cache
+
+    def write(self, node_id, update_time, input_ref=None, output_content=None,
+              input_content=None):
         """
         Write a transaction from 'reserve' or 'draft' to disk.
         The dictionary log_dict will be updated and returned.
+
+        The input_content, if provided, is the content of a remote input_ref as
+        read by the action, so the input written is the one that was processed.
+        The output_content may be a function writing the output to the binary
+        file it is given, rather than a string.
         """
         transaction_dir = self._config.get('OTHER','transaction_dir')
         logger.debug(f"transaction_dir {transaction_dir}")
@@ -51,24 +61,28 @@ class TransactionOnDisk:
 
             # If the provided content is actually a file name, we copy it,
             # otherwise write it to external file using full_input_name as name.
-            if os.path.isfile(input_ref):
+            if input_content is not None:
+                with open(full_input_name, 'wb') as outfile:
+                    outfile.write(input_content)
+            elif os.path.isfile(input_ref):
                 import shutil
                 shutil.copy2(input_ref,full_input_name)
             elif os.path.isdir(input_ref):
                 copy_tree(input_ref, full_input_name)
-            else:  # remote resource
-                r = requests.get(input_ref, allow_redirects=True)
-
+            else:  # remote resource not read by the action
                 with open(full_input_name, 'wb') as outfile:
-                    outfile.write(r.content)
-
-                r.close()
+                    outfile.write(self._http_cache.get(input_ref))
 
         # Write output file with provided content.
         # Note that the file name is always 'output.xml'.
-        if output_content:
-            full_output_name = os.path.join(final_output_dir,'output.xml')
-
+        full_output_name = os.path.join(final_output_dir, 'output.xml')
+
+        if callable(output_content):
+            # Written incrementally by the action, so large batches of records
+            # are never held in memory as a whole.
+            with open(full_output_name, 'wb') as outfile:
+                output_content(outfile)
+        elif output_content:
             file_ptr = open(full_output_name,"w")
             file_ptr.write(output_content)
             file_ptr.close()
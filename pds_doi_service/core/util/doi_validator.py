@@ -70,7 +70,7 @@ class DOIValidator:
         If the site_url field exists in the doi object, check to see if it is
         online. If the site is not online, an exception will be thrown.
         """
-        logger.debug(f"doi {doi}")
+        logger.debug("doi %s", doi)
         logger.info(f"doi.site_url {doi.site_url}")
 
         if doi.site_url:
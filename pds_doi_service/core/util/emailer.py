@@ -17,6 +17,7 @@ logger = get_logger('pds_doi_core.util.emailer')
 
 class Emailer:
     # This class Emailer allows code in pds-doi-service module to send out an email for status of submitted DOIs or any other reasons.
+    # Used as a context manager, all the emails sent within the with block share a single SMTP session.
 
     m_doi_config_util = DOIConfigUtil()
     m_localhost  = None
@@ -26,6 +27,53 @@ class Emailer:
         self._config = self.m_doi_config_util.get_config()
         self.m_localhost  =      self._config.get('OTHER', 'emailer_local_host')
         self.m_email_port =  int(self._config.get('OTHER', 'emailer_port'))
+        self.m_smtp       = None
+
+    def __enter__(self):
+        self.open_session()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close_session()
+
+    def open_session(self):
+        '''Function opens an SMTP session reused by every email sent until close_session() is called. '''
+
+        if self.m_smtp is None:
+            try:
+                self.m_smtp = smtplib.SMTP(self.m_localhost,self.m_email_port)
+            except OSError:
+                # Each email then falls back to its own connection, and reports its own error.
+                logger.error("OSError:Error: unable to open SMTP session")
+                logger.debug(f"{self.m_localhost,self.m_email_port}")
+
+    def close_session(self):
+        '''Function terminates the SMTP session opened by open_session(), if any. '''
+
+        if self.m_smtp is not None:
+            try:
+                self.m_smtp.quit() # Terminate the SMTP session and close the connection.
+            except (OSError, smtplib.SMTPException):
+                self.m_smtp.close()
+            finally:
+                self.m_smtp = None
+
+    def _deliver(self, deliver_function):
+        '''Function calls deliver_function with an SMTP connection, reusing the open session if there is one. '''
+
+        if self.m_smtp is None:
+            smtpObj = smtplib.SMTP(self.m_localhost,self.m_email_port)
+            deliver_function(smtpObj)
+            smtpObj.quit() # Terminate the SMTP session and close the connection.
+            return
+
+        try:
+            deliver_function(self.m_smtp)
+        except smtplib.SMTPServerDisconnected:
+            # The server may drop a session left idle for too long, so reconnect once.
+            logger.debug("SMTP session disconnected, reconnecting")
+            self.m_smtp = smtplib.SMTP(self.m_localhost,self.m_email_port)
+            deliver_function(self.m_smtp)
 
     def sendmail(self, sender, receivers, subject, message_body):
         '''Function send out an email from sender to receivers using SMTP library using sendmail(). '''
@@ -51,10 +99,8 @@ class Emailer:
         out_message = "From: " + sender + "\n" + "To: " + ','.join(receivers) + "\n" + "Subject: " + subject + "\n\n" + message_body
 
         try:
-            smtpObj = smtplib.SMTP(self.m_localhost,self.m_email_port)
-            smtpObj.sendmail(sender, receivers, out_message)
+            self._deliver(lambda smtpObj: smtpObj.sendmail(sender, receivers, out_message))
             logger.debug(f"Successfully sent email to {receivers}")
-            smtpObj.quit() # Terminate the SMTP session and close the connection.
         except OSError:
             logger.error("OSError:Error: unable to send email")
             logger.debug(f"subject,message_body {subject,message_body}")
@@ -114,10 +160,8 @@ class Emailer:
         # Using the send_message allows the attachment to show up in the user's email program as a clickable item.
 
         try:
-            smtpObj = smtplib.SMTP(self.m_localhost,self.m_email_port)
-            smtpObj.send_message(message)
+            self._deliver(lambda smtpObj: smtpObj.send_message(message))
             logger.debug(f"Successfully sent email to {message['To']}")
-            smtpObj.quit() # Terminate the SMTP session and close the connection.
         except OSError:
             logger.error("OSError:Error: unable to send email")
             logger.error("subject,message_body {msg['Subject'],msg.get_body('plain')}")
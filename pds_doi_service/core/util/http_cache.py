@@ -0,0 +1,267 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=============
+http_cache.py
+=============
+
+Contains the on-disk cache of the remote resources, such as PDS4 labels,
+read by the actions of the service.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from os.path import join
+
+import appdirs
+import requests
+
+from pds_doi_service.core.util.config_parser import DOIConfigUtil
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger('pds_doi_core.util.http_cache')
+
+# Fraction of the maximum size the cache is evicted down to, so a full cache
+# is not scanned again on every write
+EVICTION_RATIO = 0.9
+
+
+class DOIHttpCache:
+    """
+    Caches the content of HTTP resources on disk, and revalidates it with
+    conditional requests (ETag and Last-Modified), so an unchanged resource
+    is only downloaded once across runs.
+
+    Each resource is stored in a single file, named after the SHA-256 of its
+    URL, made of a line of JSON metadata followed by the content. Files are
+    written atomically, so the cache may be shared by concurrent processes.
+    The least recently used resources are evicted once the cache grows past
+    its maximum size. The size of the cache is counted once, then kept up to
+    date with the entries written, so the cache directory is only scanned
+    again when the size counted goes past the maximum size. The size is
+    guarded by a lock, as the cache may be shared by the threads of a
+    process, such as those of the bundle crawler.
+
+    In offline mode, resources are only read from the cache.
+    """
+    m_doi_config_util = DOIConfigUtil()
+
+    def __init__(self, cache_dir=None, max_size=None, offline=None):
+        """
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory of the cache. Defaults to the http_cache_path
+            configuration value or, if empty, to the user cache directory.
+        max_size : int, optional
+            Maximum size, in bytes, of the cached content. 0 disables the
+            cache. Defaults to the http_cache_max_size configuration value.
+        offline : bool, optional
+            Whether to only read resources from the cache. Defaults to the
+            http_cache_offline_flag configuration value.
+
+        """
+        config = self.m_doi_config_util.get_config()
+
+        self._cache_dir = (cache_dir
+                           or config.get('OTHER', 'http_cache_path')
+                           or join(appdirs.user_cache_dir('pds_doi_service'), 'http'))
+
+        if max_size is None:
+            max_size = config.getint('OTHER', 'http_cache_max_size')
+
+        self._max_size = max_size
+
+        # Size of the cached content, counted on the first write, and the
+        # lock guarding it along with the entries replaced and evicted
+        self._cache_size = None
+        self._lock = threading.Lock()
+
+        if offline is None:
+            offline = config.get('OTHER', 'http_cache_offline_flag').lower() == 'true'
+
+        self.offline = offline
+
+    def _get_entry_path(self, url):
+        return join(self._cache_dir, hashlib.sha256(url.encode()).hexdigest())
+
+    def _read_entry(self, url):
+        """Returns the (metadata, content) pair cached for url, or None."""
+        try:
+            with open(self._get_entry_path(url), 'rb') as infile:
+                metadata = json.loads(infile.readline())
+                content = infile.read()
+        except (OSError, ValueError):
+            return None
+
+        # Guard against collisions, however unlikely.
+        if metadata.get('url') != url:
+            return None
+
+        return metadata, content
+
+    def _touch_entry(self, url):
+        """Marks the entry of url as recently used."""
+        try:
+            os.utime(self._get_entry_path(url))
+        except OSError:
+            pass
+
+    def _write_entry(self, url, response):
+        metadata = {'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified')}
+
+        # Without validators the resource could never be revalidated.
+        if not metadata['etag'] and not metadata['last_modified']:
+            return
+
+        entry_path = self._get_entry_path(url)
+
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+
+            with os.fdopen(file_descriptor, 'wb') as outfile:
+                outfile.write(json.dumps(metadata).encode() + b'\n')
+                outfile.write(response.content)
+                entry_size = outfile.tell()
+
+            with self._lock:
+                if self._cache_size is None:
+                    self._cache_size = self._get_cache_size()
+
+                try:
+                    replaced_size = os.stat(entry_path).st_size
+                except OSError:
+                    replaced_size = 0
+
+                os.replace(temp_path, entry_path)
+
+                self._cache_size += entry_size - replaced_size
+
+                if self._cache_size > self._max_size:
+                    self._evict()
+        except OSError as err:
+            logger.warning(f'Could not cache {url}, reason: {str(err)}')
+
+    def _list_entries(self):
+        """Returns the (modification time, size, path) of each cache entry."""
+        entries = []
+
+        with os.scandir(self._cache_dir) as cache_entries:
+            for entry in cache_entries:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        return entries
+
+    def _get_cache_size(self):
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _evict(self):
+        """
+        Removes the least recently used entries, until the cache is below
+        EVICTION_RATIO of its maximum size. The entries are listed again, as
+        other processes may share the cache. Must be called with the lock
+        held.
+        """
+        entries = self._list_entries()
+        cache_size = sum(size for _, size, _ in entries)
+
+        for _, size, path in sorted(entries):
+            if cache_size <= self._max_size * EVICTION_RATIO:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                # Already evicted by another process.
+                pass
+
+            cache_size -= size
+
+        self._cache_size = cache_size
+
+    def get(self, url, session=None):
+        """
+        Returns the content of the resource at url, from the cache if it is
+        unchanged since it was cached.
+
+        Parameters
+        ----------
+        url : str
+            URL of the resource.
+        session : requests.Session, optional
+            Session to request the resource with, such as one pooling
+            connections for concurrent requests. The requests module is used
+            if not provided.
+
+        Returns
+        -------
+        content : bytes
+            The content of the resource.
+
+        Raises
+        ------
+        OSError
+            If the resource cannot be requested, is not found or is not cached
+            in offline mode.
+
+        """
+        cached_entry = self._read_entry(url) if self._max_size > 0 else None
+
+        if self.offline:
+            if cached_entry is None:
+                raise OSError(f'{url} is not cached, and cannot be requested offline')
+
+            logger.debug(f'Reading {url} from the cache')
+            self._touch_entry(url)
+
+            return cached_entry[1]
+
+        headers = {}
+
+        if cached_entry:
+            metadata, content = cached_entry
+
+            if metadata['etag']:
+                headers['If-None-Match'] = metadata['etag']
+
+            if metadata['last_modified']:
+                headers['If-Modified-Since'] = metadata['last_modified']
+
+        try:
+            response = (session or requests).get(url, headers=headers, allow_redirects=True)
+        except (requests.ConnectionError, requests.Timeout) as err:
+            if cached_entry is None:
+                raise
+
+            logger.warning(f'Could not request {url}, reason: {str(err)}, '
+                           f'reading it from the cache')
+            self._touch_entry(url)
+
+            return cached_entry[1]
+
+        if response.status_code == requests.codes.not_modified and cached_entry:
+            logger.debug(f'{url} is unchanged, reading it from the cache')
+            self._touch_entry(url)
+
+            return cached_entry[1]
+
+        response.raise_for_status()
+
+        if response.status_code == requests.codes.ok and self._max_size > 0:
+            self._write_entry(url, response)
+
+        return response.content
@@ -79,14 +79,16 @@ def create_cmd_parser():
     return parser
 
 def _read_from_local_xml(path):
-    '''Function read from local xml file containing output from OSTI query.'''
+    '''Function read from local xml file containing output from OSTI query.
+    The Doi objects are yielded one at a time as the file is parsed, so an export of any size can be imported.'''
     try:
-        with open(path, mode='r') as f:
-            doi_xml = f.read()
+        f = open(path, mode='rb')
     except Exception as e:
         raise CriticalDOIException(str(e))
-    dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(doi_xml)
-    return dois
+    with f:
+        for doi, _ in DOIOstiWebParser.iter_osti_records(f):
+            if doi is not None:
+                yield doi
 
 def _read_from_path(path):
     if os.path.isfile(path):
@@ -115,17 +117,16 @@ def get_dois_from_osti(target_url):
             o_server_url = target_url
         logger.info(f"o_server_url {o_server_url}")
 
-        doi_xml = DOIOstiWebClient().webclient_query_doi(o_server_url,
-                                                         query_dict,
-                                                         i_username=m_config.get('OSTI', 'user'),
-                                                         i_password=m_config.get('OSTI', 'password'))
-        dois, _ = DOIOstiWebParser.response_get_parse_osti_xml(doi_xml)
+        dois, _ = DOIOstiWebClient().webclient_query_dois(o_server_url,
+                                                          query_dict,
+                                                          i_username=m_config.get('OSTI', 'user'),
+                                                          i_password=m_config.get('OSTI', 'password'))
 
         logger.info(f"o_server_url,len(dois) {o_server_url,len(dois)}")
 
         return dois, o_server_url
 
-def _get_node_id_from_contributors(doi_field):
+def _get_node_id_from_contributors(doi):
     # Given a doi object, attempt to extract the node_id from contributors field.  If not able to, return 'eng' as default.
     # This function is a one-off as well so no fancy logic.
     # m_node_id_dict = {'ATM': 'Atmospheres',
@@ -140,8 +141,10 @@ def _get_node_id_from_contributors(doi_field):
     o_node_id = 'eng'
     full_name = 'dummy_full_name'  # If a 'contributors' field exist, this value will get a valid value set.
 
-    if doi_field['contributors'] and len(doi_field['contributors']) > 0:
-        full_name = doi_field['contributors'][0]['full_name']
+    contributors = getattr(doi, 'contributors', None)
+
+    if contributors and len(contributors) > 0:
+        full_name = contributors[0]['full_name']
         if 'Atmospheres'.lower() in full_name.lower():
             o_node_id = 'atm'
         if 'Engineering'.lower() in full_name.lower():
@@ -226,9 +229,7 @@ def perform_import_to_database(db_name, input, dry_run, submitter_email):
         # Note that because the name of the server is in the config file, it can be the OPS or TEST server.
         dois, o_server_url = get_dois_from_osti(input)
 
-    o_records_found = len(dois)
-
-    logger.info(f"input,o_server_url,o_records_found {input,o_server_url,o_records_found}")
+    logger.info(f"input,o_server_url {input,o_server_url}")
 
     transaction_dir = m_config.get('OTHER','transaction_dir')
     transaction_time = datetime.now()
@@ -241,6 +242,7 @@ def perform_import_to_database(db_name, input, dry_run, submitter_email):
 
     # Write each Doi object as a row into the database.
     for doi in dois:
+        o_records_found += 1
 
         if use_doi_filtering_flag:
             if hasattr(doi, 'doi') and not doi.doi.startswith(o_pds_doi_token):
@@ -262,17 +264,15 @@ def perform_import_to_database(db_name, input, dry_run, submitter_email):
         # The lidvid is two parts separated by "::", e.g. "urn:nasa:pds:lab_shocked_feldspars_3::1.0"
         if doi.related_identifier:
             lidvid = doi.related_identifier.split('::')
-        doi_field = doi.__dict__  # Convert the Doi object to a dictionary.
 
         # Get the node_id from 'contributors' field if can be found.
-        node_id = _get_node_id_from_contributors(doi_field)
+        node_id = _get_node_id_from_contributors(doi)
 
-        logger.debug(f"node_id,submitter_email,doi.contributors {node_id,submitter_email,doi.contributors}")
+        logger.debug(f"node_id,submitter_email,doi.contributors {node_id,submitter_email,getattr(doi, 'contributors', None)}")
 
         # Create a dictionary with these fields {'doi', 'status', 'title', 'product_type', 'product_type_specific'}
-        # from fields in doi_field dictionary.
-        k_doi_params = dict((k, doi_field[k]) for k in
-             doi_field.keys() & {'doi', 'status', 'title', 'product_type', 'product_type_specific'})
+        # from the Doi object.
+        k_doi_params = doi.to_row()
 
         logger.info(f"DOI_item_only {k_doi_params['doi']}")
         logger.info(f"DOI_item,status {k_doi_params['doi'],k_doi_params['status']}")
@@ -308,6 +308,8 @@ def perform_import_to_database(db_name, input, dry_run, submitter_email):
         item_index += 1
     # end for doi in dois:
 
+    logger.info(f"input,o_server_url,o_records_found {input,o_server_url,o_records_found}")
+
     return o_server_url, o_pds_doi_token, o_records_found, o_db_name, o_records_processed, o_records_written, o_records_dois_skipped, o_records_valid
 
 def main():
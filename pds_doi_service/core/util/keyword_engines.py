@@ -0,0 +1,192 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+==================
+keyword_engines.py
+==================
+
+Contains the engines providing the stop words and lemmatizer used to extract
+keywords, selected with the keyword_engine configuration value:
+
+    builtin
+        Bundled NLTK stop words, and WordNet noun lemmatizer reading the
+        bundled WordNet noun lemmas, requiring no additional dependency or
+        data.
+    nltk
+        NLTK stop words and WordNet lemmatizer, requiring the nltk package
+        and its stopwords and wordnet data.
+"""
+
+import gzip
+from functools import lru_cache
+from os.path import dirname, join
+
+from pds_doi_service.core.util.config_parser import DOIConfigUtil
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger(__name__)
+
+# Number of distinct words whose lemma is remembered by an engine
+LEMMATIZE_CACHE_SIZE = 65536
+
+# The English stop words of NLTK
+STOP_WORDS = frozenset((
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're",
+    "you've", "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he',
+    'him', 'his', 'himself', 'she', "she's", 'her', 'hers', 'herself', 'it', "it's",
+    'its', 'itself', 'they', 'them', 'their', 'theirs', 'themselves', 'what',
+    'which', 'who', 'whom', 'this', 'that', "that'll", 'these', 'those', 'am', 'is',
+    'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'having',
+    'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or',
+    'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about',
+    'against', 'between', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'when', 'where', 'why',
+    'how', 'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some',
+    'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
+    's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now',
+    'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn',
+    "couldn't", 'didn', "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn',
+    "hasn't", 'haven', "haven't", 'isn', "isn't", 'ma', 'mightn', "mightn't",
+    'mustn', "mustn't", 'needn', "needn't", 'shan', "shan't", 'shouldn',
+    "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't", 'wouldn',
+    "wouldn't"
+))
+
+# Directory of the WordNet 3.0 noun lemmas and exceptions used by the builtin
+# engine, the same database as the NLTK wordnet corpus, see its LICENSE file
+WORDNET_DIR = join(dirname(__file__), 'wordnet')
+
+# Suffix substitutions tried by WordNet on a noun, in order
+NOUN_SUBSTITUTIONS = (('s', ''), ('ses', 's'), ('ves', 'f'), ('xes', 'x'), ('zes', 'z'),
+                      ('ches', 'ch'), ('shes', 'sh'), ('men', 'man'), ('ies', 'y'))
+
+
+@lru_cache(maxsize=None)
+def load_wordnet_nouns():
+    """
+    Returns the set of WordNet noun lemmas, and the dict of the lemmas of
+    the irregular nouns keyed by inflected form, read once per process.
+    """
+    with gzip.open(join(WORDNET_DIR, 'noun_lemmas.txt.gz'), 'rt', encoding='utf-8') as infile:
+        noun_lemmas = frozenset(infile.read().split())
+
+    noun_exceptions = {}
+
+    with gzip.open(join(WORDNET_DIR, 'noun.exc.gz'), 'rt', encoding='utf-8') as infile:
+        for line in infile:
+            inflected_form, *lemmas = line.split()
+            noun_exceptions[inflected_form] = lemmas
+
+    return noun_lemmas, noun_exceptions
+
+
+class BuiltinKeywordEngine:
+    """
+    Lightweight engine giving the same results as the NLTK stop words and
+    WordNet noun lemmatizer, from bundled tables, without NLTK or any data
+    to install.
+
+    As WordNet, a noun is lemmatized by its exceptions if it is irregular,
+    or else by its suffix substitutions. Of the word itself and these
+    candidates, only the WordNet noun lemmas are kept, and the shortest is
+    returned. A word without any is returned unchanged, so a suffix is only
+    stripped when what is left is a noun (atlas is kept, cameras gives
+    camera).
+    """
+    name = 'builtin'
+
+    def __init__(self):
+        self.stop_words = STOP_WORDS
+        self._noun_lemmas, self._noun_exceptions = load_wordnet_nouns()
+        self.lemmatize = lru_cache(maxsize=LEMMATIZE_CACHE_SIZE)(self._lemmatize)
+
+    def _lemmatize(self, word):
+        candidates = self._noun_exceptions.get(word)
+
+        if candidates is None:
+            candidates = [word[:-len(suffix)] + substitute
+                          for suffix, substitute in NOUN_SUBSTITUTIONS
+                          if word.endswith(suffix)]
+
+        # The word comes first, so it is kept over a candidate of its length
+        lemmas = [lemma for lemma in [word] + candidates if lemma in self._noun_lemmas]
+
+        return min(lemmas, key=len) if lemmas else word
+
+
+class NltkKeywordEngine:
+    """
+    Engine using the NLTK stop words and WordNet lemmatizer, loaded from the
+    nltk_data_path configuration value if set, or else from the NLTK data
+    search path. Nothing is downloaded, so the service may run on hosts
+    without network access.
+    """
+    name = 'nltk'
+
+    def __init__(self):
+        try:
+            import nltk
+        except ImportError as err:
+            raise ImportError(
+                'The nltk package is required by keyword_engine = nltk, install it '
+                'with "pip install pds_doi_service[nltk]" or use keyword_engine = builtin'
+            ) from err
+
+        nltk_data_path = DOIConfigUtil().get_config().get('OTHER', 'nltk_data_path')
+
+        if nltk_data_path and nltk_data_path not in nltk.data.path:
+            nltk.data.path.insert(0, nltk_data_path)
+
+        from nltk.corpus import stopwords
+        from nltk.stem.wordnet import WordNetLemmatizer
+
+        try:
+            self.stop_words = frozenset(stopwords.words('english'))
+
+            # Force the WordNet corpus to load now, so a missing corpus is
+            # reported here rather than by the first lemmatize() call.
+            lemmatizer = WordNetLemmatizer()
+            lemmatizer.lemmatize('keywords')
+        except LookupError as err:
+            raise LookupError(
+                'The NLTK stopwords and wordnet data are required by keyword_engine = nltk. '
+                'Install them with "python -m nltk.downloader -d <path> stopwords wordnet", '
+                'then set nltk_data_path to <path> in the configuration, '
+                f'or to one of {nltk.data.path}.\n{str(err)}'
+            ) from err
+
+        self.lemmatize = lru_cache(maxsize=LEMMATIZE_CACHE_SIZE)(lemmatizer.lemmatize)
+
+        logger.debug('NLTK stop words and lemmatizer loaded')
+
+
+KEYWORD_ENGINES = {engine.name: engine
+                   for engine in (BuiltinKeywordEngine, NltkKeywordEngine)}
+
+
+@lru_cache(maxsize=None)
+def get_keyword_engine(name=None):
+    """
+    Returns the keyword engine of the given name, or of the keyword_engine
+    configuration value if not provided, created once per process.
+
+    Raises
+    ------
+    ValueError
+        If there is no engine of that name.
+
+    """
+    if name is None:
+        name = DOIConfigUtil().get_config().get('OTHER', 'keyword_engine')
+
+    if name not in KEYWORD_ENGINES:
+        raise ValueError(f'Unknown keyword_engine {name}, '
+                         f'expected one of {", ".join(KEYWORD_ENGINES)}')
+
+    return KEYWORD_ENGINES[name]()
@@ -1,50 +1,55 @@
 import re
-import nltk
 
-nltk.download('stopwords', quiet=True)
-from nltk.corpus import stopwords
-
-nltk.download('wordnet', quiet=True)
-from nltk.stem.wordnet import WordNetLemmatizer
 from pds_doi_service.core.util.general_util import get_logger
+from pds_doi_service.core.util.keyword_engines import get_keyword_engine
 
 logger = get_logger(__name__)
 
+# Compiled once, rather than on every call of process_text()
+LEADING_PUNCTUATION = re.compile('^[^a-zA-Z0-9]+')
+TRAILING_PUNCTUATION = re.compile('[^a-zA-Z0-9]+$')
+PUNCTUATION_BEFORE_SPACE = re.compile('[^a-zA-Z0-9]+ ')
+PUNCTUATION_AFTER_SPACE = re.compile(' [^a-zA-Z0-9]+')
+ESCAPED_TAGS = re.compile('&lt;/?.*?&gt;')
+SPECIAL_CHARACTERS = re.compile(r'(\|\W)+')
+
+
 class KeywordTokenizer():
-    def __init__(self):
+    def __init__(self, engine=None):
         logger.debug('initialize keyword tokenizer')
         self.pos_dict = {'pds'}
-        self._stop_words = set(stopwords.words("english"))
+        self._engine = engine or get_keyword_engine()
+        self._stop_words = self._engine.stop_words
         self._keywords = set()
 
     def process_text(self, text):
-        # Remove punctuations
-        logger.debug(f'extract keywords from {text}')
-        text = re.sub('^[^a-zA-Z0-9]+', ' ', text)
-        text = re.sub('[^a-zA-Z0-9]+$', ' ', text)
-        text = re.sub('[^a-zA-Z0-9]+ ', ' ', text)
-        text = re.sub(' [^a-zA-Z0-9]+', ' ', text)
+        # Remove punctuations, logged lazily as process_text() is called for
+        # every field of every label
+        logger.debug('extract keywords from %s', text)
+        text = LEADING_PUNCTUATION.sub(' ', text)
+        text = TRAILING_PUNCTUATION.sub(' ', text)
+        text = PUNCTUATION_BEFORE_SPACE.sub(' ', text)
+        text = PUNCTUATION_AFTER_SPACE.sub(' ', text)
 
         # Convert to lowercase
         text = text.lower()
 
         # remove tags
-        text = re.sub("&lt;/?.*?&gt;", " &lt;&gt; ", text)
+        text = ESCAPED_TAGS.sub(" &lt;&gt; ", text)
 
         # remove special characters
-        text = re.sub("(\|\\W)+", " ", text)
+        text = SPECIAL_CHARACTERS.sub(" ", text)
 
         ##Convert to list from string
         text = text.split()
 
         # Lemmatisation
-        lem = WordNetLemmatizer()
-        text = [word if word in self.pos_dict else lem.lemmatize(word)
+        text = [word if word in self.pos_dict else self._engine.lemmatize(word)
                 for word in text if word not in self._stop_words]
 
         for word in text:
             self._keywords.add(word)
-        logger.debug(f'new keyword list is {self._keywords}')
+        logger.debug('new keyword list is %s', self._keywords)
 
     def get_keywords(self):
         return self._keywords
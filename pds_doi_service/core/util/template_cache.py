@@ -0,0 +1,81 @@
+#
+#  Copyright 2020, by the California Institute of Technology.  ALL RIGHTS
+#  RESERVED. United States Government Sponsorship acknowledged. Any commercial
+#  use must be negotiated with the Office of Technology Transfer at the
+#  California Institute of Technology.
+#
+
+"""
+=================
+template_cache.py
+=================
+
+Contains the cache of the parsed mustache templates rendered by the service.
+"""
+
+import os
+from functools import lru_cache
+
+import pystache
+
+from pds_doi_service.core.util.config_parser import DOIConfigUtil
+from pds_doi_service.core.util.general_util import get_logger
+
+logger = get_logger(__name__)
+
+
+class DOITemplateCache:
+    """
+    Reads and parses each mustache template once, and renders it from the
+    parsed template, rather than reading and parsing its file on every
+    rendering as pystache.Renderer.render_path() does.
+
+    When checking modification times, a template is parsed again once its
+    file is modified, at the cost of a stat() per rendering.
+    """
+    m_doi_config_util = DOIConfigUtil()
+
+    def __init__(self, check_mtime=None):
+        """
+        Parameters
+        ----------
+        check_mtime : bool, optional
+            Whether to parse a template again once its file is modified.
+            Defaults to the template_mtime_check_flag configuration value.
+
+        """
+        if check_mtime is None:
+            config = self.m_doi_config_util.get_config()
+            check_mtime = config.get('OTHER', 'template_mtime_check_flag').lower() == 'true'
+
+        self._check_mtime = check_mtime
+        self._templates = {}
+        self._renderer = pystache.Renderer()
+
+    def get_template(self, path):
+        """Returns the parsed mustache template of the file at path."""
+        mtime = os.stat(path).st_mtime_ns if self._check_mtime else None
+        cached_template = self._templates.get(path)
+
+        if cached_template is not None and cached_template[0] == mtime:
+            return cached_template[1]
+
+        logger.debug(f'Parsing template {path}')
+
+        # Decoded as render_path() does, so the line endings are kept
+        with open(path, 'rb') as infile:
+            template = pystache.parse(infile.read().decode(self._renderer.file_encoding))
+
+        self._templates[path] = (mtime, template)
+
+        return template
+
+    def render(self, path, context):
+        """Renders the mustache template of the file at path with context."""
+        return self._renderer.render(self.get_template(path), context)
+
+
+@lru_cache(maxsize=None)
+def get_template_cache():
+    """Returns the template cache of the process."""
+    return DOITemplateCache()
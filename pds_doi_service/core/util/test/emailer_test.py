@@ -0,0 +1,103 @@
+import socketserver
+import threading
+import unittest
+from email.message import EmailMessage
+
+from pds_doi_service.core.util.emailer import Emailer
+
+
+class DebuggingSMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP to accept messages, recording each connection and message."""
+
+    def _reply(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self._reply('220 localhost debugging server')
+
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            command = line.split(' ', 1)[0].upper()
+
+            if not line or command == 'QUIT':
+                self._reply('221 Bye')
+                break
+            elif command == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+
+                for data_line in iter(self.rfile.readline, b''):
+                    if data_line.rstrip(b'\r\n') == b'.':
+                        break
+                    data.append(data_line.decode())
+
+                self.server.messages.append(''.join(data))
+                self._reply('250 OK')
+            else:
+                self._reply('250 OK')
+
+
+class EmailerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = socketserver.ThreadingTCPServer(('localhost', 0), DebuggingSMTPHandler)
+        self._server.daemon_threads = True
+        self._server.connections = 0
+        self._server.messages = []
+
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        self._emailer = Emailer()
+        self._emailer.m_localhost, self._emailer.m_email_port = self._server.server_address
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _send_messages(self):
+        self._emailer.sendmail('sender@jpl.nasa.gov', ['receiver@jpl.nasa.gov'],
+                               'Status For Node img', 'img report')
+
+        message = EmailMessage()
+        message['From'] = 'sender@jpl.nasa.gov'
+        message['To'] = 'receiver@jpl.nasa.gov'
+        message['Subject'] = 'Status For Node naif'
+        message.set_content('naif report')
+        message.add_attachment('[]', filename='doi_status_attachment.txt')
+
+        self._emailer.send_message(message)
+
+    def test_connection_per_email(self):
+        self._send_messages()
+
+        self.assertEqual(self._server.connections, 2)
+        self.assertEqual(len(self._server.messages), 2)
+
+    def test_session(self):
+        with self._emailer:
+            self._send_messages()
+
+        self.assertEqual(self._server.connections, 1)
+        self.assertEqual(len(self._server.messages), 2)
+        self.assertIn('img report', self._server.messages[0])
+        self.assertIn('doi_status_attachment.txt', self._server.messages[1])
+        self.assertIsNone(self._emailer.m_smtp)
+
+    def test_session_reconnects(self):
+        with self._emailer:
+            self._emailer.sendmail('sender@jpl.nasa.gov', ['receiver@jpl.nasa.gov'],
+                                   'Status For Node img', 'img report')
+
+            # Simulate the server dropping the idle session.
+            self._emailer.m_smtp.close()
+
+            self._emailer.sendmail('sender@jpl.nasa.gov', ['receiver@jpl.nasa.gov'],
+                                   'Status For Node naif', 'naif report')
+
+        self.assertEqual(self._server.connections, 2)
+        self.assertEqual(len(self._server.messages), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
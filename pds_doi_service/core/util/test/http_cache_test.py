@@ -0,0 +1,168 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pds_doi_service.core.util.http_cache import DOIHttpCache
+
+
+class LabelRequestHandler(BaseHTTPRequestHandler):
+    """Serves the labels of the server with an ETag, recording each response status."""
+
+    def do_GET(self):
+        content = self.server.labels.get(self.path)
+
+        if content is None:
+            status = 404
+            self.send_response(status)
+            self.end_headers()
+        else:
+            etag = '"' + hashlib.sha256(content).hexdigest() + '"'
+
+            if self.headers.get('If-None-Match') == etag:
+                status = 304
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.end_headers()
+            else:
+                status = 200
+                self.send_response(status)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        self.server.statuses.append(status)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._server = ThreadingHTTPServer(('localhost', 0), LabelRequestHandler)
+        self._server.labels = {'/bundle.xml': b'<Product_Bundle/>',
+                               '/collection.xml': b'<Product_Collection/>'}
+        self._server.statuses = []
+
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+        self._url = 'http://{}:{}'.format(*self._server.server_address)
+        self._cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._cache_dir.cleanup()
+
+    def _create_cache(self, max_size=1024, offline=False):
+        return DOIHttpCache(cache_dir=self._cache_dir.name, max_size=max_size, offline=offline)
+
+    def test_revalidate(self):
+        self.assertEqual(self._create_cache().get(self._url + '/bundle.xml'), b'<Product_Bundle/>')
+
+        # A new run only revalidates the cached label
+        self.assertEqual(self._create_cache().get(self._url + '/bundle.xml'), b'<Product_Bundle/>')
+        self.assertListEqual(self._server.statuses, [200, 304])
+
+        # Until it changes
+        self._server.labels['/bundle.xml'] = b'<Product_Bundle></Product_Bundle>'
+
+        self.assertEqual(self._create_cache().get(self._url + '/bundle.xml'),
+                         b'<Product_Bundle></Product_Bundle>')
+        self.assertListEqual(self._server.statuses, [200, 304, 200])
+
+    def test_offline(self):
+        self._create_cache().get(self._url + '/bundle.xml')
+
+        offline_cache = self._create_cache(offline=True)
+
+        self.assertEqual(offline_cache.get(self._url + '/bundle.xml'), b'<Product_Bundle/>')
+        self.assertRaises(OSError, offline_cache.get, self._url + '/collection.xml')
+        self.assertListEqual(self._server.statuses, [200])
+
+    def test_not_found(self):
+        http_cache = self._create_cache()
+
+        self.assertRaises(OSError, http_cache.get, self._url + '/missing.xml')
+        self.assertListEqual(os.listdir(self._cache_dir.name), [])
+
+    def test_eviction(self):
+        # Only room for one of the labels with its metadata
+        http_cache = self._create_cache(max_size=200)
+
+        http_cache.get(self._url + '/bundle.xml')
+        http_cache.get(self._url + '/collection.xml')
+
+        self.assertEqual(len(os.listdir(self._cache_dir.name)), 1)
+
+        # The collection, most recently used, is still cached
+        http_cache.get(self._url + '/collection.xml')
+        self.assertListEqual(self._server.statuses, [200, 200, 304])
+
+    def test_eviction_scans(self):
+        """Test that the cache directory is only scanned again once the cache is full"""
+        http_cache = self._create_cache()
+
+        with patch.object(DOIHttpCache, '_list_entries', autospec=True,
+                          side_effect=DOIHttpCache._list_entries) as list_entries:
+            http_cache.get(self._url + '/bundle.xml')
+            http_cache.get(self._url + '/collection.xml')
+
+            # Counted on the first write only
+            self.assertEqual(list_entries.call_count, 1)
+
+            # Past the maximum size, the entries are listed again to evict
+            self._server.labels['/browse.xml'] = b'<Product_Browse/>' * 64
+            http_cache.get(self._url + '/browse.xml')
+
+            self.assertEqual(list_entries.call_count, 2)
+
+        self.assertLessEqual(
+            sum(os.path.getsize(os.path.join(self._cache_dir.name, name))
+                for name in os.listdir(self._cache_dir.name)),
+            1024
+        )
+
+    def test_concurrent_writes(self):
+        """Test that the size of a cache shared by threads is kept exact"""
+        for index in range(64):
+            self._server.labels[f'/collection_{index}.xml'] = b'<Product_Collection/>' * 4
+
+        http_cache = self._create_cache(max_size=4096)
+        replace = os.replace
+
+        def slow_replace(source, destination):
+            # Widen the window in which the threads race on the cache size
+            time.sleep(0.001)
+            replace(source, destination)
+
+        with patch('pds_doi_service.core.util.http_cache.os.replace', slow_replace), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(http_cache.get, [f'{self._url}/collection_{index}.xml'
+                                               for index in range(64)]))
+
+        cache_size = sum(os.path.getsize(os.path.join(self._cache_dir.name, name))
+                         for name in os.listdir(self._cache_dir.name))
+
+        self.assertEqual(http_cache._cache_size, cache_size)
+        self.assertLessEqual(cache_size, 4096)
+
+    def test_disabled(self):
+        http_cache = self._create_cache(max_size=0)
+
+        http_cache.get(self._url + '/bundle.xml')
+        http_cache.get(self._url + '/bundle.xml')
+
+        self.assertListEqual(self._server.statuses, [200, 200])
+        self.assertListEqual(os.listdir(self._cache_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import glob
+import os
+import unittest
+from os.path import abspath, dirname, join
+from unittest.mock import patch
+
+from lxml import etree
+
+from pds_doi_service.core.input.pds4_util import DOIPDS4LabelUtil
+from pds_doi_service.core.util.keyword_engines import (BuiltinKeywordEngine, NltkKeywordEngine,
+                                                        get_keyword_engine)
+
+ROOT_DIR = abspath(join(dirname(__file__), os.pardir, os.pardir, os.pardir, os.pardir))
+
+
+class BuiltinKeywordEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._engine = BuiltinKeywordEngine()
+
+    def test_lemmatize(self):
+        # Lemmas as chosen by the WordNet lemmatizer
+        lemmas = {'cameras': 'camera', 'mars': 'mar', 'products': 'product',
+                  'data': 'data', 'studies': 'study', 'classes': 'class',
+                  'fluxes': 'flux', 'churches': 'church', 'archives': 'archive',
+                  'shelves': 'shelf', 'spectra': 'spectrum', 'analyses': 'analysis',
+                  'status': 'status', 'axis': 'axis', 'series': 'series', 'us': 'u',
+                  'pds4': 'pds4', 'files/products': 'files/products',
+                  # Suffixes are only stripped when what is left is a noun
+                  'phobos': 'phobos', 'deimos': 'deimos', 'atlas': 'atlas',
+                  'bias': 'bias', 'chaos': 'chaos', 'cosmos': 'cosmos'}
+
+        self.assertDictEqual({word: self._engine.lemmatize(word) for word in lemmas}, lemmas)
+
+    def test_label_keywords(self):
+        """Test that the keywords of a label are the ones extracted with NLTK"""
+        nltk_record = etree.parse(join(ROOT_DIR, 'pds_doi_service', 'api', 'test',
+                                       'data', 'draft_osti_record.xml'))
+        nltk_keywords = set(nltk_record.findtext('.//keywords').split('; '))
+
+        label_util = DOIPDS4LabelUtil(landing_page_template='{}{}{}')
+        pds4_fields = label_util.read_pds4(
+            etree.parse(join(ROOT_DIR, 'input', 'bundle_in_with_contributors.xml'))
+        )
+
+        # The configured engine defaults to the builtin one
+        keywords = label_util.get_keywords(pds4_fields)
+
+        # The record also lists the PDS and discipline keywords of the template
+        self.assertSetEqual(keywords, {keyword for keyword in nltk_keywords
+                                       if keyword.islower()})
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, get_keyword_engine, 'unknown')
+
+
+class NltkParityTestCase(unittest.TestCase):
+    """Compares the builtin engine to NLTK, when NLTK and its data are installed"""
+
+    def setUp(self):
+        try:
+            self._nltk_engine = NltkKeywordEngine()
+        except (ImportError, LookupError) as err:
+            self.skipTest(f'NLTK is not available: {str(err)}')
+
+        self._builtin_engine = BuiltinKeywordEngine()
+        self._labels = sorted(glob.glob(join(ROOT_DIR, 'input', '**', '*.xml'), recursive=True))
+
+    def test_label_keywords(self):
+        """Test that both engines extract the same keywords from the PDS4 labels"""
+        label_util = DOIPDS4LabelUtil(landing_page_template='{}{}{}')
+
+        for label in self._labels:
+            pds4_fields = label_util.read_pds4(etree.parse(label))
+
+            if not pds4_fields:
+                continue
+
+            keywords = {}
+
+            for engine in (self._builtin_engine, self._nltk_engine):
+                with patch('pds_doi_service.core.util.keyword_tokenizer.get_keyword_engine',
+                           return_value=engine):
+                    keywords[engine.name] = label_util.get_keywords(pds4_fields)
+
+            with self.subTest(label=label):
+                self.assertSetEqual(keywords['builtin'], keywords['nltk'])
+
+    def test_lemmatize(self):
+        """Test that both engines lemmatize every word of the labels alike"""
+        words = {word.lower()
+                 for label in self._labels
+                 for text in etree.parse(label).xpath('//text()')
+                 for word in text.split()}
+
+        for word in sorted(words):
+            with self.subTest(word=word):
+                self.assertEqual(self._builtin_engine.lemmatize(word),
+                                 self._nltk_engine.lemmatize(word))
+
+
+if __name__ == '__main__':
+    unittest.main()
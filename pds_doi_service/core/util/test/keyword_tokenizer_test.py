@@ -0,0 +1,32 @@
+import unittest
+
+from pds_doi_service.core.util.keyword_tokenizer import KeywordTokenizer
+
+
+class SuffixKeywordEngine:
+    """Stands in for a keyword engine, recording the words lemmatized."""
+
+    def __init__(self):
+        self.stop_words = frozenset(('the', 'of', 'and'))
+        self.words = []
+
+    def lemmatize(self, word):
+        self.words.append(word)
+        return word[:-1] if word.endswith('s') else word
+
+
+class KeywordTokenizerTestCase(unittest.TestCase):
+
+    def test_process_text(self):
+        engine = SuffixKeywordEngine()
+        tokenizer = KeywordTokenizer(engine=engine)
+        tokenizer.process_text('--The Cameras of the PDS, (Images) and cameras!')
+
+        self.assertSetEqual(tokenizer.get_keywords(), {'camera', 'pds', 'image'})
+
+        # Stop words and domain terms are not lemmatized
+        self.assertListEqual(engine.words, ['cameras', 'images', 'cameras'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from os.path import join
+from unittest.mock import patch
+
+import pystache
+
+from pds_doi_service.core.entities.doi import DoiStatus
+from pds_doi_service.core.outputs.osti import DOIOutputOsti
+from pds_doi_service.core.util.template_cache import DOITemplateCache
+
+
+class TemplateCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._template_dir = tempfile.TemporaryDirectory()
+        self._template_path = join(self._template_dir.name, 'template-mustache.xml')
+        self._write_template('<title>{{title}}</title>')
+
+    def tearDown(self):
+        self._template_dir.cleanup()
+
+    def _write_template(self, template, mtime=None):
+        with open(self._template_path, 'w') as outfile:
+            outfile.write(template)
+
+        if mtime is not None:
+            os.utime(self._template_path, ns=(mtime, mtime))
+
+    def test_parse_once(self):
+        template_cache = DOITemplateCache(check_mtime=False)
+
+        with patch.object(pystache, 'parse', wraps=pystache.parse) as parse:
+            for title in ('Bundle', 'Cameras & <Sensors>'):
+                self.assertEqual(template_cache.render(self._template_path, {'title': title}),
+                                 pystache.Renderer().render_path(self._template_path,
+                                                                 {'title': title}))
+
+        self.assertEqual(parse.call_count, 1)
+
+        # Changes are not noticed without checking modification times
+        self._write_template('<name>{{title}}</name>')
+        self.assertEqual(template_cache.render(self._template_path, {'title': 'Bundle'}),
+                         '<title>Bundle</title>')
+
+    def test_check_mtime(self):
+        template_cache = DOITemplateCache(check_mtime=True)
+        self._write_template('<title>{{title}}</title>', mtime=1_000_000_000)
+
+        self.assertEqual(template_cache.render(self._template_path, {'title': 'Bundle'}),
+                         '<title>Bundle</title>')
+
+        self._write_template('<name>{{title}}</name>', mtime=2_000_000_000)
+
+        self.assertEqual(template_cache.render(self._template_path, {'title': 'Bundle'}),
+                         '<name>Bundle</name>')
+
+    def test_osti_templates(self):
+        """Test that the OSTI templates render the same as from their files"""
+        osti_output = DOIOutputOsti()
+        template_cache = DOITemplateCache(check_mtime=False)
+
+        doi_fields = {'title': 'Cameras & "Sensors" <Raw>', 'publication_date': '2019-01-01',
+                      'product_type': 'Dataset', 'product_type_specific': 'PDS4 Bundle',
+                      'related_identifier': 'urn:nasa:pds:insight_cameras::1.0',
+                      'authors': [{'first_name': 'R.', 'last_name': 'Deen'}],
+                      'keywords': 'insight; camera', 'date_record_added': '2020-01-01',
+                      'status': DoiStatus.Reserved, 'id': '22692'}
+
+        for template_path, context in ((osti_output._reserve_template_path, {'dois': [doi_fields]}),
+                                       (osti_output._draft_template_path, doi_fields)):
+            self.assertEqual(template_cache.render(template_path, context),
+                             pystache.Renderer().render_path(template_path, context))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -36,7 +36,10 @@ setuptools.setup(
                                       'core/outputs/DOI_template_20200407-mustache.xml',
                                       'core/outputs/DOI_IAD2_reserved_template_20200205-mustache.xml',
                                       'core/input/IAD3_scheematron.sch',
-                                      'core/util/iad_schema.xsd']},
+                                      'core/util/iad_schema.xsd',
+                                      'core/util/wordnet/LICENSE',
+                                      'core/util/wordnet/noun_lemmas.txt.gz',
+                                      'core/util/wordnet/noun.exc.gz']},
     include_package_data=True,
     keywords=['pds', 'doi', 'osti', 'dataCite'],
 
@@ -47,10 +50,14 @@ setuptools.setup(
     ],
     python_requires='>=3.6',  # pds_doi_service.core package requires Dataclasses
     install_requires=pip_requirements,
-    # TO DO if this is th proper wy to handle dev/test dependencies in the CI/CD pipeline
-    #extras_require={
-    #    'test': pip_dev_requirements
-    #},
+    extras_require={
+        # Only required with keyword_engine = nltk in the configuration
+        'nltk': ['nltk>=3.5'],
+        # Decoder of the OSTI responses with query_format = json, json is used otherwise
+        'json': ['orjson>=3'],
+        # TO DO if this is th proper wy to handle dev/test dependencies in the CI/CD pipeline
+        #'test': pip_dev_requirements
+    },
     scripts=[],
     entry_points={
         'console_scripts': ['pds-doi-start-dev=pds_doi_core.web_api.service:main',